@@ -0,0 +1,191 @@
+import asyncio
+import bisect
+import itertools
+import math
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+
+# Priority classes, lower runs first
+PRIORITY_URGENT = 0     # voice_assistant mode or crisis-flagged messages
+PRIORITY_DEFAULT = 1    # regular mental health chat
+PRIORITY_CAREER = 2     # career guidance (search + long HTML answers)
+
+# Fallback id of clients that don't send their own; many users can share it,
+# so it is exempt from the per-session limit
+SHARED_SESSION_ID = "default"
+
+PRIORITY_NAMES = {
+    PRIORITY_URGENT: "urgent",
+    PRIORITY_DEFAULT: "default",
+    PRIORITY_CAREER: "career",
+}
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of being admitted."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _granted(future: asyncio.Future) -> bool:
+    return future.done() and not future.cancelled() and future.exception() is None
+
+
+class _Waiter:
+    __slots__ = ("key", "session_id", "future", "enqueued_at")
+
+    def __init__(self, key, session_id: str, future: asyncio.Future):
+        self.key = key
+        self.session_id = session_id
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+
+class AdmissionController:
+    """Bounds concurrent /chat work with a priority wait queue.
+
+    At most ``max_concurrent`` requests run at once and at most ``per_session``
+    of those belong to one session (except the shared fallback id). Others wait in a queue ordered by priority
+    class and then arrival. When the queue is full, the lowest-priority waiter
+    is shed (or the newcomer, if it ranks lowest), so urgent traffic keeps
+    getting through while career queries back off.
+    """
+
+    def __init__(self, max_concurrent: int, per_session: int, max_queue: int, max_wait: float):
+        self.max_concurrent = max_concurrent
+        self.per_session = per_session
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+
+        self.active = 0
+        self.active_by_session = Counter()
+        self._queue = []
+        self._seq = itertools.count()
+
+        self.admitted = Counter()
+        self.rejected = Counter()
+        self.queue_wait_total = Counter()
+        self.service_time_total = 0.0
+        self.service_count = 0
+
+    def _eligible(self, session_id: str) -> bool:
+        return session_id == SHARED_SESSION_ID or self.active_by_session[session_id] < self.per_session
+
+    def _grant(self, session_id: str):
+        self.active += 1
+        self.active_by_session[session_id] += 1
+
+    def _dispatch(self):
+        i = 0
+        while self.active < self.max_concurrent and i < len(self._queue):
+            waiter = self._queue[i]
+            if waiter.future.done():
+                self._queue.pop(i)
+            elif self._eligible(waiter.session_id):
+                self._queue.pop(i)
+                self._grant(waiter.session_id)
+                waiter.future.set_result(None)
+            else:
+                i += 1
+
+    def _abandon(self, waiter: _Waiter):
+        waiter.future.cancel()
+        if waiter in self._queue:
+            self._queue.remove(waiter)
+
+    def retry_after(self) -> int:
+        """Rough seconds until a queued slot frees up, for the Retry-After header."""
+        avg_service = self.service_time_total / self.service_count if self.service_count else 1.0
+        backlog = (len(self._queue) + 1) / max(self.max_concurrent, 1)
+        return max(1, math.ceil(avg_service * backlog))
+
+    async def acquire(self, session_id: str, priority: int = PRIORITY_DEFAULT,
+                      timeout: Optional[float] = None) -> float:
+        """Wait for a slot and return the time spent queued, in seconds."""
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        if not self._queue and self.active < self.max_concurrent and self._eligible(session_id):
+            self._grant(session_id)
+            self.admitted[name] += 1
+            return 0.0
+
+        if len(self._queue) >= self.max_queue:
+            worst = self._queue[-1]
+            if worst.key[0] <= priority:
+                self.rejected["queue_full"] += 1
+                raise AdmissionRejected("queue_full", self.retry_after())
+            self._queue.pop()
+            worst.future.set_exception(AdmissionRejected("shed", self.retry_after()))
+            self.rejected["shed"] += 1
+
+        waiter = _Waiter((priority, next(self._seq)), session_id, asyncio.get_running_loop().create_future())
+        bisect.insort(self._queue, waiter)
+        self._dispatch()
+
+        wait = self.max_wait if timeout is None else min(timeout, self.max_wait)
+        try:
+            # Not wait_for: on 3.11 it swallows a cancellation that lands after the grant
+            async with asyncio.timeout(max(wait, 0)):
+                await asyncio.shield(waiter.future)
+        except asyncio.TimeoutError:
+            if not _granted(waiter.future):
+                self._abandon(waiter)
+                self.rejected["queue_timeout"] += 1
+                raise AdmissionRejected("queue_timeout", self.retry_after())
+        except asyncio.CancelledError:
+            if _granted(waiter.future):
+                self.release(session_id)
+            else:
+                self._abandon(waiter)
+            raise
+
+        queued = time.monotonic() - waiter.enqueued_at
+        self.admitted[name] += 1
+        self.queue_wait_total[name] += queued
+        return queued
+
+    def release(self, session_id: str, service_time: Optional[float] = None):
+        self.active -= 1
+        self.active_by_session[session_id] -= 1
+        if self.active_by_session[session_id] <= 0:
+            del self.active_by_session[session_id]
+        if service_time is not None:
+            self.service_time_total += service_time
+            self.service_count += 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, session_id: str, priority: int = PRIORITY_DEFAULT,
+                   timeout: Optional[float] = None):
+        """Hold a slot for the body of the block; yields a timings dict."""
+        timings = {"queue": await self.acquire(session_id, priority, timeout), "service": 0.0}
+        start = time.monotonic()
+        try:
+            yield timings
+        finally:
+            timings["service"] = time.monotonic() - start
+            self.release(session_id, timings["service"])
+
+    def stats(self) -> Dict:
+        return {
+            "active": self.active,
+            "queued": len(self._queue),
+            "max_concurrent": self.max_concurrent,
+            "per_session": self.per_session,
+            "max_queue": self.max_queue,
+            "admitted": dict(self.admitted),
+            "rejected": dict(self.rejected),
+            "avg_queue_wait_ms": {
+                name: round(self.queue_wait_total[name] / count * 1000, 1)
+                for name, count in self.admitted.items() if count
+            },
+            "avg_service_ms": round(self.service_time_total / self.service_count * 1000, 1) if self.service_count else None,
+        }
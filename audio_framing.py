@@ -0,0 +1,105 @@
+import asyncio
+import base64
+import json
+from typing import Awaitable, Callable, Dict, Optional
+
+
+class AudioFramer:
+    """Coalesces Gemini Live PCM parts into fixed-duration client frames.
+
+    Gemini streams many small ``inline_data`` parts per turn. Sending each as
+    its own WebSocket message costs a JSON/base64 round and a client-side copy
+    per part. The framer buffers PCM and emits ``{"audio": ...}`` messages of
+    exactly ``frame_ms`` of audio; a partial frame is flushed once it has
+    waited ``flush_ms``, and ``end_turn()`` flushes and sends a
+    ``{"turn_complete": true}`` marker so the client can tell a finished turn
+    from an underrun. ``on_first_frame`` is called once the first audio frame
+    has actually been sent.
+    """
+
+    def __init__(self, send: Callable[[str], Awaitable[None]], frame_ms: int = 100, flush_ms: int = 40,
+                 sample_rate: int = 24000, sample_width: int = 2,
+                 on_first_frame: Optional[Callable[[], None]] = None):
+        self.send = send
+        self.on_first_frame = on_first_frame
+        self.frame_bytes = sample_rate * sample_width * frame_ms // 1000
+        self.frame_bytes -= self.frame_bytes % sample_width
+        self.flush_delay = flush_ms / 1000
+        self._buffer = bytearray()
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+        self.parts_in = 0
+        self.bytes_in = 0
+        self.frames_out = 0
+        self.messages_out = 0
+        self.bytes_out = 0
+
+    async def _send(self, payload: Dict):
+        message = json.dumps(payload)
+        self.messages_out += 1
+        self.bytes_out += len(message)
+        await self.send(message)
+
+    async def _emit(self, pcm: bytes):
+        await self._send({"audio": base64.b64encode(pcm).decode("utf-8")})
+        self.frames_out += 1
+        if self.frames_out == 1 and self.on_first_frame is not None:
+            self.on_first_frame()
+
+    async def push(self, pcm: bytes):
+        """Buffer a PCM part and send every complete frame."""
+        self.parts_in += 1
+        self.bytes_in += len(pcm)
+        async with self._lock:
+            self._buffer += pcm
+            while len(self._buffer) >= self.frame_bytes:
+                frame = bytes(self._buffer[:self.frame_bytes])
+                del self._buffer[:self.frame_bytes]
+                await self._emit(frame)
+            if self._buffer and self._timer is None:
+                self._timer = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        try:
+            await asyncio.sleep(self.flush_delay)
+            self._timer = None
+            await self.flush()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print("Error flushing audio to client:", e)
+
+    async def flush(self):
+        """Send whatever partial frame is buffered."""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+        async with self._lock:
+            if self._buffer:
+                frame = bytes(self._buffer)
+                self._buffer.clear()
+                await self._emit(frame)
+
+    async def send_text(self, text: str):
+        """Send a text part after any audio buffered before it."""
+        await self.flush()
+        await self._send({"text": text})
+
+    async def end_turn(self):
+        await self.flush()
+        await self._send({"turn_complete": True})
+
+    def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def stats(self) -> Dict:
+        return {
+            "parts_in": self.parts_in,
+            "bytes_in": self.bytes_in,
+            "frames_out": self.frames_out,
+            "messages_out": self.messages_out,
+            "bytes_out": self.bytes_out,
+        }
@@ -0,0 +1,134 @@
+"""Live output audio: per-part messages vs. AudioFramer frames + ring-buffer playback.
+
+Replays a synthetic Gemini Live output stream (small PCM parts arriving in
+jittery bursts) through both server paths, then simulates client playback of
+each message stream with the old copy-on-every-message worklet and the new
+ring-buffer worklet. Reports messages/s, bytes on the wire, samples copied on
+the client and playback underruns.
+
+    python benchmarks/bench_audio_framing.py --turns 3 --turn-seconds 4
+"""
+import argparse
+import asyncio
+import base64
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from audio_framing import AudioFramer  # noqa: E402
+
+SAMPLE_RATE = 24000
+BLOCK = 128
+TURN_END = "<turn end>"
+
+
+def synth_parts(turns: int, turn_seconds: float, seed: int = 3):
+    """Yield (delay_before, pcm_bytes | None); None marks turn_complete."""
+    rng = random.Random(seed)
+    for _ in range(turns):
+        sent = 0.0
+        while sent < turn_seconds:
+            ms = rng.choice([20, 40, 40, 60, 80])
+            # Upstream runs ~1.3x realtime on average, with bursts and stalls
+            delay = ms / 1000 / 1.3 * rng.choice([0.2, 0.5, 1.0, 1.0, 1.5, 2.5])
+            yield delay, bytes(SAMPLE_RATE * 2 * ms // 1000)
+            sent += ms / 1000
+        yield 0.0, None
+        yield 0.5, b""  # user speaks again
+
+
+async def run_server(parts, framed: bool):
+    log = []
+    start = time.monotonic()
+
+    async def send(message: str):
+        log.append((time.monotonic() - start, message))
+
+    framer = AudioFramer(send)
+    for delay, pcm in parts:
+        await asyncio.sleep(delay)
+        if pcm is None:
+            if framed:
+                await framer.end_turn()
+            else:
+                # Ground truth for the client simulation only; not sent or counted
+                log.append((time.monotonic() - start, TURN_END))
+            continue
+        if not pcm:
+            continue
+        if framed:
+            await framer.push(pcm)
+        else:
+            await send(json.dumps({"audio": base64.b64encode(pcm).decode("utf-8")}))
+    await framer.flush()
+    return log, time.monotonic() - start
+
+
+def simulate_client(log, ring: bool, jitter_ms: float, seed: int = 5):
+    """Play a message log in virtual time; return (underruns, samples_copied).
+
+    An underrun is playback running dry before the turn has ended.
+    """
+    rng = random.Random(seed)
+    arrivals = sorted((t + rng.uniform(0, jitter_ms) / 1000, m) for t, m in log)
+    quantum = BLOCK / SAMPLE_RATE
+    now, i = 0.0, 0
+    buffered, copied, underruns = 0, 0, 0
+    playing, turn_complete = False, False
+    end = arrivals[-1][0] + 5 if arrivals else 0
+
+    while now < end:
+        while i < len(arrivals) and arrivals[i][0] <= now:
+            message = arrivals[i][1]
+            data = {"turn_complete": True} if message == TURN_END else json.loads(message)
+            if "audio" in data:
+                samples = len(base64.b64decode(data["audio"])) // 2
+                # Old worklet reallocates and copies the whole pending buffer per message
+                copied += samples if ring else buffered + samples
+                buffered += samples
+                turn_complete = False
+            elif data.get("turn_complete"):
+                turn_complete = True
+            i += 1
+
+        start_at = SAMPLE_RATE // 10 if ring else BLOCK
+        if not playing and (buffered >= start_at or (turn_complete and buffered)):
+            playing = True
+        if playing:
+            take = min(BLOCK, buffered) if ring or buffered >= BLOCK else 0
+            # Old worklet: slice(0, n) plus slice(n) of the remainder every block
+            copied += take if ring else buffered
+            buffered -= take
+            if take < BLOCK:
+                underruns += 0 if turn_complete else 1
+                playing = False
+        now += quantum
+    return underruns, copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--turn-seconds", type=float, default=4.0)
+    parser.add_argument("--jitter-ms", type=float, default=30.0)
+    args = parser.parse_args()
+
+    parts = list(synth_parts(args.turns, args.turn_seconds))
+    print(f"{sum(1 for _, p in parts if p):d} upstream parts, {args.turns} turns")
+    print(f"{'path':<26}{'msgs':>7}{'msgs/s':>9}{'wire KB':>10}{'copied Ksamples':>17}{'underruns':>11}")
+    for label, framed, ring in (("per-part + copy worklet", False, False), ("framed + ring worklet", True, True)):
+        log, elapsed = asyncio.run(run_server(parts, framed))
+        sent = [m for _, m in log if m != TURN_END]
+        audio_msgs = [m for m in sent if '"audio"' in m]
+        wire = sum(len(m) for m in sent)
+        underruns, copied = simulate_client(log, ring, args.jitter_ms)
+        print(f"{label:<26}{len(audio_msgs):>7}{len(audio_msgs) / elapsed:>9.1f}{wire / 1024:>10.1f}"
+              f"{copied / 1000:>17.1f}{underruns:>11}")
+
+
+if __name__ == "__main__":
+    main()
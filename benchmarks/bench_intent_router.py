@@ -0,0 +1,127 @@
+"""Microbenchmark: compiled intent router vs. the old keyword scans.
+
+Run from the repository root:
+
+    python benchmarks/bench_intent_router.py --messages 200000
+"""
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from intent_router import IntentRouter  # noqa: E402
+
+
+ALWAYS_SEARCH = [
+    "date", "2025", "2024", "when", "cutoff", "admission", "latest",
+    "current", "fees", "ranking", "eligibility", "notification",
+    "result", "exam", "application", "form", "last date"
+]
+SEARCH_TRIGGERS = [
+    "jee", "neet", "clat", "gate", "cat", "mat", "xat",
+    "iit", "nit", "iiit", "aiims", "jipmer"
+]
+PHRASES = [
+    "career option", "what should i", "which course", "best college",
+    "how to get", "admission process"
+]
+
+FILLER = (
+    "i am feeling confused about my future and my parents want me to choose "
+    "something quickly so please help me understand the options available "
+    "education science commerce arts engineering medicine design law"
+).split()
+
+
+def legacy_should_search(message: str) -> bool:
+    message_lower = message.lower()
+    if any(term in message_lower for term in ALWAYS_SEARCH):
+        return True
+    if any(term in message_lower for term in SEARCH_TRIGGERS):
+        return True
+    return any(phrase in message_lower for phrase in PHRASES)
+
+
+def legacy_rewrite(user_message: str) -> str:
+    message_lower = user_message.lower()
+    if "jee" in message_lower and ("2025" in message_lower or "date" in message_lower):
+        return "JEE Main 2025 exam dates official NTA schedule"
+    if "neet" in message_lower and ("2025" in message_lower or "date" in message_lower):
+        return "NEET 2025 exam date official NTA notification"
+    if any(term in message_lower for term in ["after 10th", "10th class"]):
+        return "career options after 10th class India 2024 2025"
+    elif any(term in message_lower for term in ["after 12th", "12th class"]):
+        return "career options after 12th India 2024 2025"
+    elif "cutoff" in message_lower:
+        return f"college cutoff 2024 India admission {user_message}"
+    elif "admission" in message_lower:
+        return f"college admission process 2024 2025 India {user_message}"
+    return f"{user_message} India 2024 2025 official"
+
+
+def build_corpus(size: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    keywords = ALWAYS_SEARCH + SEARCH_TRIGGERS + PHRASES + ["after 10th", "12th class"]
+    corpus = []
+    for _ in range(size):
+        words = rng.choices(FILLER, k=rng.randint(6, 40))
+        if rng.random() < 0.6:
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        corpus.append(" ".join(words).capitalize() + "?")
+    return corpus
+
+
+def timeit(cases: dict, corpus: list, repeat: int) -> dict:
+    """Best of ``repeat`` interleaved passes per case, so scheduler noise hits every case alike."""
+    best = dict.fromkeys(cases, float("inf"))
+    for _ in range(repeat):
+        for label, fn in cases.items():
+            start = time.perf_counter()
+            for message in corpus:
+                fn(message)
+            best[label] = min(best[label], time.perf_counter() - start)
+    for label, elapsed in best.items():
+        print(f"{label:<28} {elapsed * 1000:9.1f} ms  {elapsed / len(corpus) * 1e6:7.2f} us/msg")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=100_000)
+    parser.add_argument("--rules", default="prompts/intent_rules.json")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.messages)
+    router = IntentRouter(Path(args.rules))
+
+    print(f"Corpus: {len(corpus)} messages, {sum(map(len, corpus)) / len(corpus):.0f} chars avg")
+    best = timeit({
+        "legacy search+rewrite": lambda m: (legacy_should_search(m), legacy_rewrite(m)),
+        "router search+rewrite": lambda m: (router.search_rule(m), router.rewrite_query(m)),
+        "router single scan": router.rules.scan,
+    }, corpus, args.repeat)
+    legacy, routed = best["legacy search+rewrite"], best["router search+rewrite"]
+    print(f"Speedup: {legacy / routed:.2f}x")
+
+    # Substring terms that fired where the router declined, e.g. "cat" inside "education"
+    dropped, dropped_by, added = 0, Counter(), 0
+    for m in corpus:
+        legacy_hit, routed_hit = legacy_should_search(m), router.search_rule(m) is not None
+        if legacy_hit and not routed_hit:
+            dropped += 1
+            lower = m.lower()
+            dropped_by.update(t for t in ALWAYS_SEARCH + SEARCH_TRIGGERS + PHRASES if t in lower)
+        elif routed_hit and not legacy_hit:
+            added += 1
+    print(f"Search decisions dropped (term only inside a longer word): {dropped} {dict(dropped_by)}")
+    print(f"Search decisions added: {added}")
+    print("Rule hits:", dict(router.hits.most_common(10)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Prompt tokens with and without search-context compression on a fixed query set.
+
+The result sets mimic SerpApi responses, where the answer box, knowledge
+graph and organic results often repeat the same passage. With --generate
+(needs Vertex AI credentials) each prompt is also sent to the model to
+compare generation latency.
+
+    python benchmarks/bench_search_context.py [--budget 600] [--generate]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from search_context import build_search_context  # noqa: E402
+
+JEE_DATES = (
+    "NTA has released the JEE Main 2025 session 1 exam schedule. The exam will be held from "
+    "January 22 to January 31, 2025 and session 2 from April 1 to April 8, 2025. Candidates can "
+    "download the admit card from jeemain.nta.nic.in three days before the exam."
+)
+NEET_DATE = (
+    "NEET UG 2025 will be conducted on May 4, 2025 in pen and paper mode. The National Testing "
+    "Agency will release the application form on its official website neet.nta.nic.in."
+)
+AFTER_12TH = (
+    "After 12th science, students can choose engineering (B.Tech), medicine (MBBS, BDS), pure "
+    "sciences (B.Sc), architecture, pharmacy or defence careers through NDA. Commerce students "
+    "often pursue B.Com, CA, CS or BBA, while arts students can opt for BA, law or design."
+)
+CUTOFF = (
+    "JoSAA 2024 closing ranks for IIT Bombay computer science were 68 for the general category. "
+    "NIT Trichy CSE closed at 1,005 in the other state quota."
+)
+
+
+def variants(text: str, source: str, n: int):
+    """n near-duplicate copies of a passage, lightly reworded like real snippets."""
+    words = text.split()
+    out = []
+    for i in range(n):
+        cut = words[: len(words) - i * 2] if i else words
+        out.append({
+            "title": f"{source} result {i + 1}",
+            "snippet": " ".join(cut) + (" Read more." if i % 2 else ""),
+            "link": f"https://example.org/{source.lower().replace(' ', '-')}/{i}",
+            "source": source if i == 0 else "Google Search",
+        })
+    return out
+
+
+QUERY_SET = [
+    ("When is JEE Main 2025?", "JEE Main 2025 exam dates official NTA schedule",
+     variants(JEE_DATES, "Google Answer Box", 4) + variants(NEET_DATE, "Google Search", 1)
+     + variants(CUTOFF, "Google Search", 1)),
+    ("NEET 2025 exam date", "NEET 2025 exam date official NTA notification",
+     variants(NEET_DATE, "Google Knowledge Graph", 3) + variants(JEE_DATES, "Google Search", 2)),
+    ("What should I do after 12th?", "career options after 12th India 2024 2025",
+     variants(AFTER_12TH, "Google Answer Box", 3) + variants(CUTOFF, "Google Search", 2)
+     + variants(NEET_DATE, "Google Search", 1)),
+    ("IIT Bombay CSE cutoff", "college cutoff 2024 India admission IIT Bombay CSE cutoff",
+     variants(CUTOFF, "Official Education Sites", 4) + variants(AFTER_12TH, "Google Search", 2)),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=int, default=600)
+    parser.add_argument("--generate", action="store_true", help="also time generation with Vertex AI")
+    args = parser.parse_args()
+
+    model = None
+    if args.generate:
+        from models import MODEL as model
+
+    # "build ms" is the time to dedupe, rank and pack the context, not model latency (see --generate)
+    total_before = total_after = 0
+    print(f"{'message':<32}{'results':>8}{'dupes':>7}{'packed':>8}{'tok before':>12}{'tok after':>11}{'saved':>8}"
+          f"{'build ms':>10}")
+    for message, query, results in QUERY_SET:
+        naive_context, _ = build_search_context(query, "SerpApi", results, message,
+                                                token_budget=10 ** 9, dedup_threshold=1.01)
+        start = time.perf_counter()
+        context, report = build_search_context(query, "SerpApi", results, message, token_budget=args.budget)
+        build_ms = (time.perf_counter() - start) * 1000
+        total_before += report["tokens_before"]
+        total_after += report["tokens_after"]
+        saved = 1 - report["tokens_after"] / report["tokens_before"]
+        print(f"{message:<32}{report['results']:>8}{report['duplicates']:>7}{report['packed']:>8}"
+              f"{report['tokens_before']:>12}{report['tokens_after']:>11}{saved:>8.0%}"
+              f"{build_ms:>10.2f}")
+
+        if model is not None:
+            for label, block in (("naive", naive_context), ("compressed", context)):
+                start = time.perf_counter()
+                model.generate_content([f"{block}\nCURRENT USER QUESTION: {message}"])
+                print(f"    generate ({label}): {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    print(f"Total prompt tokens from search: {total_before} -> {total_after} "
+          f"({1 - total_after / total_before:.0%} saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Session journal: write throughput and recovery time for many sessions.
+
+Writes --sessions conversations of --messages history entries (10% of them
+switched to voice_assistant mode) through the journal, then times recovery
+from the raw journal and from a compacted snapshot: the startup index
+(what blocks serving), the first lazy restore, and restoring everything.
+A naive eager replay of the same events from JSON lines is the baseline.
+
+    python benchmarks/bench_session_journal.py --sessions 100000 --messages 8
+"""
+import argparse
+import json
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from session_journal import SessionJournal, apply_event, new_state  # noqa: E402
+
+USER_TEXT = "I have my JEE exam next week and I can't sleep, I keep worrying I'll fail."
+ASSISTANT_TEXT = ("That sounds really stressful. It's normal to feel anxious before a big exam. "
+                  "Let's try a short breathing exercise together, and then plan your revision.")
+
+
+def events(sessions: int, messages: int):
+    for i in range(sessions):
+        sid = f"session-{i:06d}"
+        for k in range(messages):
+            yield sid, {"h": ["user" if k % 2 == 0 else "assistant", USER_TEXT if k % 2 == 0 else ASSISTANT_TEXT]}
+        if i % 10 == 0:
+            yield sid, {"m": "voice_assistant"}
+
+
+def size_mb(directory: Path) -> float:
+    return sum(p.stat().st_size for p in directory.iterdir()) / 2 ** 20
+
+
+def time_recovery(directory: Path, session_ids):
+    journal = SessionJournal(str(directory))
+    start = time.perf_counter()
+    indexed = journal.load()
+    load = time.perf_counter() - start
+
+    middle = session_ids[len(session_ids) // 2]
+    start = time.perf_counter()
+    first_state = journal.restore(middle)
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    states = {sid: journal.restore(sid) for sid in session_ids}
+    everything = time.perf_counter() - start
+    states[middle] = first_state
+    journal.close()
+    return indexed, load, first, everything, states
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100000)
+    parser.add_argument("--messages", type=int, default=8)
+    parser.add_argument("--no-fsync", action="store_true")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="journal-bench-"))
+    try:
+        directory = root / "journal"
+        journal = SessionJournal(str(directory), fsync=not args.no_fsync)
+        journal.load()
+        journal.start_writer()
+        start = time.perf_counter()
+        count = 0
+        for sid, event in events(args.sessions, args.messages):
+            journal.append(sid, event)
+            count += 1
+        enqueue = time.perf_counter() - start
+        journal.flush(timeout=600)
+        written = time.perf_counter() - start
+        journal.close()
+        print(f"Wrote {count} events for {args.sessions} sessions: append {enqueue / count * 1e6:.2f} us/event "
+              f"on the caller, {count / written:.0f} events/s committed in {journal.counters['batches']} "
+              f"group commits, {size_mb(directory):.1f} MB")
+
+        session_ids = [f"session-{i:06d}" for i in range(args.sessions)]
+        print(f"\n{'recovery from':<22}{'sessions':>10}{'index (ms)':>12}{'first (ms)':>12}{'all (s)':>10}{'MB':>8}")
+        indexed, load, first, everything, states = time_recovery(directory, session_ids)
+        print(f"{'journal':<22}{indexed:>10}{load * 1000:>12.0f}{first * 1000:>12.3f}{everything:>10.2f}"
+              f"{size_mb(directory):>8.1f}")
+
+        journal = SessionJournal(str(directory))
+        journal.load()
+        journal.start_writer()
+        journal.snapshot(states)
+        journal.flush(timeout=600)
+        journal.close()
+        print(f"    snapshot of {len(states)} sessions written in {journal.last_snapshot_seconds:.2f}s "
+              f"off the event loop")
+        indexed, load, first, everything, _ = time_recovery(directory, session_ids)
+        print(f"{'snapshot':<22}{indexed:>10}{load * 1000:>12.0f}{first * 1000:>12.3f}{everything:>10.2f}"
+              f"{size_mb(directory):>8.1f}")
+
+        # Baseline: one JSON line per event, replayed eagerly before serving
+        lines = root / "events.jsonl"
+        with open(lines, "w", encoding="utf-8") as f:
+            for sid, event in events(args.sessions, args.messages):
+                f.write(json.dumps({"session_id": sid, "event": event}) + "\n")
+        start = time.perf_counter()
+        eager = {}
+        with open(lines, encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                sid = entry["session_id"]
+                eager[sid] = apply_event(eager.get(sid) or new_state(), entry["event"])
+        replay = time.perf_counter() - start
+        print(f"{'eager JSONL replay':<22}{len(eager):>10}{replay * 1000:>12.0f}{'-':>12}{replay:>10.2f}"
+              f"{lines.stat().st_size / 2 ** 20:>8.1f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
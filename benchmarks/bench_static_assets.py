@@ -0,0 +1,183 @@
+"""Bytes transferred and requests per page load, before and after the asset pipeline.
+
+Builds fingerprinted/precompressed assets into a temporary copy of static/,
+then drives two in-process apps through ASGI like a browser would: a first
+visit (index, stylesheet, script and the audio worklet) and a repeat visit
+with a warm cache, where only resources without long-lived caching are
+revalidated. Also compares a /chat JSON reply carrying an HTML career answer
+and the cost of serving the index page.
+
+    python benchmarks/bench_static_assets.py
+"""
+import asyncio
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fastapi import FastAPI, Request  # noqa: E402
+from fastapi.middleware.gzip import GZipMiddleware  # noqa: E402
+from fastapi.responses import HTMLResponse, JSONResponse  # noqa: E402
+from fastapi.staticfiles import StaticFiles  # noqa: E402
+from fastapi.templating import Jinja2Templates  # noqa: E402
+
+import build_assets  # noqa: E402
+from static_assets import AssetManifest, CachedPage, PrecompressedStaticFiles  # noqa: E402
+
+ASSET_URL = re.compile(r"""["'](/static/[^"']+)["']""")
+BROWSER_HEADERS = [("accept-encoding", "gzip, deflate, br")]
+
+CAREER_SECTION = (
+    "<h3>{title}</h3><ul><li><strong>Eligibility:</strong> 10+2 with Physics, Chemistry and Mathematics, "
+    "minimum 75% aggregate for IITs/NITs.</li><li><strong>Entrance exams:</strong> JEE Main (January and April "
+    "sessions), JEE Advanced for IITs, state CETs such as MHT-CET and KCET.</li><li><strong>Top colleges:</strong> "
+    "IIT Bombay, IIT Delhi, NIT Trichy, BITS Pilani, IIIT Hyderabad.</li><li><strong>Career paths:</strong> "
+    "software engineer, data scientist, product manager, research, higher studies (MS/M.Tech).</li></ul>"
+)
+CAREER_REPLY = "<div class='career-answer'>" + "".join(
+    CAREER_SECTION.format(title=title) for title in
+    ("Computer Science Engineering", "Electronics and Communication", "Mechanical Engineering",
+     "Data Science", "Architecture")
+) + "<p>Based on current search results, JEE Main 2025 session 1 runs January 22-31.</p></div>"
+
+
+def make_apps(static_dir: Path):
+    templates = Jinja2Templates(directory=str(ROOT / "templates"))
+
+    before = FastAPI()
+    before.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+    plain = AssetManifest(Path("/nonexistent"))
+    templates.env.globals["asset_url"] = plain.url
+
+    @before.get("/", response_class=HTMLResponse)
+    async def home_before(request: Request):
+        return HTMLResponse(templates.get_template("index.html").render(asset_url=plain.url))
+
+    @before.get("/chat")
+    async def chat_before():
+        return JSONResponse({"reply": CAREER_REPLY, "mode": "text", "search_performed": True})
+
+    after = FastAPI()
+    after.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+    after.mount("/static", PrecompressedStaticFiles(directory=str(static_dir)), name="static")
+    built = AssetManifest(static_dir / "build" / "manifest.json")
+    page = CachedPage(lambda: templates.get_template("index.html").render(asset_url=built.url))
+
+    @after.get("/", response_class=HTMLResponse)
+    async def home_after(request: Request):
+        return page.response(request)
+
+    @after.get("/chat")
+    async def chat_after():
+        return JSONResponse({"reply": CAREER_REPLY, "mode": "text", "search_performed": True})
+
+    return before, after
+
+
+async def get(app, path: str, headers=()):
+    """One GET through the ASGI app; returns (status, headers, body, bytes on the wire)."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(k.encode(), v.encode()) for k, v in headers], "client": ("127.0.0.1", 1),
+        "server": ("testserver", 80),
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+    start = messages[0]
+    body = b"".join(m.get("body", b"") for m in messages[1:])
+    header_bytes = sum(len(k) + len(v) + 4 for k, v in start["headers"]) + 17
+    return start["status"], {k.decode(): v.decode() for k, v in start["headers"]}, body, header_bytes + len(body)
+
+
+def decode(body: bytes, encoding: str) -> str:
+    if encoding == "gzip":
+        import gzip
+        return gzip.decompress(body).decode()
+    if encoding == "br":
+        import brotli
+        return brotli.decompress(body).decode()
+    return body.decode()
+
+
+async def page_load(app, cache: dict):
+    """Load / and its assets like a browser; returns (requests, bytes)."""
+    requests = transferred = 0
+    queue, seen = ["/"], set()
+    while queue:
+        path = queue.pop(0)
+        if path in seen:
+            continue
+        seen.add(path)
+        cached = cache.get(path)
+        if cached and ("immutable" in cached["cache-control"] or "max-age" in cached["cache-control"]):
+            text = cached["text"]
+        else:
+            headers = list(BROWSER_HEADERS)
+            if cached and cached.get("etag"):
+                headers.append(("if-none-match", cached["etag"]))
+            if cached and cached.get("last-modified"):
+                headers.append(("if-modified-since", cached["last-modified"]))
+            status, response_headers, body, wire = await get(app, path, headers)
+            requests += 1
+            transferred += wire
+            if status == 304:
+                text = cached["text"]
+            else:
+                text = decode(body, response_headers.get("content-encoding", ""))
+                cache[path] = {
+                    "text": text,
+                    "etag": response_headers.get("etag"),
+                    "last-modified": response_headers.get("last-modified"),
+                    "cache-control": response_headers.get("cache-control", ""),
+                }
+        if path == "/" or path.endswith((".js", ".css")):
+            queue += [url for url in ASSET_URL.findall(text) if url not in seen]
+    return requests, transferred
+
+
+async def run():
+    workdir = Path(tempfile.mkdtemp(prefix="assets-bench-"))
+    try:
+        static_dir = workdir / "static"
+        shutil.copytree(ROOT / "static", static_dir, ignore=shutil.ignore_patterns("build"))
+        build_assets.build(static_dir, static_dir / "build")
+        before, after = make_apps(static_dir)
+
+        print(f"{'':<10}{'first visit':>22}{'repeat visit':>22}")
+        for label, app in (("before", before), ("after", after)):
+            cache = {}
+            first = await page_load(app, cache)
+            repeat = await page_load(app, cache)
+            print(f"{label:<10}{first[0]:>8} req {first[1] / 1024:>7.1f} KB{repeat[0]:>8} req {repeat[1] / 1024:>7.1f} KB")
+
+        for label, app in (("before", before), ("after", after)):
+            _, headers, _, wire = await get(app, "/chat", BROWSER_HEADERS)
+            print(f"/chat career reply ({label}): {wire / 1024:.1f} KB {headers.get('content-encoding', 'identity')}")
+
+        for label, app in (("before", before), ("after", after)):
+            await get(app, "/", BROWSER_HEADERS)
+            start = time.perf_counter()
+            for _ in range(500):
+                await get(app, "/", BROWSER_HEADERS)
+            print(f"GET / ({label}): {(time.perf_counter() - start) / 500 * 1e6:.0f} us per request")
+        if build_assets.brotli is None:
+            print("(brotli not installed: 'after' used gzip variants)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(run())
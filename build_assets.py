@@ -0,0 +1,92 @@
+"""Fingerprint and precompress static assets into static/build/.
+
+Each file in static/ is copied to build/<name>.<content hash>.<ext>, with
+references to other assets ("/static/pcm-processor.js") rewritten to their
+fingerprinted URLs, and written alongside .gz and .br (if the brotli package
+is installed) variants. build/manifest.json maps original names to built
+ones for asset_url(). Run at image build time:
+
+    python build_assets.py
+"""
+import gzip
+import hashlib
+import json
+import shutil
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip-only builds still work
+    brotli = None
+
+STATIC_DIR = Path("static")
+BUILD_DIR = STATIC_DIR / "build"
+MANIFEST = BUILD_DIR / "manifest.json"
+TEXT_SUFFIXES = {".js", ".css", ".html", ".svg", ".json", ".txt"}
+# Compressing tiny files costs more in headers than it saves
+MIN_COMPRESS_BYTES = 256
+
+
+def fingerprint(name: str, content: bytes) -> str:
+    path = Path(name)
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    return str(path.with_name(f"{path.stem}.{digest}{path.suffix}").as_posix())
+
+
+def build(static_dir: Path = STATIC_DIR, build_dir: Path = BUILD_DIR) -> dict:
+    if build_dir.exists():
+        shutil.rmtree(build_dir)
+    sources = {
+        path.relative_to(static_dir).as_posix(): path.read_bytes()
+        for path in sorted(static_dir.rglob("*"))
+        if path.is_file() and build_dir not in path.parents
+    }
+
+    # A file's hash covers the rewritten URLs of what it references, so build dependencies first
+    manifest = {}
+    remaining = dict(sources)
+    while remaining:
+        progressed = False
+        for name, content in list(remaining.items()):
+            refs = [other for other in sources if other != name and f"/static/{other}".encode() in content]
+            if Path(name).suffix in TEXT_SUFFIXES and any(ref not in manifest for ref in refs):
+                continue
+            if Path(name).suffix in TEXT_SUFFIXES:
+                for ref in refs:
+                    content = content.replace(f"/static/{ref}".encode(), f"/static/{manifest[ref]}".encode())
+            built = "build/" + fingerprint(name, content)
+            target = static_dir / built
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(content)
+            if Path(name).suffix in TEXT_SUFFIXES and len(content) >= MIN_COMPRESS_BYTES:
+                # mtime=0 keeps the .gz byte-identical across builds
+                target.with_name(target.name + ".gz").write_bytes(gzip.compress(content, 9, mtime=0))
+                if brotli is not None:
+                    target.with_name(target.name + ".br").write_bytes(brotli.compress(content, quality=11))
+            manifest[name] = built
+            del remaining[name]
+            progressed = True
+        if not progressed:
+            raise SystemExit(f"Circular asset references between: {', '.join(remaining)}")
+
+    build_dir.mkdir(parents=True, exist_ok=True)
+    (build_dir / MANIFEST.name).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return manifest
+
+
+def main():
+    manifest = build()
+    for name, built in sorted(manifest.items()):
+        target = STATIC_DIR / built
+        sizes = [f"{target.stat().st_size} B"]
+        for suffix in (".gz", ".br"):
+            variant = target.with_name(target.name + suffix)
+            if variant.exists():
+                sizes.append(f"{suffix[1:]} {variant.stat().st_size} B")
+        print(f"{name:<22} -> {built:<40} {', '.join(sizes)}")
+    if brotli is None:
+        print("brotli not installed: built gzip variants only")
+
+
+if __name__ == "__main__":
+    main()
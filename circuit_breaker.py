@@ -0,0 +1,186 @@
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from config import BREAKER_WINDOW_SECONDS, BREAKER_MIN_CALLS, BREAKER_ERROR_RATE, BREAKER_OPEN_SECONDS
+from config import BREAKER_MIN_TIMEOUT_SECONDS
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open."""
+
+    def __init__(self, name: str):
+        super().__init__(f"circuit '{name}' is open")
+        self.name = name
+
+
+class CircuitBreaker:
+    """Rolling-window circuit breaker for one outbound provider.
+
+    Outcomes from the last ``window`` seconds decide the state. Once at least
+    ``min_calls`` were seen and the error rate reaches ``error_rate`` the
+    breaker opens and callers are refused immediately. After ``open_seconds``
+    one probe is let through (half-open); its outcome closes or re-opens the
+    breaker. Calls slower than ``slow_call_seconds`` count as errors, and so
+    do timeouts of at least ``min_timeout`` seconds; a shorter timeout says
+    more about the caller's budget than about the provider.
+    """
+
+    def __init__(self, name: str, window: float = BREAKER_WINDOW_SECONDS, min_calls: int = BREAKER_MIN_CALLS,
+                 error_rate: float = BREAKER_ERROR_RATE, open_seconds: float = BREAKER_OPEN_SECONDS,
+                 slow_call_seconds: Optional[float] = None, min_timeout: float = BREAKER_MIN_TIMEOUT_SECONDS):
+        self.name = name
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate
+        self.open_seconds = open_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.min_timeout = min_timeout
+
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.probe_started_at = 0.0
+        self.rejected = 0
+        self.transitions = 0
+        self._calls = deque()
+
+    def _prune(self, now: float):
+        while self._calls and now - self._calls[0][0] > self.window:
+            self._calls.popleft()
+
+    def _set_state(self, state: str):
+        if state != self.state:
+            print(f"⚡ Circuit '{self.name}': {self.state} -> {state}")
+            self.state = state
+            self.transitions += 1
+
+    def allow(self) -> bool:
+        """Return True if a call may go out now; every True should be followed by a record_*()."""
+        now = time.monotonic()
+        if self.state == OPEN and now - self.opened_at >= self.open_seconds:
+            self._set_state(HALF_OPEN)
+        if self.state == CLOSED:
+            return True
+        # A probe that never reported back (e.g. cancelled) stops blocking after open_seconds
+        if self.state == HALF_OPEN and (not self.probe_in_flight or now - self.probe_started_at >= self.open_seconds):
+            self.probe_in_flight = True
+            self.probe_started_at = now
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self, latency: float = 0.0):
+        if self.slow_call_seconds is not None and latency > self.slow_call_seconds:
+            self.record_failure(latency)
+            return
+        self._record(True, latency)
+        if self.state == HALF_OPEN:
+            self.probe_in_flight = False
+            self._calls.clear()
+            self._set_state(CLOSED)
+
+    def record_failure(self, latency: float = 0.0):
+        self._record(False, latency)
+        if self.state == HALF_OPEN:
+            self.probe_in_flight = False
+            self._open()
+        elif self.state == CLOSED:
+            calls = len(self._calls)
+            if calls >= self.min_calls and self.error_rate() >= self.error_rate_threshold:
+                self._open()
+
+    def record_timeout(self, timeout: Optional[float], latency: float = 0.0):
+        """Record a timed-out call; too short a timeout is the caller's problem, not the provider's."""
+        if timeout is not None and timeout < self.min_timeout:
+            self.release()
+        else:
+            self.record_failure(latency)
+
+    def release(self):
+        """Give back a half-open probe slot without recording an outcome."""
+        self.probe_in_flight = False
+
+    def _open(self):
+        self.opened_at = time.monotonic()
+        self._set_state(OPEN)
+
+    def _record(self, ok: bool, latency: float):
+        now = time.monotonic()
+        self._calls.append((now, ok, latency))
+        self._prune(now)
+
+    def error_rate(self) -> float:
+        self._prune(time.monotonic())
+        if not self._calls:
+            return 0.0
+        return sum(1 for _, ok, _ in self._calls if not ok) / len(self._calls)
+
+    async def call(self, fn, *args, timeout: Optional[float] = None, **kwargs):
+        """Await ``fn(*args, **kwargs)`` through the breaker.
+
+        Raises CircuitOpenError without calling ``fn`` when the breaker is
+        open. A timeout counts as a failure unless ``timeout`` was shorter
+        than ``min_timeout``; cancellation from the caller never does.
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        start = time.monotonic()
+        try:
+            if timeout is None:
+                result = await fn(*args, **kwargs)
+            else:
+                result = await asyncio.wait_for(fn(*args, **kwargs), timeout)
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        except asyncio.TimeoutError:
+            self.record_timeout(timeout, time.monotonic() - start)
+            raise
+        except Exception:
+            self.record_failure(time.monotonic() - start)
+            raise
+        self.record_success(time.monotonic() - start)
+        return result
+
+    def health(self) -> float:
+        """0.0 (failing) to 1.0 (healthy) from the rolling error rate and breaker state."""
+        if self.state == OPEN:
+            return 0.0
+        score = 1.0 - self.error_rate()
+        return score / 2 if self.state == HALF_OPEN else score
+
+    def snapshot(self) -> Dict:
+        self._prune(time.monotonic())
+        latencies = sorted(latency for _, _, latency in self._calls)
+        p95 = latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)] if latencies else None
+        return {
+            "state": self.state,
+            "health": round(self.health(), 2),
+            "calls": len(self._calls),
+            "error_rate": round(self.error_rate(), 2),
+            "avg_latency_ms": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+            "p95_latency_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            "rejected": self.rejected,
+            "retry_in_s": round(max(self.open_seconds - (time.monotonic() - self.opened_at), 0), 1) if self.state == OPEN else None,
+        }
+
+
+BREAKERS: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """Return the shared breaker for a provider, creating it on first use."""
+    if name not in BREAKERS:
+        BREAKERS[name] = CircuitBreaker(name, **kwargs)
+    return BREAKERS[name]
+
+
+def breaker_snapshots() -> Dict[str, Dict]:
+    return {name: breaker.snapshot() for name, breaker in BREAKERS.items()}
@@ -22,6 +22,78 @@ LOCATION = os.getenv("LOCATION", "us-central1")
 MODEL_NAME = os.getenv("MODEL_NAME", "gemini-2.0-flash-001")
 LIVE_MODEL = os.getenv("LIVE_MODEL", "gemini-2.0-flash-exp")
 
+# /chat admission control
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "16"))
+ADMISSION_PER_SESSION = int(os.getenv("ADMISSION_PER_SESSION", "2"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "10"))
+
+# /chat time budget (seconds). Clients may ask for less, down to the minimum, via X-Request-Budget-Ms.
+CHAT_DEADLINE_SECONDS = float(os.getenv("CHAT_DEADLINE_SECONDS", "25"))
+CHAT_DEADLINE_MAX_SECONDS = float(os.getenv("CHAT_DEADLINE_MAX_SECONDS", "60"))
+CHAT_DEADLINE_MIN_SECONDS = float(os.getenv("CHAT_DEADLINE_MIN_SECONDS", "1"))
+SEARCH_MIN_BUDGET_SECONDS = float(os.getenv("SEARCH_MIN_BUDGET_SECONDS", "2"))
+GENERATION_MIN_BUDGET_SECONDS = float(os.getenv("GENERATION_MIN_BUDGET_SECONDS", "4"))
+CRISIS_CHECK_TIMEOUT_SECONDS = float(os.getenv("CRISIS_CHECK_TIMEOUT_SECONDS", "8"))
+TTS_MIN_BUDGET_SECONDS = float(os.getenv("TTS_MIN_BUDGET_SECONDS", "1.5"))
+TTS_TIMEOUT_SECONDS = float(os.getenv("TTS_TIMEOUT_SECONDS", "10"))
+
+# Per-provider circuit breakers: rolling window, minimum calls and error rate to open, and how long to stay open.
+# Timeouts shorter than BREAKER_MIN_TIMEOUT_SECONDS (a caller's tiny budget) don't count against a provider.
+BREAKER_WINDOW_SECONDS = float(os.getenv("BREAKER_WINDOW_SECONDS", "60"))
+BREAKER_MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "5"))
+BREAKER_ERROR_RATE = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))
+BREAKER_OPEN_SECONDS = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+BREAKER_MIN_TIMEOUT_SECONDS = float(os.getenv("BREAKER_MIN_TIMEOUT_SECONDS", "1"))
+
+# Opt-in: detect crisis/calm in the main generation request instead of a separate model call
+FUSED_CRISIS_DETECTION = os.getenv("FUSED_CRISIS_DETECTION", "false").lower() == "true"
+
+# Search results in the prompt: token budget and near-duplicate cutoff (estimated Jaccard)
+SEARCH_CONTEXT_TOKEN_BUDGET = int(os.getenv("SEARCH_CONTEXT_TOKEN_BUDGET", "600"))
+SEARCH_DEDUP_THRESHOLD = float(os.getenv("SEARCH_DEDUP_THRESHOLD", "0.6"))
+
+# Pre-warmed Gemini Live sessions (LIVE_POOL_MIN_IDLE=0 disables pre-warming)
+LIVE_POOL_MIN_IDLE = int(os.getenv("LIVE_POOL_MIN_IDLE", "1"))
+# Live sessions are capped at about 2 minutes with audio+video, counted from connect, so a
+# warm session handed out late would be cut off mid-conversation; keep this a small fraction
+LIVE_POOL_MAX_AGE_SECONDS = float(os.getenv("LIVE_POOL_MAX_AGE_SECONDS", "25"))
+LIVE_POOL_MAX_CONFIGS = int(os.getenv("LIVE_POOL_MAX_CONFIGS", "4"))
+
+# Live output audio framing: frame length and max wait for a partial frame
+LIVE_AUDIO_FRAME_MS = int(os.getenv("LIVE_AUDIO_FRAME_MS", "100"))
+LIVE_AUDIO_FLUSH_MS = int(os.getenv("LIVE_AUDIO_FLUSH_MS", "40"))
+
+# Live session capacity per instance, and how long SIGTERM waits for turns in progress
+LIVE_MAX_SESSIONS = int(os.getenv("LIVE_MAX_SESSIONS", "50"))
+LIVE_DRAIN_TIMEOUT_SECONDS = float(os.getenv("LIVE_DRAIN_TIMEOUT_SECONDS", "8"))
+
+# Live session load testing. LIVE_API_BASE_URL points the live client at loadtest/fake_live_server.py;
+# LIVE_RECORD_DIR records sessions for replay. Recordings hold user audio and camera frames, so
+# only set it on test deployments.
+LIVE_API_BASE_URL = os.getenv("LIVE_API_BASE_URL", "")
+LIVE_RECORD_DIR = os.getenv("LIVE_RECORD_DIR", "")
+
+# Opt-in session journal for warm restarts (unset/empty SESSION_JOURNAL_DIR keeps sessions in memory only).
+# Journals hold conversation history: on Cloud Run point it at a mounted volume, locally use e.g. data/sessions
+# (data/ is kept out of git and the image).
+SESSION_JOURNAL_DIR = os.getenv("SESSION_JOURNAL_DIR", "")
+SESSION_JOURNAL_FSYNC = os.getenv("SESSION_JOURNAL_FSYNC", "true").lower() == "true"
+SESSION_SNAPSHOT_SECONDS = float(os.getenv("SESSION_SNAPSHOT_SECONDS", "300"))
+SESSION_SNAPSHOT_MIN_RECORDS = int(os.getenv("SESSION_SNAPSHOT_MIN_RECORDS", "1000"))
+SESSION_SNAPSHOT_HISTORY = int(os.getenv("SESSION_SNAPSHOT_HISTORY", "50"))
+
+# /_debug/profile sampling profiler: disabled (404) unless a token is set; send it as X-Debug-Token
+DEBUG_PROFILER_TOKEN = os.getenv("DEBUG_PROFILER_TOKEN", "")
+DEBUG_PROFILER_MAX_SECONDS = float(os.getenv("DEBUG_PROFILER_MAX_SECONDS", "60"))
+
+# Static assets and response compression. Run build_assets.py to fingerprint/precompress static files;
+# CACHE_INDEX_PAGE=false re-renders the index template on every request (template development).
+ASSET_MANIFEST = Path(os.getenv("ASSET_MANIFEST", "static/build/manifest.json"))
+CACHE_INDEX_PAGE = os.getenv("CACHE_INDEX_PAGE", "true").lower() == "true"
+RESPONSE_GZIP_MIN_BYTES = int(os.getenv("RESPONSE_GZIP_MIN_BYTES", "1024"))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+
 
 
 # In-memory store
@@ -0,0 +1,47 @@
+import time
+from typing import List, Optional
+
+
+class Deadline:
+    """A request-scoped time budget shared by every stage of a /chat request.
+
+    Stages size their own timeouts from what is left instead of using fixed
+    per-call limits, and record a degradation when they are skipped or cut
+    short so the response can say what happened.
+    """
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+        self.degradations: List[str] = []
+
+    @classmethod
+    def from_header(cls, value: Optional[str], default: float, maximum: float,
+                    minimum: float = 0.0) -> "Deadline":
+        """Build a deadline from a budget header in milliseconds, clamped to [``minimum``, ``maximum``]."""
+        budget = default
+        if value:
+            try:
+                budget = float(value) / 1000
+            except ValueError:
+                pass
+        if budget != budget:  # NaN
+            budget = default
+        return cls(min(max(budget, minimum), maximum))
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def has(self, seconds: float) -> bool:
+        """True if at least ``seconds`` of budget are left."""
+        return self.remaining() >= seconds
+
+    def timeout(self, cap: Optional[float] = None, reserve: float = 0.0) -> float:
+        """Timeout for a stage: what is left after ``reserve``, capped at ``cap``."""
+        left = max(self.remaining() - reserve, 0.0)
+        return left if cap is None else min(cap, left)
+
+    def degrade(self, what: str):
+        if what not in self.degradations:
+            self.degradations.append(what)
+        print(f"⏱️ Degraded: {what} ({self.remaining():.2f}s left)")
@@ -0,0 +1,307 @@
+import asyncio
+import json
+import os
+import string
+import time
+from collections import Counter
+from itertools import compress
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+
+# The rules shipped with the app; INTENT_RULES_PATH can point elsewhere
+DEFAULT_RULES_PATH = Path(__file__).resolve().parent / "prompts" / "intent_rules.json"
+
+
+# ASCII punctuation separates words, so "cut-off", "cut off" and "cut, off" tokenize alike
+_SEPARATORS = bytes.maketrans(string.punctuation.encode(), b" " * len(string.punctuation))
+# Per-word lookup memo size; cleared when full, vocabularies are small in practice
+_MEMO_SIZE = 1 << 16
+
+
+def _tokens(text: str) -> List[bytes]:
+    """Lowercased words of text; bytes split in C is several times faster than a regex scan."""
+    return text.lower().encode("utf-8").translate(_SEPARATORS).split()
+
+
+def _normalize_term(term) -> str:
+    """Canonical form of a rule term; a trailing "*" (a prefix term) is kept."""
+    term = str(term).strip()
+    prefix = term.endswith("*")
+    words = b" ".join(_tokens(term)).decode("utf-8")
+    return words + "*" if prefix and words else words
+
+
+class _WordMemo(dict):
+    """Per-word lookup results, computed on first use and bounded in size."""
+
+    def __init__(self, lookup):
+        super().__init__()
+        self.lookup = lookup
+
+    def __missing__(self, word: bytes):
+        if len(self) >= _MEMO_SIZE:
+            self.clear()
+        entry = self[word] = self.lookup(word)
+        return entry
+
+
+class CompiledRules:
+    """An immutable, compiled snapshot of the routing rules.
+
+    Every term gets one bit, and a rule becomes the mask of its terms. A
+    message is split into words once and each word is looked up in a memo of
+    the terms it can start: the bits of single-word terms it matches and the
+    phrases whose first word it is. Only the few words that start a term are
+    looked at further, so scanning costs little more than the split itself,
+    every occurrence is found (overlapping ones included), and deciding a
+    rule is an integer AND.
+
+    A term ending in "*" matches any word starting with its last word, so
+    "exam*" covers "exams" and "examination" and "which course*" covers
+    "which courses". Prefixes are resolved once per distinct word, in the
+    memo, so they cost nothing on the scan itself.
+    """
+
+    def __init__(self, rules: Dict):
+        terms = set()
+
+        def normalized(group) -> FrozenSet[str]:
+            group = frozenset(_normalize_term(t) for t in group if str(t).strip()) - {""}
+            terms.update(group)
+            return group
+
+        search_triggers = [(rule["name"], normalized(rule["terms"])) for rule in rules.get("search_triggers", [])]
+        crisis_hints = [(rule["name"], normalized(rule["terms"])) for rule in rules.get("crisis_hints", [])]
+        query_rewrites = []
+        for rule in rules.get("query_rewrites", []):
+            groups = tuple(normalized(group) for group in rule["all_of"])
+            if not groups or not all(groups):
+                raise ValueError(f"Rewrite rule '{rule['name']}' has an empty term group")
+            query_rewrites.append((rule["name"], groups, str(rule["template"])))
+        self.default_query_template = str(rules.get("default_query_template", "{message}"))
+
+        self.terms = frozenset(terms)
+        self._term_list = sorted(terms)
+        bits = {term: 1 << i for i, term in enumerate(self._term_list)}
+
+        def mask(group) -> int:
+            result = 0
+            for term in group:
+                result |= bits[term]
+            return result
+
+        # Counter keys are built once here rather than per call
+        self.search_triggers = [(name, f"search:{name}", mask(group)) for name, group in search_triggers]
+        self.crisis_hints = [(name, f"crisis:{name}", mask(group)) for name, group in crisis_hints]
+        self.query_rewrites = [
+            (f"rewrite:{name}", tuple(mask(group) for group in groups), template)
+            for name, groups, template in query_rewrites
+        ]
+        self.rewrite_mask = 0
+        for _, groups, _ in self.query_rewrites:
+            for group in groups:
+                self.rewrite_mask |= group
+
+        self._words: Dict[bytes, int] = {}
+        self._prefixes: List[Tuple[bytes, int]] = []
+        # first word -> (words before the last, last word, bit, last word is a prefix)
+        self._phrases: Dict[bytes, List[Tuple[List[bytes], bytes, int, bool]]] = {}
+        for term, bit in bits.items():
+            prefix = term.endswith("*")
+            words = term.rstrip("*").encode("utf-8").split()
+            if len(words) > 1:
+                self._phrases.setdefault(words[0], []).append((words[:-1], words[-1], bit, prefix))
+            elif prefix:
+                self._prefixes.append((words[0], bit))
+            else:
+                self._words[words[0]] = bit
+        self._memo = _WordMemo(self._lookup)
+        # search_rule() and rewrite_query() scan the same message back to back
+        self._last_message = None
+        self._last_found = 0
+
+    def _lookup(self, word: bytes) -> Tuple:
+        """(bits of single-word terms, phrases starting here) for a word, or () if it starts no term."""
+        bit = self._words.get(word, 0)
+        for prefix, prefix_bit in self._prefixes:
+            if word.startswith(prefix):
+                bit |= prefix_bit
+        phrases = tuple(self._phrases.get(word, ()))
+        return (bit, phrases) if bit or phrases else ()
+
+    def scan(self, message: str) -> int:
+        """Bit mask of every rule term that occurs in the message as whole words."""
+        if message is self._last_message:
+            return self._last_found
+        found = self._scan(message) if self.terms and message else 0
+        self._last_message, self._last_found = message, found
+        return found
+
+    def _scan(self, message: str) -> int:
+        words = _tokens(message)
+        # Memo hits stay in C; only unseen words call back into _lookup()
+        entries = list(map(self._memo.__getitem__, words))
+        if not any(entries):
+            return 0
+
+        found = 0
+        for i in compress(range(len(entries)), entries):
+            bit, phrases = entries[i]
+            found |= bit
+            for head, last, phrase_bit, prefix in phrases:
+                j = i + len(head)
+                if j < len(words) and words[i:j] == head and (
+                    words[j].startswith(last) if prefix else words[j] == last
+                ):
+                    found |= phrase_bit
+        return found
+
+    def match(self, message: str) -> FrozenSet[str]:
+        """Every rule term that occurs in the message (for inspection; routing uses scan())."""
+        found = self.scan(message)
+        return frozenset(term for i, term in enumerate(self._term_list) if found >> i & 1)
+
+
+def load_rules(path: Path) -> CompiledRules:
+    """Load and compile rules from a JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        return CompiledRules(json.load(f))
+
+
+class IntentRouter:
+    """Routes career messages to a search decision and an optimized query.
+
+    Rules are read from a JSON file. Once ``start()`` is called from the
+    event loop, a background task re-reads the file when its modification
+    time changes (checked every ``reload_interval`` seconds), so routing
+    calls never touch the filesystem. A new rule set is fully compiled before
+    it replaces the old one, so a bad edit keeps the previous rules in
+    service. If no rules can be loaded at all the router runs with an empty
+    rule set: nothing triggers a search and every query uses the plain
+    message.
+    """
+
+    def __init__(self, rules_path: Optional[Path] = None, reload_interval: float = 5.0):
+        self.rules_path = Path(rules_path) if rules_path else None
+        self.reload_interval = reload_interval
+        self.hits = Counter()
+        self.reloads = 0
+        self._mtime = None
+        self._warned = False
+        self._task: Optional[asyncio.Task] = None
+        self._rules = CompiledRules({})
+        if self.rules_path is None:
+            self._warn_empty("no rules file configured")
+        self.maybe_reload()
+
+    @property
+    def rules(self) -> CompiledRules:
+        return self._rules
+
+    def maybe_reload(self) -> bool:
+        """Recompile the rules if the file changed. Returns True on reload."""
+        if self.rules_path is None:
+            return False
+        try:
+            mtime = os.stat(self.rules_path).st_mtime_ns
+        except OSError as e:
+            if self._mtime is None and not self._warned:
+                self._warn_empty(f"cannot read {self.rules_path}: {e}")
+            return False
+        if mtime == self._mtime:
+            return False
+
+        try:
+            rules = load_rules(self.rules_path)
+        except Exception as e:
+            if self._mtime is None:
+                self._warn_empty(f"failed loading {self.rules_path}: {e}")
+            else:
+                print(f"Warning: failed loading intent rules from {self.rules_path}, keeping previous rules: {e}")
+            self._mtime = mtime
+            return False
+
+        self._rules = rules
+        self._mtime = mtime
+        self.reloads += 1
+        print(f"🔁 Intent rules loaded: {len(rules.terms)} terms from {self.rules_path}")
+        return True
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                self.maybe_reload()
+            except Exception as e:
+                print("Intent rules reload error:", e)
+
+    def start(self):
+        if self.rules_path is not None and self.reload_interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _warn_empty(self, reason: str):
+        self._warned = True
+        print("=" * 72)
+        print(f"WARNING: intent rules unavailable ({reason}).")
+        print("Routing with an EMPTY rule set: no message will trigger a web search.")
+        print("=" * 72)
+
+    def search_rule(self, message: str) -> Optional[str]:
+        """Return the name of the first search trigger rule matching the message."""
+        rules = self._rules
+        found = rules.scan(message)
+        if found:
+            for name, key, mask in rules.search_triggers:
+                if found & mask:
+                    self.hits[key] += 1
+                    return name
+        self.hits["search:<none>"] += 1
+        return None
+
+    def crisis_rule(self, message: str) -> Optional[str]:
+        """Return the name of the first crisis hint rule matching the message.
+
+        This is a cheap lexical hint used for scheduling, not the crisis
+        classifier itself; the model still decides how to respond.
+        """
+        rules = self._rules
+        found = rules.scan(message)
+        if found:
+            for name, key, mask in rules.crisis_hints:
+                if found & mask:
+                    self.hits[key] += 1
+                    return name
+        return None
+
+    def rewrite_query(self, message: str) -> str:
+        """Rewrite a user message into a search query using the first matching template."""
+        rules = self._rules
+        found = rules.scan(message)
+        if found & rules.rewrite_mask:
+            for key, groups, template in rules.query_rewrites:
+                for group in groups:
+                    if not found & group:
+                        break
+                else:
+                    self.hits[key] += 1
+                    return template.replace("{message}", message)
+        self.hits["rewrite:<default>"] += 1
+        return rules.default_query_template.replace("{message}", message)
+
+    def stats(self) -> Dict:
+        return {
+            "rules_path": str(self.rules_path) if self.rules_path else None,
+            "reloads": self.reloads,
+            "terms": len(self._rules.terms),
+            "hits": dict(self.hits),
+        }
@@ -0,0 +1,192 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict, deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Callable, Dict, Optional
+
+
+def config_key(config: Dict) -> str:
+    """Stable hash of a live session config; sessions are only shared between equal configs."""
+    return hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def _is_alive(session) -> bool:
+    # google-genai keeps the upstream websocket on AsyncSession._ws; fakes may not have one
+    ws = getattr(session, "_ws", None)
+    return ws is None or getattr(ws, "close_code", None) is None
+
+
+class _WarmSession:
+    __slots__ = ("session", "stack", "created_at")
+
+    def __init__(self, session, stack: AsyncExitStack):
+        self.session = session
+        self.stack = stack
+        self.created_at = time.monotonic()
+
+
+class LiveSessionPool:
+    """Keeps pre-connected Gemini Live sessions ready for new WebSockets.
+
+    ``connect(config)`` must return an async context manager yielding a live
+    session, e.g. ``genai_client.aio.live.connect(model=..., config=config)``.
+    A background task keeps ``min_idle`` connected sessions for each of the
+    ``max_configs`` most recently used configs, dropping ones older than
+    ``max_age`` seconds or whose upstream socket has closed. Keep ``max_age``
+    well under the server's session time limit (about two minutes for audio
+    with video), since the limit counts from connect, not from hand-out. Each
+    warm session is handed out once; a config with none ready connects on
+    demand.
+    """
+
+    def __init__(self, connect: Callable, min_idle: int = 1, max_age: float = 25.0,
+                 max_configs: int = 4, refill_interval: float = 5.0):
+        self.connect = connect
+        self.min_idle = min_idle
+        self.max_age = max_age
+        self.max_configs = max_configs
+        self.refill_interval = refill_interval
+
+        self._targets: "OrderedDict[str, Dict]" = OrderedDict()
+        self._idle: Dict[str, deque] = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+        self.connect_failures = 0
+        self.connect_times = deque(maxlen=200)
+        self.ready_times = {"warm": deque(maxlen=200), "cold": deque(maxlen=200)}
+        self.first_audio_times = {"warm": deque(maxlen=200), "cold": deque(maxlen=200)}
+
+    def register(self, config: Dict) -> str:
+        """Mark a config as worth keeping warm and return its key."""
+        key = config_key(config)
+        self._targets[key] = config
+        self._targets.move_to_end(key)
+        while len(self._targets) > self.max_configs:
+            evicted, _ = self._targets.popitem(last=False)
+            for warm in self._idle.pop(evicted, ()):
+                asyncio.ensure_future(self._close(warm))
+        self._wake.set()
+        return key
+
+    def _take(self, key: str) -> Optional[_WarmSession]:
+        idle = self._idle.get(key)
+        while idle:
+            warm = idle.popleft()
+            if time.monotonic() - warm.created_at < self.max_age and _is_alive(warm.session):
+                return warm
+            self.discarded += 1
+            asyncio.ensure_future(self._close(warm))
+        return None
+
+    async def _open(self, config: Dict) -> _WarmSession:
+        stack = AsyncExitStack()
+        start = time.monotonic()
+        try:
+            session = await stack.enter_async_context(self.connect(config))
+        except BaseException:
+            self.connect_failures += 1
+            await stack.aclose()
+            raise
+        self.connect_times.append(time.monotonic() - start)
+        return _WarmSession(session, stack)
+
+    async def _close(self, warm: _WarmSession):
+        try:
+            await warm.stack.aclose()
+        except Exception as e:
+            print("Error closing pooled live session:", e)
+
+    @asynccontextmanager
+    async def session(self, config: Dict):
+        """Yield a live session for config, warm if one is ready; yields (session, warm)."""
+        warm = self._take(self.register(config))
+        is_warm = warm is not None
+        if is_warm:
+            self.hits += 1
+        else:
+            self.misses += 1
+            warm = await self._open(config)
+        try:
+            yield warm.session, is_warm
+        finally:
+            await self._close(warm)
+
+    async def fill_once(self):
+        """Drop stale idle sessions and top every target config back up to min_idle."""
+        now = time.monotonic()
+        for key, config in list(self._targets.items()):
+            idle = self._idle.setdefault(key, deque())
+            for warm in list(idle):
+                if now - warm.created_at >= self.max_age or not _is_alive(warm.session):
+                    idle.remove(warm)
+                    self.discarded += 1
+                    await self._close(warm)
+            while len(idle) < self.min_idle and key in self._targets:
+                try:
+                    warm = await self._open(config)
+                except Exception as e:
+                    print("Failed to pre-warm live session:", e)
+                    return
+                if key not in self._targets or self._idle.get(key) is not idle:
+                    # register() evicted this config while we were connecting; nobody can take it now
+                    await self._close(warm)
+                    break
+                idle.append(warm)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.fill_once()
+            except Exception as e:
+                print("Live session pool refill error:", e)
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self.min_idle > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for idle in self._idle.values():
+            while idle:
+                await self._close(idle.popleft())
+
+    def record_ready(self, seconds: float, warm: bool):
+        """Time from WebSocket accept until the upstream session was usable."""
+        self.ready_times["warm" if warm else "cold"].append(seconds)
+
+    def record_first_audio(self, seconds: float, warm: bool):
+        """Time from WebSocket accept until the first audio chunk reached the client."""
+        self.first_audio_times["warm" if warm else "cold"].append(seconds)
+
+    def stats(self) -> Dict:
+        def avg_ms(values):
+            return round(sum(values) / len(values) * 1000, 1) if values else None
+
+        return {
+            "min_idle": self.min_idle,
+            "idle": {key: len(idle) for key, idle in self._idle.items()},
+            "hits": self.hits,
+            "misses": self.misses,
+            "discarded": self.discarded,
+            "connect_failures": self.connect_failures,
+            "avg_connect_ms": avg_ms(self.connect_times),
+            "avg_time_to_ready_ms": {kind: avg_ms(values) for kind, values in self.ready_times.items()},
+            "avg_time_to_first_audio_ms": {kind: avg_ms(values) for kind, values in self.first_audio_times.items()},
+        }
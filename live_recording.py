@@ -0,0 +1,92 @@
+import gzip
+import secrets
+import struct
+import time
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+
+# File layout (gzip-compressed): MAGIC, then records of
+#   u8 direction | u32 milliseconds since session start | u32 payload length | payload
+# Client payloads are the browser's WebSocket text frames; upstream payloads are
+# Gemini Live server messages in their wire (camelCase JSON) form.
+MAGIC = b"MLREC1"
+CLIENT = 0
+UPSTREAM = 1
+_RECORD = struct.Struct("<BII")
+
+
+class SessionRecorder:
+    """Writes one live session's client frames and upstream messages, with timing.
+
+    Recording must never break a session, so the first write error disables
+    the recorder instead of raising.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = gzip.open(path, "wb", compresslevel=6)
+        self._file.write(MAGIC)
+        self._start = time.monotonic()
+        self.records = 0
+
+    def _write(self, direction: int, payload: bytes):
+        if self._file is None:
+            return
+        try:
+            elapsed_ms = int((time.monotonic() - self._start) * 1000)
+            self._file.write(_RECORD.pack(direction, elapsed_ms, len(payload)))
+            self._file.write(payload)
+            self.records += 1
+        except Exception as e:
+            print(f"Live recording to {self.path} failed, disabling: {e}")
+            self.close()
+
+    def client(self, message: str):
+        self._write(CLIENT, message.encode("utf-8"))
+
+    def upstream(self, response):
+        """Record a LiveServerMessage as it arrived on the wire."""
+        self._write(UPSTREAM, response.model_dump_json(by_alias=True, exclude_none=True).encode("utf-8"))
+
+    def close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file = None
+
+
+def open_recorder(directory: str) -> Optional[SessionRecorder]:
+    """Start a recording in directory, or None if recording is off or fails."""
+    if not directory:
+        return None
+    try:
+        folder = Path(directory)
+        folder.mkdir(parents=True, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}.mlrec"
+        return SessionRecorder(folder / name)
+    except Exception as e:
+        print(f"Could not start live recording in {directory}: {e}")
+        return None
+
+
+def read_recording(path) -> Iterator[Tuple[int, int, bytes]]:
+    """Yield (direction, milliseconds, payload) records from a recording file."""
+    with gzip.open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a live session recording")
+        while True:
+            # A session killed mid-write leaves a truncated tail; keep what is whole
+            try:
+                header = f.read(_RECORD.size)
+                if len(header) < _RECORD.size:
+                    return
+                direction, elapsed_ms, length = _RECORD.unpack(header)
+                payload = f.read(length)
+            except EOFError:
+                return
+            if len(payload) < length:
+                return
+            yield direction, elapsed_ms, payload
@@ -0,0 +1,127 @@
+import asyncio
+import itertools
+import json
+import time
+from typing import Dict, Optional
+
+from fastapi import WebSocket
+
+
+# WebSocket close codes (RFC 6455 / IANA registry)
+CLOSE_SERVICE_RESTART = 1012
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class LiveSessionRecord:
+    __slots__ = ("id", "websocket", "started_at", "turn_active", "turns")
+
+    def __init__(self, session_id: int, websocket: WebSocket):
+        self.id = session_id
+        self.websocket = websocket
+        self.started_at = time.monotonic()
+        self.turn_active = False
+        self.turns = 0
+
+
+class LiveSessionRegistry:
+    """Tracks live sessions on this instance, caps them and drains them on shutdown.
+
+    ``admit()`` refuses new sessions once ``max_sessions`` are running or a
+    drain has started. ``drain()`` tells every client to reconnect elsewhere,
+    lets sessions finish the model turn they are in (up to a timeout) and then
+    closes them.
+    """
+
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max_sessions
+        self.draining = False
+        self.rejected = 0
+        self._sessions: Dict[int, LiveSessionRecord] = {}
+        self._ids = itertools.count(1)
+        self._changed = asyncio.Event()
+
+    def admit(self, websocket: WebSocket) -> Optional[LiveSessionRecord]:
+        """Register a session, or return None if at capacity or draining."""
+        if self.draining or len(self._sessions) >= self.max_sessions:
+            self.rejected += 1
+            return None
+        record = LiveSessionRecord(next(self._ids), websocket)
+        self._sessions[record.id] = record
+        return record
+
+    def rejection(self) -> Dict:
+        """Client-facing message explaining why admit() refused."""
+        if self.draining:
+            return {"error": "This server is restarting. Please reconnect.", "reason": "draining", "reconnect": True}
+        return {
+            "error": "Live sessions are at capacity right now. Please try again in a moment.",
+            "reason": "capacity"
+        }
+
+    def release(self, record: LiveSessionRecord):
+        self._sessions.pop(record.id, None)
+        self._changed.set()
+
+    def turn_started(self, record: LiveSessionRecord):
+        record.turn_active = True
+
+    def turn_finished(self, record: LiveSessionRecord):
+        record.turn_active = False
+        record.turns += 1
+        self._changed.set()
+
+    async def _close(self, record: LiveSessionRecord, code: int):
+        try:
+            await record.websocket.close(code=code)
+        except Exception:
+            pass
+
+    async def drain(self, timeout: float):
+        """Stop admitting, ask clients to reconnect, wait for active turns, then close."""
+        self.draining = True
+        print(f"🛑 Draining {len(self._sessions)} live session(s), up to {timeout:.0f}s")
+        for record in list(self._sessions.values()):
+            try:
+                await record.websocket.send_text(json.dumps({"reconnect": True, "reason": "draining"}))
+            except Exception:
+                pass
+
+        loop = asyncio.get_running_loop()
+        give_up_at = loop.time() + timeout
+        while True:
+            # Sessions between turns can go now; mid-turn ones get to finish
+            for record in [r for r in self._sessions.values() if not r.turn_active]:
+                self._sessions.pop(record.id, None)
+                await self._close(record, CLOSE_SERVICE_RESTART)
+            remaining = give_up_at - loop.time()
+            if not self._sessions or remaining <= 0:
+                break
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                pass
+
+        for record in list(self._sessions.values()):
+            print(f"Drain timeout: closing live session {record.id} mid-turn")
+            self._sessions.pop(record.id, None)
+            await self._close(record, CLOSE_SERVICE_RESTART)
+        print("🛑 Live session drain complete")
+
+    def stats(self) -> Dict:
+        now = time.monotonic()
+        return {
+            "active": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "draining": self.draining,
+            "rejected": self.rejected,
+            "sessions": [
+                {
+                    "id": record.id,
+                    "age_s": round(now - record.started_at, 1),
+                    "turns": record.turns,
+                    "turn_active": record.turn_active,
+                }
+                for record in self._sessions.values()
+            ],
+        }
@@ -1,18 +1,85 @@
 import json
-import base64
 import asyncio
+import time
 from fastapi import WebSocket, WebSocketDisconnect
 from google import genai
-from config import LIVE_MODEL
+from config import LIVE_MODEL, LIVE_POOL_MIN_IDLE, LIVE_POOL_MAX_AGE_SECONDS, LIVE_POOL_MAX_CONFIGS
+from config import LIVE_AUDIO_FRAME_MS, LIVE_AUDIO_FLUSH_MS, LIVE_MAX_SESSIONS
+from config import LIVE_API_BASE_URL, LIVE_RECORD_DIR
+from live_pool import LiveSessionPool
+from audio_framing import AudioFramer
+from live_registry import LiveSessionRegistry, CLOSE_TRY_AGAIN_LATER
+from live_recording import open_recorder
+
+http_options = {'api_version': 'v1alpha'}
+if LIVE_API_BASE_URL:
+    # Load tests: talk to loadtest/fake_live_server.py instead of the real API
+    http_options['base_url'] = LIVE_API_BASE_URL
+genai_client = genai.Client(http_options=http_options)
+
+DEFAULT_SYSTEM_INSTRUCTION = {
+    "parts": [{"text": "You are a compassionate mental health support assistant named MITRA for live voice conversations. Provide warm, empathetic responses and be a good listener. Keep responses concise and natural for voice interaction. Don't ask too many questions and also provide empathetic solutions to the user."}]
+}
+
+def _instruction_text(instruction) -> str:
+    """Instruction text with whitespace removed, for comparing instructions."""
+    parts = instruction.get("parts", []) if isinstance(instruction, dict) else []
+    return "".join("".join(str(part.get("text", "")).split()) for part in parts if isinstance(part, dict))
+
+def build_live_config(client_config: dict) -> dict:
+    """Build the Gemini Live config for a client setup message.
+
+    A client instruction that only differs from the default in whitespace
+    (older script.js sent its own copy) is replaced by the default, so the
+    session matches the pre-warmed config.
+    """
+    instruction = client_config.get("system_instruction") or DEFAULT_SYSTEM_INSTRUCTION
+    if _instruction_text(instruction) == _instruction_text(DEFAULT_SYSTEM_INSTRUCTION):
+        instruction = DEFAULT_SYSTEM_INSTRUCTION
+    return {
+        "system_instruction": instruction,
+        "generation_config": {
+            "response_modalities": ["AUDIO"],
+            "speech_config": {
+                "voice_config": {
+                    "prebuilt_voice_config": {
+                        "voice_name": "Leda"  # voices {Kore, Charon , Leda , Aoede}
+                    }
+                }
+            }
+        }
+    }
+
+# Live sessions running on this instance
+live_registry = LiveSessionRegistry(LIVE_MAX_SESSIONS)
 
-genai_client = genai.Client(http_options={'api_version': 'v1alpha'})
+# Pre-connected upstream sessions, keyed by config hash
+live_pool = LiveSessionPool(
+    lambda config: genai_client.aio.live.connect(model=LIVE_MODEL, config=config),
+    min_idle=LIVE_POOL_MIN_IDLE,
+    max_age=LIVE_POOL_MAX_AGE_SECONDS,
+    max_configs=LIVE_POOL_MAX_CONFIGS,
+)
 
 async def gemini_live_session_handler(websocket: WebSocket):
     """Handles the Gemini Live API session for real-time voice interaction (continuous turns)."""
     await websocket.accept()
+    accepted_at = time.monotonic()
+    record = live_registry.admit(websocket)
+    if record is None:
+        print("Live session refused:", live_registry.rejection()["reason"])
+        try:
+            await websocket.send_text(json.dumps(live_registry.rejection()))
+            await websocket.close(code=CLOSE_TRY_AGAIN_LATER)
+        except Exception:
+            pass
+        return
+    recorder = open_recorder(LIVE_RECORD_DIR)
     try:
         # Receive initial setup/config message from client (must be sent by client first)
         config_message = await websocket.receive_text()
+        if recorder:
+            recorder.client(config_message)
         try:
             config_data = json.loads(config_message)
             client_config = config_data.get("setup", {})
@@ -21,21 +88,7 @@ async def gemini_live_session_handler(websocket: WebSocket):
 
 
 
-        config = {
-            "system_instruction": client_config.get("system_instruction", {
-                "parts": [{"text": "You are a compassionate mental health support assistant named MITRA for live voice conversations. Provide warm, empathetic responses and be a good listener. Keep responses concise and natural for voice interaction. Don't ask too many questions and also provide empathetic solutions to the user."}]
-            }),
-            "generation_config": {
-                "response_modalities": ["AUDIO"],
-                "speech_config": {
-                    "voice_config": {
-                        "prebuilt_voice_config": {
-                            "voice_name": "Leda"  # voices {Kore, Charon , Leda , Aoede}
-                        }
-                    }
-                }
-            }
-        }
+        config = build_live_config(client_config)
 
         print(f"Connecting to Gemini Live with config: {json.dumps(config, indent=2)}")
 
@@ -43,9 +96,14 @@ async def gemini_live_session_handler(websocket: WebSocket):
 
 
 
-        # Connect to Gemini Live
-        async with genai_client.aio.live.connect(model=LIVE_MODEL, config=config) as session:
-            print("Connected to Gemini Live API")
+        # Take a pre-warmed Gemini Live session if one matches, else connect now
+        async with live_pool.session(config) as (session, warm):
+            print(f"Connected to Gemini Live API ({'warm' if warm else 'cold'})")
+            live_pool.record_ready(time.monotonic() - accepted_at, warm)
+            framer = AudioFramer(
+                websocket.send_text, frame_ms=LIVE_AUDIO_FRAME_MS, flush_ms=LIVE_AUDIO_FLUSH_MS,
+                on_first_frame=lambda: live_pool.record_first_audio(time.monotonic() - accepted_at, warm),
+            )
 
             # Send loop: read from client websocket and forward media chunks to Gemini Live
             async def send_to_gemini():
@@ -59,6 +117,8 @@ async def gemini_live_session_handler(websocket: WebSocket):
                         except Exception as e:
                             print("receive_text error in send loop:", e)
                             break
+                        if recorder:
+                            recorder.client(msg)
 
                         # Parse and forward media chunks if present
                         try:
@@ -92,15 +152,18 @@ async def gemini_live_session_handler(websocket: WebSocket):
                     while True:
                         try:
                             async for response in session.receive():
+                                if recorder:
+                                    recorder.upstream(response)
                                 if response.server_content is None:
                                     continue
 
                                 model_turn = response.server_content.model_turn
                                 if model_turn:
+                                    live_registry.turn_started(record)
                                     for part in model_turn.parts:
                                         if hasattr(part, "text") and part.text is not None:
                                             try:
-                                                await websocket.send_text(json.dumps({"text": part.text}))
+                                                await framer.send_text(part.text)
                                             except WebSocketDisconnect:
                                                 print("Client disconnected while sending text part")
                                                 return
@@ -109,8 +172,7 @@ async def gemini_live_session_handler(websocket: WebSocket):
 
                                         elif hasattr(part, "inline_data") and part.inline_data is not None:
                                             try:
-                                                base64_audio = base64.b64encode(part.inline_data.data).decode("utf-8")
-                                                await websocket.send_text(json.dumps({"audio": base64_audio}))
+                                                await framer.push(part.inline_data.data)
                                             except WebSocketDisconnect:
                                                 print("Client disconnected while sending audio part")
                                                 return
@@ -118,6 +180,16 @@ async def gemini_live_session_handler(websocket: WebSocket):
                                                 print("Error sending audio to client:", e)
 
                                 if getattr(response.server_content, "turn_complete", False):
+                                    try:
+                                        await framer.end_turn()
+                                    except WebSocketDisconnect:
+                                        print("Client disconnected while ending turn")
+                                        return
+                                    except Exception as e:
+                                        print("Error sending turn end to client:", e)
+                                    finally:
+                                        # Only now has the turn's last audio left; a drain may close the socket after this
+                                        live_registry.turn_finished(record)
                                     print("<Turn complete> — waiting for next user input")
                         except Exception as inner_e:
                             print("Error while receiving from Gemini session:", inner_e)
@@ -125,14 +197,15 @@ async def gemini_live_session_handler(websocket: WebSocket):
                 except Exception as e:
                     print("receive_from_gemini top-level error:", e)
                 finally:
-                    print("receive_from_gemini finished")
+                    framer.close()
+                    print(f"receive_from_gemini finished, audio framing: {framer.stats()}")
 
             # Run send and receive concurrently until one ends
             send_task = asyncio.create_task(send_to_gemini())
             receive_task = asyncio.create_task(receive_from_gemini())
 
             try:
-                await asyncio.gather(send_task, receive_task)
+                await asyncio.wait({send_task, receive_task}, return_when=asyncio.FIRST_COMPLETED)
             except Exception as e:
                 print("Error in Gemini Live session tasks:", e)
             finally:
@@ -148,6 +221,10 @@ async def gemini_live_session_handler(websocket: WebSocket):
         import traceback
         traceback.print_exc()
     finally:
+        live_registry.release(record)
+        if recorder:
+            recorder.close()
+            print(f"Live session recorded to {recorder.path} ({recorder.records} records)")
         print("Gemini Live session closed")
 
 
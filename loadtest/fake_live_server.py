@@ -0,0 +1,139 @@
+"""Local stand-in for the Gemini Live API that replays recorded model turns.
+
+Speaks the Live wire protocol (setup -> setupComplete, realtimeInput in,
+serverContent out). Each time the caller's audio shows the end of an
+utterance, the server answers with the next recorded turn, after the think
+time and with the message spacing that was recorded. Without recordings it
+answers with synthetic audio turns.
+
+The SDK always connects over wss://, so serve TLS with a self-signed cert:
+
+    openssl req -x509 -newkey rsa:2048 -nodes -days 30 -subj /CN=localhost \\
+        -addext subjectAltName=DNS:localhost -keyout /tmp/fake.key -out /tmp/fake.pem
+    python loadtest/fake_live_server.py --certfile /tmp/fake.pem --keyfile /tmp/fake.key \\
+        [--recordings recordings/]
+
+and start the app against it:
+
+    LIVE_API_BASE_URL=https://localhost:9443 SSL_CERT_FILE=/tmp/fake.pem \\
+        GOOGLE_API_KEY=fake uvicorn main:app
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import ssl
+import time
+
+import websockets
+
+from replay import EndOfSpeech, audio_in, recording_files, synthetic_turn, upstream_turns
+
+
+class Stats:
+    connections = 0
+    active = 0
+    turns = 0
+    input_frames = 0
+
+
+async def speak(ws, pending: asyncio.Queue, turns, speed: float):
+    """Play one recorded turn per detected end of speech, in order."""
+    loop = asyncio.get_running_loop()
+    while True:
+        await pending.get()
+        think, messages = next(turns)
+        await asyncio.sleep(think / speed)
+        start = loop.time()
+        for offset, message in messages:
+            delay = start + offset / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await ws.send(message)
+        Stats.turns += 1
+
+
+async def handle(ws, path=None, *, turns, speed: float, detector_args: dict):
+    setup = json.loads(await ws.recv())
+    if "setup" not in setup:
+        await ws.close(code=1007, reason="expected setup message")
+        return
+    await ws.send(json.dumps({"setupComplete": {}}))
+
+    Stats.connections += 1
+    Stats.active += 1
+    detector = EndOfSpeech(**detector_args)
+    pending: asyncio.Queue = asyncio.Queue()
+    speaker = asyncio.create_task(speak(ws, pending, turns, speed))
+    try:
+        async for raw in ws:
+            try:
+                message = json.loads(raw)
+            except ValueError:
+                continue
+            Stats.input_frames += 1
+            for _ in range(detector.feed(audio_in(message))):
+                pending.put_nowait(time.monotonic())
+    except websockets.ConnectionClosed:
+        pass
+    finally:
+        speaker.cancel()
+        Stats.active -= 1
+
+
+async def report(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        print(f"connections={Stats.connections} active={Stats.active} "
+              f"input_frames={Stats.input_frames} turns={Stats.turns}", flush=True)
+
+
+async def serve(args):
+    if args.recordings:
+        recorded = [turn for path in recording_files(args.recordings) for turn in upstream_turns(path)]
+        if not recorded:
+            raise SystemExit(f"No model turns found in {args.recordings}")
+        print(f"Replaying {len(recorded)} recorded turn(s)")
+    else:
+        recorded = [(args.think_ms / 1000, synthetic_turn(args.reply_seconds))]
+        print(f"Synthetic turns: {args.think_ms} ms think, {args.reply_seconds} s of audio")
+    turns = itertools.cycle(recorded)
+
+    context = None
+    if args.certfile:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(args.certfile, args.keyfile)
+
+    async def handler(ws, path=None):
+        await handle(ws, path, turns=turns, speed=args.speed,
+                     detector_args={"threshold": args.vad_threshold, "silence_ms": args.vad_silence_ms})
+
+    async with websockets.serve(handler, args.host, args.port, ssl=context, max_size=None):
+        scheme = "wss" if context else "ws"
+        print(f"Fake Gemini Live listening on {scheme}://{args.host}:{args.port}", flush=True)
+        asyncio.create_task(report(args.report_interval))
+        await asyncio.Future()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9443)
+    parser.add_argument("--certfile")
+    parser.add_argument("--keyfile")
+    parser.add_argument("--recordings", help=".mlrec file or directory; synthetic turns if omitted")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed multiplier")
+    parser.add_argument("--think-ms", type=int, default=600, help="synthetic: delay before answering")
+    parser.add_argument("--reply-seconds", type=float, default=3.0, help="synthetic: audio per answer")
+    parser.add_argument("--vad-threshold", type=int, default=500)
+    parser.add_argument("--vad-silence-ms", type=int, default=600)
+    parser.add_argument("--report-interval", type=float, default=10.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
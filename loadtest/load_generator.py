@@ -0,0 +1,203 @@
+"""Open many concurrent /live-session clients streaming PCM and JPEG frames at real-time pace.
+
+Each client replays the client side of a recording (or synthetic speech with
+pauses) with its recorded timing and measures, per turn, the time from
+sending the frame in which the user stopped speaking to the first audio
+message back. With --server-pid it also samples the app's CPU time and RSS
+from /proc to report cost per session.
+
+    python loadtest/load_generator.py --clients 200 --ramp 20 --duration 120 \\
+        [--recordings recordings/] [--server-pid $(pgrep -f "uvicorn main:app")]
+
+Run the app against loadtest/fake_live_server.py so the upstream side is
+replayed locally rather than billed.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import os
+import statistics
+import time
+
+import websockets
+
+from replay import client_frames, end_of_speech_marks, recording_files, synthetic_client_frames
+
+
+class SessionResult:
+    def __init__(self):
+        self.latencies = []
+        self.audio_bytes = 0
+        self.frames_sent = 0
+        self.error = None
+
+
+class ProcSampler:
+    """CPU seconds and RSS of a local process, read from /proc."""
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.ticks = os.sysconf("SC_CLK_TCK")
+
+    def cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self.ticks  # utime + stime
+
+    def rss_bytes(self) -> int:
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+
+def loop_frames(frames, duration: float):
+    """Yield (time, text, index) for the setup frame, then the media frames repeated until duration."""
+    setup, media = frames[0], frames[1:]
+    yield setup[0], setup[1], 0
+    if not media:
+        return
+    length = media[-1][0] + (media[-1][0] - media[-2][0] if len(media) > 1 else 3.0)
+    base = 0.0
+    while True:
+        for index, (at, text) in enumerate(media, 1):
+            if base + at > duration:
+                return
+            yield base + at, text, index
+        base += length
+
+
+async def run_client(url: str, frames, marks, duration: float, start_delay: float,
+                     result: SessionResult, settle: float):
+    await asyncio.sleep(start_delay)
+    loop = asyncio.get_running_loop()
+    speech_ends = collections.deque()
+    in_turn = False
+
+    async def receive(ws):
+        nonlocal in_turn
+        async for raw in ws:
+            message = json.loads(raw)
+            if "audio" in message:
+                result.audio_bytes += len(message["audio"]) * 3 // 4
+                if not in_turn:
+                    in_turn = True
+                    if speech_ends:
+                        result.latencies.append(loop.time() - speech_ends.popleft())
+            elif message.get("turn_complete"):
+                in_turn = False
+            elif "error" in message:
+                result.error = message.get("reason") or message["error"]
+
+    try:
+        async with websockets.connect(url, max_size=None, open_timeout=30) as ws:
+            receiver = asyncio.create_task(receive(ws))
+            start = loop.time()
+            for at, text, index in loop_frames(frames, duration):
+                delay = start + at - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if receiver.done():
+                    break
+                await ws.send(text)
+                result.frames_sent += 1
+                for _ in range(marks[index]):
+                    speech_ends.append(loop.time())
+            # Let answers to the last utterances arrive before hanging up
+            try:
+                await asyncio.wait_for(asyncio.shield(receiver), settle)
+            except asyncio.TimeoutError:
+                pass
+            receiver.cancel()
+    except Exception as e:
+        result.error = result.error or f"{type(e).__name__}: {e}"
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else float("nan")
+
+
+async def sample_server(sampler: ProcSampler, samples: list, stop: asyncio.Event):
+    while not stop.is_set():
+        samples.append(sampler.rss_bytes())
+        try:
+            await asyncio.wait_for(stop.wait(), 1.0)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run(args):
+    detector_args = {"threshold": args.vad_threshold, "silence_ms": args.vad_silence_ms}
+    if args.recordings:
+        scripts = [client_frames(path) for path in recording_files(args.recordings)]
+    else:
+        scripts = [synthetic_client_frames(args.duration, args.speech_seconds, args.pause_seconds)]
+    plans = [(frames, end_of_speech_marks(frames, **detector_args)) for frames in scripts]
+    print(f"{len(plans)} client script(s), {sum(sum(m) for _, m in plans)} utterance(s) per pass")
+
+    sampler = ProcSampler(args.server_pid) if args.server_pid else None
+    rss_samples, stop = [], asyncio.Event()
+    if sampler:
+        rss_baseline, cpu_start = sampler.rss_bytes(), sampler.cpu_seconds()
+        monitor = asyncio.create_task(sample_server(sampler, rss_samples, stop))
+
+    results = [SessionResult() for _ in range(args.clients)]
+    started = time.monotonic()
+    await asyncio.gather(*(
+        run_client(args.url, *plans[i % len(plans)], args.duration,
+                   args.ramp * i / max(args.clients - 1, 1), results[i], args.settle)
+        for i in range(args.clients)
+    ))
+    elapsed = time.monotonic() - started
+
+    ok = [r for r in results if r.error is None]
+    failures = collections.Counter(r.error for r in results if r.error is not None)
+    latencies = [l * 1000 for r in results for l in r.latencies]
+    session_means = [statistics.mean(r.latencies) * 1000 for r in ok if r.latencies]
+    print(f"\nSessions: {len(ok)} ok, {len(results) - len(ok)} failed in {elapsed:.0f}s")
+    for reason, count in failures.most_common(5):
+        print(f"    {count:>5} x {reason}")
+    print(f"Frames sent: {sum(r.frames_sent for r in results)}, "
+          f"audio received: {sum(r.audio_bytes for r in results) / 1e6:.1f} MB")
+    if latencies:
+        print(f"End of speech -> first audio over {len(latencies)} turns: "
+              f"p50 {percentile(latencies, 0.5):.0f} ms, p95 {percentile(latencies, 0.95):.0f} ms, "
+              f"p99 {percentile(latencies, 0.99):.0f} ms, max {max(latencies):.0f} ms")
+    if session_means:
+        print(f"Per-session mean latency: p50 {percentile(session_means, 0.5):.0f} ms, "
+              f"p95 {percentile(session_means, 0.95):.0f} ms")
+
+    if sampler:
+        stop.set()
+        await monitor
+        cpu = sampler.cpu_seconds() - cpu_start
+        peak = max(rss_samples, default=rss_baseline)
+        sessions = max(len(ok), 1)
+        print(f"Server CPU: {cpu:.1f}s over {elapsed:.0f}s -> {cpu / sessions * 1000:.0f} ms per session, "
+              f"{cpu / elapsed / sessions * 100:.2f}% of a core per concurrent session")
+        print(f"Server RSS: {rss_baseline / 2 ** 20:.0f} MB -> peak {peak / 2 ** 20:.0f} MB, "
+              f"{(peak - rss_baseline) / sessions / 2 ** 20:.2f} MB per session")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="ws://127.0.0.1:8000/live-session")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--ramp", type=float, default=10.0, help="seconds over which clients connect")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds each client streams")
+    parser.add_argument("--settle", type=float, default=10.0, help="seconds to wait for final answers")
+    parser.add_argument("--recordings", help=".mlrec file or directory; synthetic speech if omitted")
+    parser.add_argument("--speech-seconds", type=float, default=2.0)
+    parser.add_argument("--pause-seconds", type=float, default=4.0)
+    parser.add_argument("--server-pid", type=int, help="app process to sample CPU and RSS from /proc")
+    parser.add_argument("--vad-threshold", type=int, default=500, help="must match the fake server")
+    parser.add_argument("--vad-silence-ms", type=int, default=600, help="must match the fake server")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Shared pieces of the live-session load test: speech detection, recordings, synthetic media.
+
+The fake server and the load generator never talk to each other directly
+(pre-warmed upstream sessions connect before any client exists), so both
+find the end of user speech by running the same deterministic detector over
+the same PCM.
+"""
+import base64
+import json
+import os
+import sys
+from array import array
+from pathlib import Path
+from typing import List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from live_recording import CLIENT, UPSTREAM, read_recording  # noqa: E402
+
+INPUT_RATE = 16000   # browser microphone PCM
+OUTPUT_RATE = 24000  # Gemini Live output PCM
+CHUNK_SECONDS = 3.0  # script.js sends one audio (+ camera) frame every 3 s
+
+SETUP_MESSAGE = json.dumps({
+    "setup": {
+        "generation_config": {"response_modalities": ["AUDIO"]},
+    }
+})
+
+# (seconds from session start, message text)
+Frame = Tuple[float, str]
+
+
+class EndOfSpeech:
+    """Energy-based end-of-speech detector for 16 kHz PCM16 chunks.
+
+    Speech is any 20 ms window louder than threshold (RMS); the end of an
+    utterance is silence_ms of quiet after speech.
+    """
+
+    def __init__(self, threshold: int = 500, silence_ms: int = 600, window_ms: int = 20):
+        self.threshold_sq = threshold * threshold
+        self.window = INPUT_RATE * window_ms // 1000
+        self.windows_needed = max(silence_ms // window_ms, 1)
+        self.speaking = False
+        self.quiet_windows = 0
+
+    def feed(self, pcm: bytes) -> int:
+        """Consume a chunk; return how many utterances ended inside it."""
+        samples = array("h", pcm[: len(pcm) - len(pcm) % 2])
+        if sys.byteorder == "big":
+            samples.byteswap()
+        ended = 0
+        for start in range(0, len(samples) - self.window + 1, self.window):
+            # Every 4th sample is plenty for a loudness estimate
+            window = samples[start:start + self.window:4]
+            loud = sum(s * s for s in window) / len(window) > self.threshold_sq
+            if loud:
+                self.speaking = True
+                self.quiet_windows = 0
+            elif self.speaking:
+                self.quiet_windows += 1
+                if self.quiet_windows >= self.windows_needed:
+                    self.speaking = False
+                    ended += 1
+        return ended
+
+
+def media_chunks(message: dict) -> List[dict]:
+    """Media blobs in a client or upstream realtime_input message (either key style)."""
+    realtime = message.get("realtime_input") or message.get("realtimeInput") or {}
+    if not isinstance(realtime, dict):
+        return []
+    chunks = list(realtime.get("media_chunks") or realtime.get("mediaChunks") or [])
+    for key in ("audio", "video", "media"):
+        if isinstance(realtime.get(key), dict):
+            chunks.append(realtime[key])
+    return chunks
+
+
+def audio_in(message: dict) -> bytes:
+    """Concatenated input PCM carried by a realtime_input message."""
+    pcm = b""
+    for chunk in media_chunks(message):
+        mime = chunk.get("mime_type") or chunk.get("mimeType") or ""
+        if mime.startswith("audio/pcm") and chunk.get("data"):
+            pcm += base64.b64decode(chunk["data"])
+    return pcm
+
+
+def end_of_speech_marks(frames: List[Frame], **detector_args) -> List[int]:
+    """Number of utterances that end in each frame."""
+    detector = EndOfSpeech(**detector_args)
+    marks = []
+    for _, text in frames:
+        try:
+            marks.append(detector.feed(audio_in(json.loads(text))))
+        except ValueError:
+            marks.append(0)
+    return marks
+
+
+def recording_files(path: str) -> List[Path]:
+    target = Path(path)
+    files = sorted(target.glob("*.mlrec")) if target.is_dir() else [target]
+    if not files:
+        raise SystemExit(f"No .mlrec recordings in {path}")
+    return files
+
+
+def client_frames(path) -> List[Frame]:
+    """Client frames of a recording, setup message first."""
+    return [(ms / 1000, payload.decode("utf-8")) for direction, ms, payload in read_recording(path)
+            if direction == CLIENT]
+
+
+def upstream_turns(path) -> List[Tuple[float, List[Frame]]]:
+    """Model turns of a recording as (think_seconds, [(offset, message)]).
+
+    think_seconds is how long the model took after the last client frame
+    before it started answering; offsets are relative to the first message.
+    """
+    turns = []
+    last_client = 0.0
+    current: List[Frame] = []
+    turn_start = think = 0.0
+    for direction, ms, payload in read_recording(path):
+        at = ms / 1000
+        if direction == CLIENT:
+            last_client = at
+            continue
+        if direction != UPSTREAM:
+            continue
+        message = json.loads(payload)
+        content = message.get("serverContent") or {}
+        if not current:
+            if not content.get("modelTurn"):
+                continue
+            turn_start, think = at, max(at - last_client, 0.0)
+        current.append((at - turn_start, payload.decode("utf-8")))
+        if content.get("turnComplete"):
+            turns.append((think, current))
+            current = []
+    if current:
+        turns.append((think, current + [(current[-1][0], json.dumps({"serverContent": {"turnComplete": True}}))]))
+    return turns
+
+
+def _tone(seconds: float, amplitude: int = 6000) -> bytes:
+    # 200 Hz square-ish tone: loud enough for the detector, trivially cheap to build
+    period = array("h", [amplitude] * 40 + [-amplitude] * 40)
+    samples = int(seconds * INPUT_RATE)
+    return (period * (samples // len(period) + 1))[:samples].tobytes()
+
+
+def synthetic_client_frames(duration: float, speech_seconds: float = 2.0, pause_seconds: float = 4.0,
+                            image_bytes: int = 30000) -> List[Frame]:
+    """Setup plus script.js-style frames: 3 s of PCM and a JPEG-sized image every 3 s.
+
+    The user alternates speech_seconds of talking with pause_seconds of silence.
+    """
+    timeline = b""
+    cycle = _tone(speech_seconds) + bytes(int(pause_seconds * INPUT_RATE) * 2)
+    while len(timeline) < duration * INPUT_RATE * 2:
+        timeline += cycle
+    # Random bytes between JPEG markers: the right size and as incompressible as a real frame
+    image = base64.b64encode(b"\xff\xd8" + os.urandom(image_bytes) + b"\xff\xd9").decode("ascii")
+
+    frames = [(0.0, SETUP_MESSAGE)]
+    chunk = int(CHUNK_SECONDS * INPUT_RATE) * 2
+    for index in range(int(duration // CHUNK_SECONDS)):
+        pcm = timeline[index * chunk:(index + 1) * chunk]
+        frames.append(((index + 1) * CHUNK_SECONDS, json.dumps({
+            "realtime_input": {"media_chunks": [
+                {"mime_type": "audio/pcm", "data": base64.b64encode(pcm).decode("ascii")},
+                {"mime_type": "image/jpeg", "data": image},
+            ]}
+        })))
+    return frames
+
+
+def synthetic_turn(reply_seconds: float = 3.0, part_ms: int = 40, speedup: float = 1.3) -> List[Frame]:
+    """An upstream model turn: PCM parts arriving a little faster than realtime."""
+    part = base64.b64encode(bytes(OUTPUT_RATE * 2 * part_ms // 1000)).decode("ascii")
+    message = json.dumps({"serverContent": {"modelTurn": {"parts": [
+        {"inlineData": {"mimeType": f"audio/pcm;rate={OUTPUT_RATE}", "data": part}}
+    ]}}})
+    count = max(int(reply_seconds * 1000 / part_ms), 1)
+    step = part_ms / 1000 / speedup
+    messages = [(i * step, message) for i in range(count)]
+    messages.append((count * step, json.dumps({"serverContent": {"turnComplete": True}})))
+    return messages
@@ -1,17 +1,39 @@
+import asyncio
 import base64
+import hmac
 import os
+import signal
+from typing import Optional
 from fastapi import FastAPI, Request, Form, WebSocket, WebSocketDisconnect
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
+from fastapi.middleware.gzip import GZipMiddleware
 from pathlib import Path
 import uvicorn
 
 from config import TEMPLATES_DIR, PROJECT_ID, LOCATION, MODEL_NAME, SYSTEM_PROMPTS, CRISIS_RESPONSE
+from config import ADMISSION_MAX_CONCURRENT, ADMISSION_PER_SESSION, ADMISSION_MAX_QUEUE, ADMISSION_MAX_WAIT_SECONDS
+from config import (
+    CHAT_DEADLINE_SECONDS, CHAT_DEADLINE_MAX_SECONDS, CHAT_DEADLINE_MIN_SECONDS, SEARCH_MIN_BUDGET_SECONDS,
+    GENERATION_MIN_BUDGET_SECONDS, CRISIS_CHECK_TIMEOUT_SECONDS, TTS_MIN_BUDGET_SECONDS, TTS_TIMEOUT_SECONDS
+)
+from config import LIVE_DRAIN_TIMEOUT_SECONDS, FUSED_CRISIS_DETECTION
+from config import SESSION_STATES, SESSION_SNAPSHOT_SECONDS, SESSION_SNAPSHOT_MIN_RECORDS
+from config import DEBUG_PROFILER_TOKEN, DEBUG_PROFILER_MAX_SECONDS
+from config import ASSET_MANIFEST, CACHE_INDEX_PAGE, RESPONSE_GZIP_MIN_BYTES, RESPONSE_GZIP_LEVEL
+from config import SEARCH_CONTEXT_TOKEN_BUDGET, SEARCH_DEDUP_THRESHOLD
 from utils import ensure_session_state, build_prompt, build_prompt_with_search_results, trim_history, log_crisis_event
-from search import should_perform_web_search, build_optimized_search_query, perform_web_search
-from models import MODEL, tools
-from live_session import gemini_live_session_handler
+from utils import append_history, set_mode, set_career_suggest, SESSION_JOURNAL
+from search import should_perform_web_search, build_optimized_search_query, perform_web_search, INTENT_ROUTER
+from search_context import build_search_context
+from models import MODEL, tools, CRISIS_ACTION, crisis_action, function_call_name, response_text
+from live_session import gemini_live_session_handler, live_pool, live_registry, build_live_config
+from admission import AdmissionController, AdmissionRejected, PRIORITY_URGENT, PRIORITY_DEFAULT, PRIORITY_CAREER
+from admission import SHARED_SESSION_ID
+from deadline import Deadline
+from circuit_breaker import get_breaker, breaker_snapshots, CircuitOpenError
+from sampling_profiler import SamplingProfiler, ProfilerBusy, ProfilerUnavailable, MODES as PROFILE_MODES
+from static_assets import AssetManifest, PrecompressedStaticFiles, CachedPage
 from google.cloud import texttospeech
 
 
@@ -22,14 +44,88 @@ GOOGLE_CSE_ID = os.environ.get("GOOGLE_CSE_ID")
 
 
 app = FastAPI()
+# Compresses JSON (e.g. HTML career answers) and anything else not already encoded
+app.add_middleware(GZipMiddleware, minimum_size=RESPONSE_GZIP_MIN_BYTES, compresslevel=RESPONSE_GZIP_LEVEL)
 templates = Jinja2Templates(directory=TEMPLATES_DIR)
+assets = AssetManifest(ASSET_MANIFEST)
+templates.env.globals["asset_url"] = assets.url
+index_page = CachedPage(lambda: templates.get_template("index.html").render(asset_url=assets.url))
+vertex_breaker = get_breaker("vertex")
+tts_breaker = get_breaker("tts")
+admission = AdmissionController(
+    max_concurrent=ADMISSION_MAX_CONCURRENT,
+    per_session=ADMISSION_PER_SESSION,
+    max_queue=ADMISSION_MAX_QUEUE,
+    max_wait=ADMISSION_MAX_WAIT_SECONDS,
+)
+profiler = SamplingProfiler()
+
+@app.on_event("startup")
+async def start_live_pool():
+    # Keep the default live session config warm from the start
+    live_pool.register(build_live_config({}))
+    live_pool.start()
+
+@app.on_event("startup")
+async def install_live_drain():
+    """Drain live sessions on SIGTERM before letting the server shut down.
+
+    Uvicorn closes open WebSockets as soon as it starts shutting down, so the
+    drain has to run first: our handler drains, then restores the previous
+    (uvicorn's) handler and re-raises the signal.
+    """
+    loop = asyncio.get_running_loop()
+    previous = signal.getsignal(signal.SIGTERM)
+
+    async def drain_then_exit():
+        try:
+            await live_registry.drain(LIVE_DRAIN_TIMEOUT_SECONDS)
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+            signal.raise_signal(signal.SIGTERM)
+
+    def on_sigterm(signum, frame):
+        if not live_registry.draining:
+            loop.call_soon_threadsafe(lambda: asyncio.ensure_future(drain_then_exit()))
+
+    try:
+        signal.signal(signal.SIGTERM, on_sigterm)
+    except ValueError:
+        # Not running in the main thread (e.g. some test runners); skip draining
+        pass
+
+@app.on_event("startup")
+async def watch_intent_rules():
+    # Hot-reload search triggers off the request path
+    INTENT_ROUTER.start()
+
+@app.on_event("startup")
+async def start_session_journal():
+    # Index sessions from before the restart; each is rebuilt when it is next used
+    if SESSION_JOURNAL:
+        SESSION_JOURNAL.start(SESSION_STATES, SESSION_SNAPSHOT_SECONDS, SESSION_SNAPSHOT_MIN_RECORDS)
+
+@app.on_event("shutdown")
+async def stop_live_pool():
+    await live_pool.stop()
+
+@app.on_event("shutdown")
+async def stop_intent_rules():
+    await INTENT_ROUTER.stop()
+
+@app.on_event("shutdown")
+async def stop_session_journal():
+    if SESSION_JOURNAL:
+        await SESSION_JOURNAL.stop()
 
 # Mount static files if directory exists
 if Path("static").exists():
-    app.mount("/static", StaticFiles(directory="static"), name="static")
+    app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
+    if CACHE_INDEX_PAGE:
+        return index_page.response(request)
     return templates.TemplateResponse("index.html", {"request": request})
 
 @app.websocket("/live-session")
@@ -37,8 +133,21 @@ async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for Gemini Live API sessions"""
     await gemini_live_session_handler(websocket)
 
+def chat_priority(message: str, session_id: str, career_suggest: bool, post_live_session: bool) -> int:
+    """Pick the admission priority class for a /chat request."""
+    if post_live_session:
+        return PRIORITY_URGENT
+    # The shared fallback id's mode says nothing about this particular user
+    if session_id != SHARED_SESSION_ID and not career_suggest:
+        if ensure_session_state(session_id)["mode"] == "voice_assistant":
+            return PRIORITY_URGENT
+    if not career_suggest and INTENT_ROUTER.crisis_rule(message):
+        return PRIORITY_URGENT
+    return PRIORITY_CAREER if career_suggest else PRIORITY_DEFAULT
+
 @app.post("/chat")
 async def chat(
+    request: Request,
     message: str = Form(...),
     session_id: str = Form("default"),
     system_key: str = Form("mental_health_wellness"),
@@ -46,38 +155,136 @@ async def chat(
     career_suggest: bool = Form(False),
     post_live_session: bool = Form(False)
 ):
+    # The budget covers queueing too; what is left after admission sizes every stage
+    deadline = Deadline.from_header(
+        request.headers.get("X-Request-Budget-Ms"), CHAT_DEADLINE_SECONDS, CHAT_DEADLINE_MAX_SECONDS,
+        CHAT_DEADLINE_MIN_SECONDS
+    )
+    priority = chat_priority(message, session_id, career_suggest, post_live_session)
+    try:
+        async with admission.slot(
+            session_id, priority, timeout=deadline.timeout(reserve=GENERATION_MIN_BUDGET_SECONDS)
+        ) as timings:
+            response = await process_chat(
+                message, session_id, system_key, context, career_suggest, post_live_session, deadline
+            )
+    except AdmissionRejected as rejected:
+        print(f"🚦 Chat request shed ({rejected.reason}), retry after {rejected.retry_after}s")
+        return JSONResponse({
+            "error": "MITRA is handling a lot of conversations right now. Please try again in a moment.",
+            "mode": "text",
+            "career_suggest_active": career_suggest,
+            "search_performed": False
+        }, status_code=503, headers={"Retry-After": str(rejected.retry_after)})
+
+    response.headers["Server-Timing"] = (
+        f"queue;dur={timings['queue'] * 1000:.1f}, service;dur={timings['service'] * 1000:.1f}"
+    )
+    return response
+
+async def synthesize_speech(text: str, timeout: float) -> str:
+    """Synthesize text with Cloud Text-to-Speech and return base64 MP3 audio."""
+    tts_client = texttospeech.TextToSpeechClient()
+    voice_config = texttospeech.VoiceSelectionParams(
+        language_code="en-US", name="en-US-Wavenet-F", 
+        ssml_gender=texttospeech.SsmlVoiceGender.FEMALE
+    )
+    audio_config = texttospeech.AudioConfig(
+        audio_encoding=texttospeech.AudioEncoding.MP3
+    )
+    synthesis_input = texttospeech.SynthesisInput(text=text)
+    tts_response = await asyncio.to_thread(
+        tts_client.synthesize_speech,
+        input=synthesis_input, voice=voice_config, audio_config=audio_config, timeout=timeout
+    )
+    return base64.b64encode(tts_response.audio_content).decode('utf-8')
+
+async def speak(text: str, deadline: Deadline) -> Optional[str]:
+    """Return base64 audio for text, or None (text-only reply) if the budget is too short or TTS fails."""
+    if not deadline.has(TTS_MIN_BUDGET_SECONDS):
+        deadline.degrade("audio_skipped")
+        return None
+    timeout = deadline.timeout(TTS_TIMEOUT_SECONDS)
+    try:
+        return await tts_breaker.call(synthesize_speech, text, timeout, timeout=timeout)
+    except CircuitOpenError:
+        deadline.degrade("audio_unavailable")
+    except asyncio.TimeoutError:
+        deadline.degrade("audio_timeout")
+    except Exception as tts_error:
+        print(f"⚠️ TTS error: {tts_error}")
+        deadline.degrade("audio_failed")
+    return None
+
+async def crisis_action_response(
+    action: str,
+    message: str,
+    session_id: str,
+    career_suggest: bool,
+    deadline: Deadline
+) -> JSONResponse:
+    """Apply a crisis/calm tool call to the session and build its reply."""
+    if action == CRISIS_ACTION:
+        log_crisis_event(session_id, message)
+        set_mode(session_id, "voice_assistant")
+
+        # Generate TTS response for crisis
+        base64_audio = await speak(CRISIS_RESPONSE, deadline)
+        
+        append_history(session_id, "user", message)
+        append_history(session_id, "assistant", CRISIS_RESPONSE)
+        
+        return JSONResponse({
+            "mode": "voice_assistant",
+            "audio": base64_audio,
+            "text_reply": CRISIS_RESPONSE,
+            "career_suggest_active": career_suggest,
+            "search_performed": False,
+            "crisis_detected": True,
+            "degraded": deadline.degradations
+        })
+
+    set_mode(session_id, "text")
+    reply = "I'm glad to hear you're feeling better. We can continue our conversation through text."
+    append_history(session_id, "user", message)
+    append_history(session_id, "assistant", reply)
+    return JSONResponse({
+        "mode": "text", 
+        "reply": reply,
+        "career_suggest_active": career_suggest,
+        "search_performed": False,
+        "degraded": deadline.degradations
+    })
+
+async def process_chat(
+    message: str,
+    session_id: str,
+    system_key: str,
+    context: str,
+    career_suggest: bool,
+    post_live_session: bool,
+    deadline: Deadline
+) -> JSONResponse:
     try:
         session_state = ensure_session_state(session_id)
         current_mode = session_state["mode"]
-        session_state["career_suggest_active"] = career_suggest
+        set_career_suggest(session_id, career_suggest)
 
         if session_state["career_suggest_active"] and session_state["mode"] == "voice_assistant":
-            session_state["mode"] = "text"
+            set_mode(session_id, "text")
             current_mode = session_state["mode"]
 
 
         # Handle post-live session check-in
         if post_live_session:
             check_in_message = "Are you feeling fine now? How was our live session together?"
-            session_state["mode"] = "voice_assistant"  # Force voice mode for check-in
+            set_mode(session_id, "voice_assistant")  # Force voice mode for check-in
             
             # Generate TTS response
-            tts_client = texttospeech.TextToSpeechClient()
-            voice_config = texttospeech.VoiceSelectionParams(
-                language_code="en-US", name="en-US-Wavenet-F", 
-                ssml_gender=texttospeech.SsmlVoiceGender.FEMALE
-            )
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3
-            )
-            synthesis_input = texttospeech.SynthesisInput(text=check_in_message)
-            tts_response = tts_client.synthesize_speech(
-                input=synthesis_input, voice=voice_config, audio_config=audio_config
-            )
-            base64_audio = base64.b64encode(tts_response.audio_content).decode('utf-8')
+            base64_audio = await speak(check_in_message, deadline)
             
             # Update history
-            session_state["history"].append({"role": "assistant", "text": check_in_message})
+            append_history(session_id, "assistant", check_in_message)
             
             return JSONResponse({
                 "mode": "voice_assistant",
@@ -85,7 +292,8 @@ async def chat(
                 "text_reply": check_in_message,
                 "career_suggest_active": career_suggest,
                 "search_performed": False,
-                "post_live_checkin": True
+                "post_live_checkin": True,
+                "degraded": deadline.degradations
             })
 
 
@@ -100,82 +308,47 @@ async def chat(
 
         if career_suggest:
             system_key = "career_suggest"
+            if needs_search and not deadline.has(SEARCH_MIN_BUDGET_SECONDS + GENERATION_MIN_BUDGET_SECONDS):
+                # Not enough time to search and still answer; answer from the model alone
+                needs_search = False
+                deadline.degrade("search_skipped")
             if needs_search:
                 print("🔍 Performing web search...")
                 search_query = build_optimized_search_query(message)
-                search_results, search_source = await perform_web_search(search_query, 6)
+                search_results, search_source = await perform_web_search(
+                    search_query, 6, timeout=deadline.timeout(reserve=GENERATION_MIN_BUDGET_SECONDS)
+                )
                 
                 if search_results:
                     print(f"✅ Search successful: {len(search_results)} results from {search_source}")
-                    search_context = f"SEARCH QUERY: '{search_query}'\nSOURCE: {search_source}\n\n"
-                    for i, result in enumerate(search_results, 1):
-                        search_context += f"RESULT {i}:\n"
-                        search_context += f"Title: {result['title']}\n"
-                        search_context += f"Content: {result['snippet']}\n"
-                        search_context += f"Source: {result.get('source', 'Web')}\n"
-                        if result.get('link'):
-                            search_context += f"URL: {result['link']}\n"
-                        search_context += "\n"
+                    search_context, context_report = build_search_context(
+                        search_query, search_source, search_results, message,
+                        token_budget=SEARCH_CONTEXT_TOKEN_BUDGET, dedup_threshold=SEARCH_DEDUP_THRESHOLD
+                    )
+                    print(f"🗜️ Search context: {context_report}")
                 else:
                     print("❌ Search failed")
                     search_context = "WEB SEARCH ATTEMPTED but no results found. Provide general guidance and suggest checking official websites.\n\n"
             else:
                 print("ℹ️ No search needed for this query")
 
-        # Crisis detection for mental health mode only
-        if not career_suggest:
+        # Crisis detection for mental health mode only. In fused mode the crisis/calm
+        # declarations ride on the main generation request instead of a separate call.
+        check_crisis = not career_suggest
+        fused = check_crisis and FUSED_CRISIS_DETECTION
+        if check_crisis and not fused and not deadline.has(GENERATION_MIN_BUDGET_SECONDS):
+            deadline.degrade("crisis_check_skipped")
+        elif check_crisis and not fused:
             try:
-                call_response = MODEL.generate_content(message, tools=[tools])
-                
-                if (call_response.candidates and 
-                    call_response.candidates[0].content.parts and
-                    hasattr(call_response.candidates[0].content.parts[0], 'function_call') and
-                    call_response.candidates[0].content.parts[0].function_call):
-                    
-                    tool_call = call_response.candidates[0].content.parts[0].function_call
-
-                    if tool_call.name == "handle_crisis_situation" and current_mode == "text":
-                        log_crisis_event(session_id, message)
-                        session_state["mode"] = "voice_assistant"
-
-                        # Generate TTS response for crisis
-                        tts_client = texttospeech.TextToSpeechClient()
-                        voice_config = texttospeech.VoiceSelectionParams(
-                            language_code="en-US", name="en-US-Wavenet-F", 
-                            ssml_gender=texttospeech.SsmlVoiceGender.FEMALE
-                        )
-                        audio_config = texttospeech.AudioConfig(
-                            audio_encoding=texttospeech.AudioEncoding.MP3
-                        )
-                        synthesis_input = texttospeech.SynthesisInput(text=CRISIS_RESPONSE)
-                        tts_response = tts_client.synthesize_speech(
-                            input=synthesis_input, voice=voice_config, audio_config=audio_config
-                        )
-                        base64_audio = base64.b64encode(tts_response.audio_content).decode('utf-8')
-                        
-                        session_state["history"].append({"role": "user", "text": message})
-                        session_state["history"].append({"role": "assistant", "text": CRISIS_RESPONSE})
-                        
-                        return JSONResponse({
-                            "mode": "voice_assistant",
-                            "audio": base64_audio,
-                            "text_reply": CRISIS_RESPONSE,
-                            "career_suggest_active": career_suggest,
-                            "search_performed": False,
-                            "crisis_detected": True
-                        })
-
-                    elif tool_call.name == "handle_calm_situation" and current_mode == "voice_assistant":
-                        session_state["mode"] = "text"
-                        reply = "I'm glad to hear you're feeling better. We can continue our conversation through text."
-                        session_state["history"].append({"role": "user", "text": message})
-                        session_state["history"].append({"role": "assistant", "text": reply})
-                        return JSONResponse({
-                            "mode": "text", 
-                            "reply": reply,
-                            "career_suggest_active": career_suggest,
-                            "search_performed": False
-                        })
+                call_response = await vertex_breaker.call(
+                    MODEL.generate_content_async, message, tools=[tools],
+                    timeout=deadline.timeout(CRISIS_CHECK_TIMEOUT_SECONDS, reserve=GENERATION_MIN_BUDGET_SECONDS)
+                )
+                action = crisis_action(function_call_name(call_response), current_mode)
+                if action:
+                    return await crisis_action_response(action, message, session_id, career_suggest, deadline)
+            except (asyncio.TimeoutError, CircuitOpenError):
+                deadline.degrade("crisis_check_skipped")
             except Exception as tool_error:
                 print(f"⚠️ Tool error: {tool_error}")
 
@@ -190,8 +363,34 @@ async def chat(
             full_prompt = build_prompt(system_prompt=system_prompt, context=context, history=history, user_message=message)
 
         print("🤖 Generating response...")
-        response = MODEL.generate_content([full_prompt])
-        reply = getattr(response, "text", None)
+        reply = None
+        if not deadline.has(GENERATION_MIN_BUDGET_SECONDS):
+            # Too little budget left for an answer; don't spend a doomed call on the model
+            deadline.degrade("generation_skipped")
+        else:
+            try:
+                # Leave room for TTS in voice mode; audio is dropped before the text is
+                reserve = TTS_MIN_BUDGET_SECONDS if current_mode == "voice_assistant" else 0.0
+                response = await vertex_breaker.call(
+                    MODEL.generate_content_async, [full_prompt], tools=[tools] if fused else None,
+                    timeout=deadline.timeout(reserve=reserve)
+                )
+                if fused:
+                    tool_name = function_call_name(response)
+                    action = crisis_action(tool_name, current_mode)
+                    if action:
+                        return await crisis_action_response(action, message, session_id, career_suggest, deadline)
+                reply = response_text(response)
+                if fused and not reply and tool_name:
+                    # The model only called a tool that doesn't apply in this mode; ask again for text
+                    response = await vertex_breaker.call(
+                        MODEL.generate_content_async, [full_prompt], timeout=deadline.timeout(reserve=reserve)
+                    )
+                    reply = response_text(response)
+            except asyncio.TimeoutError:
+                deadline.degrade("generation_timeout")
+            except CircuitOpenError:
+                deadline.degrade("generation_unavailable")
         
         if not reply:
             reply = "I apologize, but I'm having trouble generating a response right now. Please try again."
@@ -199,24 +398,12 @@ async def chat(
         print(f"✅ Response generated: {len(reply)} characters")
 
         # Update conversation history
-        session_state["history"].append({"role": "user", "text": message})
-        session_state["history"].append({"role": "assistant", "text": reply})
+        append_history(session_id, "user", message)
+        append_history(session_id, "assistant", reply)
 
         # Handle voice mode response
         if current_mode == "voice_assistant":
-            tts_client = texttospeech.TextToSpeechClient()
-            voice_config = texttospeech.VoiceSelectionParams(
-                language_code="en-US", name="en-US-Wavenet-F", 
-                ssml_gender=texttospeech.SsmlVoiceGender.FEMALE
-            )
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3
-            )
-            synthesis_input = texttospeech.SynthesisInput(text=reply)
-            tts_response = tts_client.synthesize_speech(
-                input=synthesis_input, voice=voice_config, audio_config=audio_config
-            )
-            base64_audio = base64.b64encode(tts_response.audio_content).decode('utf-8')
+            base64_audio = await speak(reply, deadline)
 
             return JSONResponse({
                 "mode": "voice_assistant",
@@ -224,7 +411,8 @@ async def chat(
                 "text_reply": reply,
                 "career_suggest_active": career_suggest,
                 "search_performed": needs_search,
-                "search_source": search_source
+                "search_source": search_source,
+                "degraded": deadline.degradations
             })
         else:
             return JSONResponse({
@@ -232,7 +420,8 @@ async def chat(
                 "mode": "text", 
                 "career_suggest_active": career_suggest,
                 "search_performed": needs_search,
-                "search_source": search_source
+                "search_source": search_source,
+                "degraded": deadline.degradations
             })
 
     except Exception as e:
@@ -243,7 +432,8 @@ async def chat(
             "error": f"I encountered an error processing your request. Please try again.",
             "mode": "text",
             "career_suggest_active": career_suggest,
-            "search_performed": False
+            "search_performed": False,
+            "degraded": deadline.degradations
         }, status_code=500)
 
 @app.get("/test_search")
@@ -266,7 +456,6 @@ async def test_search(q: str = "JEE Main 2025 dates"):
 
 @app.get("/_debug/sessions", response_class=JSONResponse)
 async def debug_sessions():
-    from config import SESSION_STATES
     return JSONResponse({
         "sessions_count": len(SESSION_STATES), 
         "sessions": {
@@ -275,18 +464,70 @@ async def debug_sessions():
                 "mode": v["mode"], 
                 "career_active": v.get("career_suggest_active", False)
             } for k, v in SESSION_STATES.items()
-        }
+        },
+        "live_sessions": live_registry.stats(),
+        "journal": SESSION_JOURNAL.stats() if SESSION_JOURNAL else None
+    })
+
+@app.get("/_debug/intents", response_class=JSONResponse)
+async def debug_intents():
+    return JSONResponse(INTENT_ROUTER.stats())
+
+@app.get("/_debug/profile")
+async def debug_profile(
+    request: Request,
+    seconds: float = 10.0,
+    mode: str = "wall",
+    interval_ms: float = 5.0,
+    idle: bool = False,
+    format: str = "collapsed"
+):
+    """Sample this worker for a few seconds and return collapsed stacks (flamegraph.pl / speedscope input).
+
+    mode=wall shows where time goes including waits; mode=cpu only on-CPU time.
+    format=json adds a summary with event-loop lag and the hottest frames.
+    """
+    # Without a configured token the endpoint does not exist
+    if not DEBUG_PROFILER_TOKEN:
+        return JSONResponse({"detail": "Not Found"}, status_code=404)
+    if not hmac.compare_digest(request.headers.get("X-Debug-Token", ""), DEBUG_PROFILER_TOKEN):
+        return JSONResponse({"error": "Invalid debug token"}, status_code=403)
+    if mode not in PROFILE_MODES:
+        return JSONResponse({"error": f"mode must be one of {', '.join(PROFILE_MODES)}"}, status_code=400)
+
+    seconds = min(max(seconds, 0.1), DEBUG_PROFILER_MAX_SECONDS)
+    interval = min(max(interval_ms, 1.0), 100.0) / 1000
+    try:
+        result = await profiler.run(seconds, mode=mode, interval=interval, include_idle=idle)
+    except ProfilerBusy:
+        return JSONResponse({"error": "A profile is already running"}, status_code=409)
+    except ProfilerUnavailable as e:
+        return JSONResponse({"error": str(e)}, status_code=400)
+
+    summary = result["summary"]
+    print(f"🔬 Profile ({mode}, {summary['seconds']}s): {summary['samples']} samples, "
+          f"loop lag max {summary['loop_lag']['max_ms']} ms")
+    if format == "json":
+        return JSONResponse(result)
+    return PlainTextResponse(result["collapsed"], headers={
+        "X-Profile-Samples": str(summary["samples"]),
+        "X-Loop-Lag-Max-Ms": str(summary["loop_lag"]["max_ms"]),
+        "X-Loop-Stalls": str(summary["loop_lag"]["stalls"]),
     })
 
 @app.get("/health")
 async def health_check():
     return {
-        "status": "healthy", 
+        "status": "draining" if live_registry.draining else "healthy",
         "model": MODEL_NAME,
         "search_apis": {
             "serpapi": "configured" if SERPAPI_KEY else "missing",
             "google_cse": "configured" if (GOOGLE_CSE_API_KEY and GOOGLE_CSE_ID) else "missing"
-        }
+        },
+        "admission": admission.stats(),
+        "providers": breaker_snapshots(),
+        "live_pool": live_pool.stats(),
+        "live_sessions": {k: v for k, v in live_registry.stats().items() if k != "sessions"}
     }
 
 if __name__ == "__main__":
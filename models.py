@@ -1,3 +1,4 @@
+from typing import Optional
 from google.cloud import aiplatform
 from vertexai.generative_models import GenerativeModel, FunctionDeclaration, Tool
 from config import PROJECT_ID, LOCATION, MODEL_NAME
@@ -39,4 +40,41 @@ calm_declaration = FunctionDeclaration(
     }
 )
 
-tools = Tool(function_declarations=[crisis_declaration, calm_declaration])
\ No newline at end of file
+tools = Tool(function_declarations=[crisis_declaration, calm_declaration])
+
+# Actions the server takes on a crisis/calm function call
+CRISIS_ACTION = "crisis"
+CALM_ACTION = "calm"
+
+def crisis_action(tool_name: Optional[str], current_mode: str) -> Optional[str]:
+    """Map a function call to a mode switch, or None if it doesn't apply in current_mode."""
+    if tool_name == "handle_crisis_situation" and current_mode == "text":
+        return CRISIS_ACTION
+    if tool_name == "handle_calm_situation" and current_mode == "voice_assistant":
+        return CALM_ACTION
+    return None
+
+def _parts(response) -> list:
+    if not response.candidates or not response.candidates[0].content.parts:
+        return []
+    return list(response.candidates[0].content.parts)
+
+def function_call_name(response) -> Optional[str]:
+    """Name of the first function call in a response, if any."""
+    for part in _parts(response):
+        function_call = getattr(part, "function_call", None)
+        if function_call and getattr(function_call, "name", None):
+            return function_call.name
+    return None
+
+def response_text(response) -> Optional[str]:
+    """Text of a response, skipping function call parts (response.text raises on those)."""
+    texts = []
+    for part in _parts(response):
+        try:
+            text = part.text
+        except (AttributeError, ValueError):
+            continue
+        if text:
+            texts.append(text)
+    return "".join(texts) or None
@@ -0,0 +1,215 @@
+import asyncio
+import collections
+import os
+import signal
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+MODES = ("wall", "cpu")
+
+# Leaf frames of threads that are parked, not working
+IDLE_LEAVES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+class ProfilerBusy(Exception):
+    """A profile is already running in this worker."""
+
+
+class ProfilerUnavailable(Exception):
+    """The requested mode cannot run here (e.g. CPU mode off the main thread)."""
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag by how late a short periodic sleep wakes up."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.beat = time.monotonic()
+        self.lags: List[float] = []
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            self.beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(loop.time() - started - self.interval, 0.0))
+
+    def summary(self, stall_threshold: float) -> Dict:
+        lags = sorted(self.lags)
+        stalls = [lag for lag in lags if lag >= stall_threshold]
+        return {
+            "max_ms": round(lags[-1] * 1000, 1) if lags else 0.0,
+            "p99_ms": round(lags[min(int(len(lags) * 0.99), len(lags) - 1)] * 1000, 1) if lags else 0.0,
+            "stalls": len(stalls),
+            "stalled_ms": round(sum(stalls) * 1000, 1),
+        }
+
+
+class SamplingProfiler:
+    """Time-boxed sampling profiler for the running worker, one run at a time.
+
+    ``wall`` mode samples every thread's stack from a background thread, so
+    it shows time spent waiting (blocking SDK calls, locks) as well as
+    computing. ``cpu`` mode samples on SIGPROF, which fires per interval of
+    process CPU time, so idle time drops out; the event-loop thread is
+    sampled, or the busy worker threads while the loop is parked. Samples
+    from the loop thread are prefixed with the running asyncio task, and in
+    wall mode samples taken while the loop is stalled are marked as such.
+
+    Nothing runs between profiles, so it costs nothing when not in use.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or os.getcwd()
+        self._running = False
+        self._labels: Dict = {}
+
+    @property
+    def busy(self) -> bool:
+        return self._running
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            if filename.startswith(self.root):
+                filename = os.path.relpath(filename, self.root)
+            elif "site-packages" in filename:
+                filename = filename.split("site-packages" + os.sep, 1)[-1]
+            else:
+                filename = os.path.basename(filename)
+            # Function first line, not current line, so samples aggregate per function
+            label = f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
+
+    def _stack(self, frame) -> List[str]:
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    @staticmethod
+    def _idle(frame) -> bool:
+        return (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_LEAVES
+
+    @staticmethod
+    def _task_label(loop) -> Optional[str]:
+        try:
+            task = asyncio.current_task(loop)
+        except RuntimeError:
+            return None
+        if task is None:
+            return None
+        coro = task.get_coro()
+        return f"task:{getattr(coro, '__qualname__', task.get_name())}"
+
+    def _sample_wall(self, stop: threading.Event, interval: float, loop, loop_thread: int,
+                     monitor: LoopLagMonitor, stall_threshold: float, include_idle: bool,
+                     counts: collections.Counter):
+        own = threading.get_ident()
+        names: Dict[int, str] = {}
+        names_at = 0.0
+        while not stop.wait(interval):
+            now = time.monotonic()
+            if now - names_at > 1.0:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                names_at = now
+            stalled = now - monitor.beat > stall_threshold + monitor.interval
+            for ident, frame in sys._current_frames().items():
+                if ident == own or (not include_idle and self._idle(frame)):
+                    continue
+                prefix = [f"thread:{names.get(ident, ident)}"]
+                if ident == loop_thread:
+                    if stalled:
+                        prefix.append("[event loop stalled]")
+                    task = self._task_label(loop)
+                    if task:
+                        prefix.append(task)
+                counts[";".join(prefix + self._stack(frame))] += 1
+
+    async def run(self, seconds: float, mode: str = "wall", interval: float = 0.005,
+                  include_idle: bool = False, stall_threshold: float = 0.05) -> Dict:
+        """Profile for seconds; return collapsed stacks plus a summary."""
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}")
+        if mode == "cpu" and (not hasattr(signal, "SIGPROF")
+                              or threading.current_thread() is not threading.main_thread()):
+            raise ProfilerUnavailable("cpu mode needs SIGPROF and the event loop on the main thread")
+        if self._running:
+            raise ProfilerBusy()
+        self._running = True
+
+        loop = asyncio.get_running_loop()
+        counts: collections.Counter = collections.Counter()
+        monitor = LoopLagMonitor()
+        lag_task = asyncio.create_task(monitor.run())
+        started = time.monotonic()
+        cpu_started = time.process_time()
+        try:
+            if mode == "wall":
+                stop = threading.Event()
+                sampler = threading.Thread(
+                    target=self._sample_wall, name="sampling-profiler", daemon=True,
+                    args=(stop, interval, loop, threading.get_ident(), monitor, stall_threshold,
+                          include_idle, counts),
+                )
+                sampler.start()
+                try:
+                    await asyncio.sleep(seconds)
+                finally:
+                    stop.set()
+                    await asyncio.to_thread(sampler.join)
+            else:
+                def on_sigprof(signum, frame):
+                    if self._idle(frame):
+                        # The loop is parked, so the CPU went to a worker thread (to_thread, SDK pools)
+                        names = {t.ident: t.name for t in threading.enumerate()}
+                        main = threading.main_thread().ident
+                        for ident, other in sys._current_frames().items():
+                            if ident != main and not self._idle(other):
+                                counts[";".join([f"thread:{names.get(ident, ident)}"] + self._stack(other))] += 1
+                        return
+                    task = self._task_label(loop)
+                    counts[";".join((["thread:MainThread", task] if task else ["thread:MainThread"])
+                                    + self._stack(frame))] += 1
+
+                previous = signal.signal(signal.SIGPROF, on_sigprof)
+                signal.setitimer(signal.ITIMER_PROF, interval, interval)
+                try:
+                    await asyncio.sleep(seconds)
+                finally:
+                    signal.setitimer(signal.ITIMER_PROF, 0, 0)
+                    signal.signal(signal.SIGPROF, previous)
+        finally:
+            lag_task.cancel()
+            self._running = False
+
+        self_counts: collections.Counter = collections.Counter()
+        for stack, count in counts.items():
+            self_counts[stack.rsplit(";", 1)[-1]] += count
+        return {
+            "collapsed": "\n".join(f"{stack} {count}" for stack, count in sorted(counts.items())) + "\n",
+            "summary": {
+                "mode": mode,
+                "seconds": round(time.monotonic() - started, 2),
+                "cpu_seconds": round(time.process_time() - cpu_started, 2),
+                "interval_ms": interval * 1000,
+                "samples": sum(counts.values()),
+                "stacks": len(counts),
+                "loop_lag": monitor.summary(stall_threshold),
+                "top_self": [{"frame": frame, "samples": n} for frame, n in self_counts.most_common(15)],
+            },
+        }
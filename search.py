@@ -1,17 +1,40 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
 import aiohttp
+import asyncio
 # from config import SERPAPI_KEY, GOOGLE_CSE_API_KEY, GOOGLE_CSE_ID
 import os
+import time
+from pathlib import Path
+
+from intent_router import DEFAULT_RULES_PATH, IntentRouter
+from circuit_breaker import get_breaker
 
 
 SERPAPI_KEY = os.environ.get("SERPAPI_KEY")
 GOOGLE_CSE_API_KEY = os.environ.get("GOOGLE_CSE_API_KEY")
 GOOGLE_CSE_ID = os.environ.get("GOOGLE_CSE_ID")
 
+# Shortest per-provider timeout worth attempting a request with
+MIN_PROVIDER_TIMEOUT = 1.0
+
+# Per-provider breakers; an open one makes its search return [] immediately
+CSE_BREAKER = get_breaker("google_cse")
+SERPAPI_BREAKER = get_breaker("serpapi")
+
+# Search triggers and query templates, hot-reloaded from the rules file
+INTENT_ROUTER = IntentRouter(
+    Path(os.environ.get("INTENT_RULES_PATH", DEFAULT_RULES_PATH)),
+    reload_interval=float(os.environ.get("INTENT_RULES_RELOAD_SECONDS", "5")),
+)
 
-async def search_serpapi(query: str, num_results: int = 8) -> List[Dict]:
+
+async def search_serpapi(query: str, num_results: int = 8, timeout: float = 15) -> List[Dict]:
     """Search using SerpApi."""
     print(f"🔍 SerpApi search: {query}")
+    if not SERPAPI_BREAKER.allow():
+        print("⚡ SerpApi circuit open, skipping")
+        return []
+    start = time.monotonic()
     try:
         url = "https://serpapi.com/search"
         params = {
@@ -25,7 +48,7 @@ async def search_serpapi(query: str, num_results: int = 8) -> List[Dict]:
         }
         
         async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params, timeout=15) as response:
+            async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
                 print(f"SerpApi response status: {response.status}")
                 if response.status == 200:
                     data = await response.json()
@@ -64,20 +87,31 @@ async def search_serpapi(query: str, num_results: int = 8) -> List[Dict]:
                                 "source": "Google Search"
                             })
                     
+                    SERPAPI_BREAKER.record_success(time.monotonic() - start)
                     print(f"SerpApi found {len(results)} results")
                     return results[:num_results]
                 else:
+                    SERPAPI_BREAKER.record_failure(time.monotonic() - start)
                     return []
+    except asyncio.TimeoutError:
+        SERPAPI_BREAKER.record_timeout(timeout, time.monotonic() - start)
+        print(f"SerpApi timed out after {timeout:.1f}s")
+        return []
     except Exception as e:
+        SERPAPI_BREAKER.record_failure(time.monotonic() - start)
         print(f"SerpApi exception: {e}")
         return []
 
-async def search_google_custom(query: str, num_results: int = 5) -> List[Dict]:
+async def search_google_custom(query: str, num_results: int = 5, timeout: float = 10) -> List[Dict]:
     """Search using Google Custom Search API with official education sites."""
     if not GOOGLE_CSE_API_KEY or not GOOGLE_CSE_ID:
         print("Google Custom Search credentials missing")
         return []
+    if not CSE_BREAKER.allow():
+        print("⚡ Google Custom Search circuit open, skipping")
+        return []
     
+    start = time.monotonic()
     try:
         url = "https://www.googleapis.com/customsearch/v1"
         params = {
@@ -92,7 +126,7 @@ async def search_google_custom(query: str, num_results: int = 5) -> List[Dict]:
         }
         
         async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params, timeout=10) as response:
+            async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
                 if response.status == 200:
                     data = await response.json()
                     results = []
@@ -108,26 +142,45 @@ async def search_google_custom(query: str, num_results: int = 5) -> List[Dict]:
                                 "source": "Official Education Sites"
                             })
                     
+                    CSE_BREAKER.record_success(time.monotonic() - start)
                     print(f"Google Custom Search found {len(results)} results")
                     return results
                 else:
+                    CSE_BREAKER.record_failure(time.monotonic() - start)
                     print(f"Google Custom Search API error: {response.status}")
                     return []
+    except asyncio.TimeoutError:
+        CSE_BREAKER.record_timeout(timeout, time.monotonic() - start)
+        print(f"Google Custom Search timed out after {timeout:.1f}s")
+        return []
     except Exception as e:
+        CSE_BREAKER.record_failure(time.monotonic() - start)
         print(f"Google Custom Search exception: {e}")
         return []
 
-async def perform_web_search(query: str, num_results: int = 6) -> tuple[List[Dict], str]:
-    """Perform web search with prioritization of Google Custom Search."""
+async def perform_web_search(query: str, num_results: int = 6, timeout: Optional[float] = None) -> tuple[List[Dict], str]:
+    """Perform web search with prioritization of Google Custom Search.
+
+    ``timeout`` bounds the whole search, fallback included; each provider
+    gets whatever is left of it, up to its own limit.
+    """
     print(f"🌐 Intelligent search for: '{query}'")
-    
-    results = await search_google_custom(query, num_results)
+    expires_at = time.monotonic() + timeout if timeout is not None else None
+
+    def budget(cap: float) -> float:
+        return cap if expires_at is None else min(cap, expires_at - time.monotonic())
+
+    results = await search_google_custom(query, num_results, timeout=budget(10))
     if results and len(results) >= 2:
         print(f"✅ Google Custom Search successful: {len(results)} results")
         return results, "Google Custom Search"
     
+    if budget(15) < MIN_PROVIDER_TIMEOUT:
+        print("⏱️ No search budget left for SerpApi fallback")
+        return [], "Search unavailable"
+
     print("⚠️ Trying SerpApi for broader search...")
-    serp_results = await search_serpapi(query, num_results)
+    serp_results = await search_serpapi(query, num_results, timeout=budget(15))
     if serp_results:
         print(f"✅ SerpApi successful: {len(serp_results)} results")
         return serp_results, "SerpApi"
@@ -137,53 +190,10 @@ async def perform_web_search(query: str, num_results: int = 6) -> tuple[List[Dic
 
 def build_optimized_search_query(user_message: str) -> str:
     """Build optimized search queries for better results."""
-    message_lower = user_message.lower()
-    
-    if "jee" in message_lower and ("2025" in message_lower or "date" in message_lower):
-        return "JEE Main 2025 exam dates official NTA schedule"
-    
-    if "neet" in message_lower and ("2025" in message_lower or "date" in message_lower):
-        return "NEET 2025 exam date official NTA notification"
-        
-    if any(term in message_lower for term in ["after 10th", "10th class"]):
-        return "career options after 10th class India 2024 2025"
-    elif any(term in message_lower for term in ["after 12th", "12th class"]):
-        return "career options after 12th India 2024 2025"
-    elif "cutoff" in message_lower:
-        return f"college cutoff 2024 India admission {user_message}"
-    elif "admission" in message_lower:
-        return f"college admission process 2024 2025 India {user_message}"
-    
-    return f"{user_message} India 2024 2025 official"
+    return INTENT_ROUTER.rewrite_query(user_message)
 
 def should_perform_web_search(message: str, career_mode: bool) -> bool:
     """Detect when a web search is needed."""
     if not career_mode:
         return False
-    
-    always_search = [
-        "date", "2025", "2024", "when", "cutoff", "admission", "latest",
-        "current", "fees", "ranking", "eligibility", "notification",
-        "result", "exam", "application", "form", "last date"
-    ]
-    
-    search_triggers = [
-        "jee", "neet", "clat", "gate", "cat", "mat", "xat",
-        "iit", "nit", "iiit", "aiims", "jipmer"
-    ]
-    
-    message_lower = message.lower()
-    
-    if any(term in message_lower for term in always_search):
-        return True
-        
-    if any(term in message_lower for term in search_triggers):
-        return True
-        
-    if any(phrase in message_lower for phrase in [
-        "career option", "what should i", "which course", "best college",
-        "how to get", "admission process"
-    ]):
-        return True
-    
-    return False
\ No newline at end of file
+    return INTENT_ROUTER.search_rule(message) is not None
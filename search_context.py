@@ -0,0 +1,142 @@
+import hashlib
+import math
+import re
+from typing import Dict, List, Tuple
+
+
+WORD = re.compile(r"\w+")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i in is it me my of on or should "
+    "the to what when where which who why will with you your".split()
+)
+
+# Mersenne prime for the MinHash permutations h(x) = (a * x + b) mod p
+_PRIME = (1 << 61) - 1
+_NUM_PERM = 32
+_PERMUTATIONS = [
+    (int.from_bytes(hashlib.blake2b(f"a{i}".encode(), digest_size=8).digest(), "big") % (_PRIME - 1) + 1,
+     int.from_bytes(hashlib.blake2b(f"b{i}".encode(), digest_size=8).digest(), "big") % _PRIME)
+    for i in range(_NUM_PERM)
+]
+
+
+def approx_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English)."""
+    return math.ceil(len(text) / 4)
+
+
+def _words(text: str) -> List[str]:
+    return WORD.findall(text.lower())
+
+
+def minhash(text: str, shingle_size: int = 3) -> Tuple[int, ...]:
+    """MinHash signature over word shingles of text."""
+    words = _words(text)
+    shingles = {" ".join(words[i:i + shingle_size]) for i in range(max(len(words) - shingle_size + 1, 1))}
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in shingles]
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two MinHash signatures."""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def rank_results(results: List[Dict], user_message: str) -> List[Tuple[float, Dict]]:
+    """Score results by BM25-style overlap with the user's message, best first."""
+    query_terms = [w for w in set(_words(user_message)) if w not in STOPWORDS]
+    docs = [_words(f"{r.get('title', '')} {r.get('snippet', '')}") for r in results]
+    avg_len = sum(map(len, docs)) / len(docs) if docs else 1.0
+    doc_freq = {term: sum(1 for doc in docs if term in doc) for term in query_terms}
+
+    scored = []
+    for position, (result, doc) in enumerate(zip(results, docs)):
+        score = 0.0
+        for term in query_terms:
+            tf = doc.count(term)
+            if tf:
+                idf = math.log(1 + (len(docs) - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+                score += idf * tf * 2.2 / (tf + 1.2 * (0.25 + 0.75 * len(doc) / max(avg_len, 1)))
+        # Provider order is a useful prior when relevance ties
+        score += 0.1 / (position + 1)
+        scored.append((score, result))
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return scored
+
+
+def _trim(text: str, max_tokens: int) -> str:
+    """Cut text to about max_tokens, preferring a sentence then a word boundary."""
+    limit = max_tokens * 4
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    sentences = SENTENCE_END.split(cut)
+    if len(sentences) > 1:
+        return " ".join(sentences[:-1])
+    return cut.rsplit(" ", 1)[0] + " …"
+
+
+def _format_result(index: int, result: Dict) -> str:
+    block = f"RESULT {index}:\n"
+    block += f"Title: {result['title']}\n"
+    block += f"Content: {result['snippet']}\n"
+    block += f"Source: {result.get('source', 'Web')}\n"
+    if result.get("also_sources"):
+        block += f"Also reported by: {', '.join(result['also_sources'])}\n"
+    if result.get("link"):
+        block += f"URL: {result['link']}\n"
+    return block + "\n"
+
+
+def build_search_context(search_query: str, search_source: str, results: List[Dict], user_message: str,
+                         token_budget: int = 600, dedup_threshold: float = 0.6) -> Tuple[str, Dict]:
+    """Dedupe, rank and pack search results into a prompt block within token_budget.
+
+    Near-duplicate snippets (SerpApi often repeats one passage in the answer
+    box, knowledge graph and organic results) are collapsed into the
+    best-ranked copy, which keeps the others' sources. Results are then added
+    in relevance order until the budget is used; the last one may be trimmed.
+    Returns the context block and a report of what was cut.
+    """
+    header = f"SEARCH QUERY: '{search_query}'\nSOURCE: {search_source}\n\n"
+    naive = header + "".join(_format_result(i, r) for i, r in enumerate(results, 1))
+
+    kept: List[Tuple[Dict, Tuple[int, ...]]] = []
+    duplicates = 0
+    for _, result in rank_results(results, user_message):
+        signature = minhash(f"{result.get('title', '')} {result.get('snippet', '')}")
+        original = next((k for k, sig in kept if similarity(sig, signature) >= dedup_threshold), None)
+        if original is not None:
+            duplicates += 1
+            source = result.get("source", "Web")
+            if source != original.get("source") and source not in original["also_sources"]:
+                original["also_sources"].append(source)
+            continue
+        kept.append((dict(result, also_sources=[]), signature))
+
+    context = header
+    packed, over_budget = 0, 0
+    for result, _ in kept:
+        remaining = token_budget - approx_tokens(context)
+        block = _format_result(packed + 1, result)
+        if approx_tokens(block) > remaining:
+            overhead = approx_tokens(block) - approx_tokens(result["snippet"])
+            if remaining - overhead < 30:
+                over_budget += 1
+                continue
+            result = dict(result, snippet=_trim(result["snippet"], remaining - overhead))
+            block = _format_result(packed + 1, result)
+        context += block
+        packed += 1
+
+    report = {
+        "results": len(results),
+        "packed": packed,
+        "duplicates": duplicates,
+        "over_budget": over_budget,
+        "tokens_before": approx_tokens(naive),
+        "tokens_after": approx_tokens(context),
+    }
+    return context, report
@@ -0,0 +1,383 @@
+import asyncio
+import json
+import mmap
+import os
+import queue
+import re
+import struct
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+# Record: u32 body length | u32 crc32(body) | body, where body is
+#   u16 session id length | session id (UTF-8) | event JSON
+_HEADER = struct.Struct("<II")
+_SID_LEN = struct.Struct("<H")
+_FILE = re.compile(r"^(journal|snapshot)-(\d+)\.(log|snap)$")
+
+# Writer thread commands
+_ROTATE = "rotate"
+_FLUSH = "flush"
+_STOP = "stop"
+
+# (mapped file, record start, record end)
+Span = Tuple[mmap.mmap, int, int]
+
+
+def encode_record(session_id: str, event: Dict) -> bytes:
+    sid = session_id.encode("utf-8")
+    body = _SID_LEN.pack(len(sid)) + sid + json.dumps(event, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(len(body), zlib.crc32(body)) + body
+
+
+def new_state() -> Dict:
+    return {"history": [], "mode": "text", "career_suggest_active": False}
+
+
+def apply_event(state: Dict, event: Dict) -> Dict:
+    """Apply one journal event to a session state and return it.
+
+    Events are {"h": [role, text]} (history append), {"m": mode},
+    {"c": career_suggest_active} or {"s": state} (full state from a snapshot).
+    """
+    if "h" in event:
+        role, text = event["h"]
+        state["history"].append({"role": role, "text": text})
+    elif "m" in event:
+        state["mode"] = event["m"]
+    elif "c" in event:
+        state["career_suggest_active"] = event["c"]
+    elif "s" in event:
+        state = new_state()
+        state.update(event["s"])
+    return state
+
+
+class SessionJournal:
+    """Append-only, checksummed journal of session history and mode changes.
+
+    ``append()`` only queues the event; a writer thread encodes whatever has
+    queued up and commits it with one write and one fsync (group commit), so
+    the event loop never blocks on disk. ``snapshot()`` periodically rotates
+    to a new journal generation and writes a compacted snapshot of the old
+    ones, keeping recovery time bounded.
+
+    On startup ``load()`` maps the latest snapshot and the journals after it
+    and indexes records by session without decoding them. ``restore()``
+    decodes a session the first time it is used again.
+
+    Files are ``snapshot-N.snap`` (all state from before ``journal-N.log``)
+    and ``journal-N.log``; recovery reads the newest snapshot and every
+    journal from its generation on.
+    """
+
+    def __init__(self, directory: str, fsync: bool = True, snapshot_history: int = 50):
+        self.directory = Path(directory)
+        self.fsync = fsync
+        self.snapshot_history = snapshot_history
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._index: Dict[str, List[Span]] = {}
+        self._maps: List[mmap.mmap] = []
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+        self._generation = 0
+        self._snapshotting = False
+        self._task: Optional[asyncio.Task] = None
+        self.records_since_snapshot = 0
+        self.counters = {
+            "records": 0, "batches": 0, "bytes": 0, "errors": 0, "restored": 0,
+            "corrupt_tails": 0, "snapshots": 0,
+        }
+        self.load_seconds = 0.0
+        self.last_snapshot_seconds = 0.0
+
+    # ----- recovery -----
+
+    def _generations(self) -> Dict[str, List[int]]:
+        found = {"journal": [], "snapshot": []}
+        if self.directory.exists():
+            for path in self.directory.iterdir():
+                match = _FILE.match(path.name)
+                if match:
+                    found[match.group(1)].append(int(match.group(2)))
+        return {kind: sorted(gens) for kind, gens in found.items()}
+
+    def _map(self, path: Path) -> Optional[mmap.mmap]:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return mapped
+
+    def _scan(self, mapped: mmap.mmap, index: Dict[str, List[Span]]) -> int:
+        """Index every whole, valid record; return how many bytes were valid."""
+        view = memoryview(mapped)
+        size, pos = len(mapped), 0
+        try:
+            while pos + _HEADER.size <= size:
+                length, crc = _HEADER.unpack_from(mapped, pos)
+                start, end = pos + _HEADER.size, pos + _HEADER.size + length
+                if end > size or length < _SID_LEN.size or zlib.crc32(view[start:end]) != crc:
+                    break
+                sid_len = _SID_LEN.unpack_from(mapped, start)[0]
+                sid = mapped[start + 2:start + 2 + sid_len].decode("utf-8")
+                spans = index.get(sid)
+                if spans is None:
+                    index[sid] = [(mapped, pos, end)]
+                else:
+                    spans.append((mapped, pos, end))
+                pos = end
+        finally:
+            view.release()
+        return pos
+
+    def load(self) -> int:
+        """Index the newest snapshot and later journals; return the number of sessions."""
+        started = time.perf_counter()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        gens = self._generations()
+        base = gens["snapshot"][-1] if gens["snapshot"] else 0
+        paths = [self.directory / f"snapshot-{base}.snap"] if gens["snapshot"] else []
+        paths += [self.directory / f"journal-{g}.log" for g in gens["journal"] if g >= base]
+
+        index: Dict[str, List[Span]] = {}
+        for path in paths:
+            mapped = self._map(path)
+            if mapped is None:
+                continue
+            valid = self._scan(mapped, index)
+            if valid < len(mapped):
+                # A crash mid-write leaves a torn last batch; everything before it is intact
+                self.counters["corrupt_tails"] += 1
+                print(f"Session journal: ignoring {len(mapped) - valid} bytes of torn tail in {path.name}")
+        with self._lock:
+            self._index = index
+        # Never append to a file that may have a torn tail: start a new generation
+        self._generation = max(gens["journal"] + gens["snapshot"] + [0]) + 1
+        self.load_seconds = time.perf_counter() - started
+        return len(index)
+
+    def restore(self, session_id: str) -> Optional[Dict]:
+        """Rebuild a session from disk the first time it is used after a restart."""
+        # Decode under the lock: a finishing snapshot may close the old mappings
+        with self._lock:
+            spans = self._index.pop(session_id, None)
+            if not spans:
+                return None
+            state = new_state()
+            for mapped, start, end in spans:
+                body_start = start + _HEADER.size
+                sid_len = _SID_LEN.unpack_from(mapped, body_start)[0]
+                state = apply_event(state, json.loads(mapped[body_start + 2 + sid_len:end]))
+        self.counters["restored"] += 1
+        return state
+
+    # ----- writing -----
+
+    def _open_journal(self, generation: int):
+        self._file = open(self.directory / f"journal-{generation}.log", "ab")
+
+    def start_writer(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._open_journal(self._generation)
+        self._thread = threading.Thread(target=self._run, name="session-journal", daemon=True)
+        self._thread.start()
+
+    def append(self, session_id: str, event: Dict):
+        """Queue an event for the writer thread (never blocks)."""
+        if self._thread is not None:
+            self._queue.put((session_id, event))
+            self.records_since_snapshot += 1
+
+    def _commit(self, chunks: List[bytes]):
+        if not chunks:
+            return
+        data = b"".join(chunks)
+        try:
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.counters["records"] += len(chunks)
+            self.counters["batches"] += 1
+            self.counters["bytes"] += len(data)
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"Session journal write failed, {len(chunks)} record(s) lost: {e}")
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            # Group commit: everything that queued up while the last fsync ran goes in one write
+            while len(items) < 4096:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            chunks = []
+            for first, second in items:
+                if first == _ROTATE:
+                    self._commit(chunks)
+                    chunks = []
+                    self._write_snapshot(*second)
+                elif first == _FLUSH:
+                    self._commit(chunks)
+                    chunks = []
+                    second.set()
+                elif first == _STOP:
+                    self._commit(chunks)
+                    self._file.close()
+                    return
+                else:
+                    try:
+                        chunks.append(encode_record(first, second))
+                    except Exception as e:
+                        self.counters["errors"] += 1
+                        print(f"Session journal could not encode event for {first}: {e}")
+            self._commit(chunks)
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Block until everything appended so far is on disk."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        return done.wait(timeout)
+
+    # ----- compaction -----
+
+    def snapshot(self, states: Dict[str, Dict]) -> bool:
+        """Start a compacted snapshot of states plus sessions not yet restored.
+
+        Runs on the event loop only long enough to copy references; the
+        writer thread does the rest. Returns False if one is already running.
+        """
+        if self._thread is None or self._snapshotting:
+            return False
+        self._snapshotting = True
+        keep = self.snapshot_history
+        frozen = {
+            sid: {
+                "history": state["history"][-keep:],
+                "mode": state["mode"],
+                "career_suggest_active": state.get("career_suggest_active", False),
+            }
+            for sid, state in states.items()
+        }
+        with self._lock:
+            pending = dict(self._index)
+        self._generation += 1
+        # Queued behind every event so far: those land in the old journal, later ones in the new
+        self._queue.put((_ROTATE, (self._generation, frozen, pending)))
+        self.records_since_snapshot = 0
+        return True
+
+    def _write_snapshot(self, generation: int, frozen: Dict[str, Dict], pending: Dict[str, List[Span]]):
+        started = time.perf_counter()
+        try:
+            self._file.close()
+            self._open_journal(generation)
+
+            final = self.directory / f"snapshot-{generation}.snap"
+            temp = final.with_suffix(".tmp")
+            offsets: Dict[str, List[Tuple[int, int]]] = {}
+            position = 0
+            with open(temp, "wb") as out:
+                for sid, state in frozen.items():
+                    position += out.write(encode_record(sid, {"s": state}))
+                # Sessions nobody has touched since the restart are copied through as-is
+                for sid, spans in pending.items():
+                    if sid in frozen:
+                        continue
+                    copied = offsets[sid] = []
+                    for mapped, start, end in spans:
+                        copied.append((position, position + end - start))
+                        position += out.write(mapped[start:end])
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(temp, final)
+            self._sync_directory()
+
+            mapped = self._map(final)
+            with self._lock:
+                for sid, spans in offsets.items():
+                    # Skip sessions restored while the snapshot was being written
+                    if sid in self._index:
+                        self._index[sid] = [(mapped, start, end) for start, end in spans]
+                old_maps = [m for m in self._maps if m is not mapped]
+                self._maps = [mapped] if mapped is not None else []
+                for old in old_maps:
+                    old.close()
+            for path in self.directory.iterdir():
+                match = _FILE.match(path.name)
+                if match and int(match.group(2)) < generation:
+                    path.unlink()
+            self.counters["snapshots"] += 1
+            self.last_snapshot_seconds = time.perf_counter() - started
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"Session journal snapshot {generation} failed: {e}")
+        finally:
+            self._snapshotting = False
+
+    def _sync_directory(self):
+        try:
+            fd = os.open(self.directory, os.O_RDONLY)
+        except OSError:
+            return  # Not supported on this platform (e.g. Windows)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    # ----- lifecycle -----
+
+    async def _snapshot_loop(self, states: Dict[str, Dict], interval: float, min_records: int):
+        while True:
+            await asyncio.sleep(interval)
+            if self.records_since_snapshot >= min_records:
+                self.snapshot(states)
+
+    def start(self, states: Dict[str, Dict], snapshot_interval: float, snapshot_min_records: int):
+        """Load existing state, start the writer and periodic snapshots (needs a running loop)."""
+        sessions = self.load()
+        print(f"📒 Session journal: {sessions} session(s) indexed in {self.load_seconds * 1000:.0f} ms")
+        self.start_writer()
+        self._task = asyncio.get_running_loop().create_task(
+            self._snapshot_loop(states, snapshot_interval, snapshot_min_records)
+        )
+
+    def close(self, timeout: float = 10.0):
+        if self._thread is not None:
+            self._queue.put((_STOP, None))
+            self._thread.join(timeout)
+            self._thread = None
+        with self._lock:
+            self._index = {}
+            maps, self._maps = self._maps, []
+        for mapped in maps:
+            mapped.close()
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+        await asyncio.to_thread(self.close)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            unrestored = len(self._index)
+        return {
+            **self.counters,
+            "generation": self._generation,
+            "queued": self._queue.qsize(),
+            "unrestored_sessions": unrestored,
+            "records_since_snapshot": self.records_since_snapshot,
+            "load_ms": round(self.load_seconds * 1000, 1),
+            "last_snapshot_ms": round(self.last_snapshot_seconds * 1000, 1),
+        }
@@ -1,30 +1,102 @@
+// Plays PCM pushed from the main thread through a preallocated ring buffer.
+// Writes and reads copy only the new samples, instead of reallocating the
+// whole pending buffer on every message and every render quantum.
+const RING_SECONDS = 30;
+const PREBUFFER_SECONDS = 0.1;
+const STATS_INTERVAL_BLOCKS = 375; // ~2 s of 128-sample blocks at 24 kHz
+
 class PCMProcessor extends AudioWorkletProcessor {
     constructor() {
         super();
-        this.buffer = new Float32Array();
+        this.ring = new Float32Array(Math.ceil(sampleRate * RING_SECONDS));
+        this.readIndex = 0;
+        this.writeIndex = 0;
+        this.available = 0;
+        this.prebuffer = Math.ceil(sampleRate * PREBUFFER_SECONDS);
+
+        // Wait for a little audio before starting so network jitter doesn't glitch
+        this.playing = false;
+        this.turnComplete = false;
+
+        this.underruns = 0;
+        this.overflows = 0;
+        this.blocks = 0;
 
-        // Correct way to handle messages in AudioWorklet
         this.port.onmessage = (e) => {
-            const newData = e.data;
-            const newBuffer = new Float32Array(this.buffer.length + newData.length);
-            newBuffer.set(this.buffer);
-            newBuffer.set(newData, this.buffer.length);
-            this.buffer = newBuffer;
+            const data = e.data;
+            if (data instanceof Float32Array) {
+                this.write(data);
+            } else if (data && data.type === 'turn_complete') {
+                this.turnComplete = true;
+            }
         };
     }
 
+    write(samples) {
+        const capacity = this.ring.length;
+        if (samples.length > capacity) {
+            samples = samples.subarray(samples.length - capacity);
+        }
+        const overflow = this.available + samples.length - capacity;
+        if (overflow > 0) {
+            // Drop the oldest audio rather than the newest
+            this.readIndex = (this.readIndex + overflow) % capacity;
+            this.available -= overflow;
+            this.overflows++;
+        }
+
+        const first = Math.min(samples.length, capacity - this.writeIndex);
+        this.ring.set(samples.subarray(0, first), this.writeIndex);
+        if (first < samples.length) {
+            this.ring.set(samples.subarray(first), 0);
+        }
+        this.writeIndex = (this.writeIndex + samples.length) % capacity;
+        this.available += samples.length;
+        this.turnComplete = false;
+    }
+
+    read(channelData) {
+        const capacity = this.ring.length;
+        const count = Math.min(channelData.length, this.available);
+        const first = Math.min(count, capacity - this.readIndex);
+        channelData.set(this.ring.subarray(this.readIndex, this.readIndex + first));
+        if (first < count) {
+            channelData.set(this.ring.subarray(0, count - first), first);
+        }
+        this.readIndex = (this.readIndex + count) % capacity;
+        this.available -= count;
+        return count;
+    }
+
     process(inputs, outputs, parameters) {
-        const output = outputs[0];
-        const channelData = output[0];
+        const channelData = outputs[0][0];
+
+        if (!this.playing && (this.available >= this.prebuffer || (this.turnComplete && this.available > 0))) {
+            this.playing = true;
+        }
+
+        if (this.playing) {
+            const count = this.read(channelData);
+            if (count < channelData.length) {
+                // Running dry mid-turn is an audible glitch; at turn end it is expected
+                if (!this.turnComplete) {
+                    this.underruns++;
+                }
+                this.playing = false;
+            }
+        }
 
-        if (this.buffer.length >= channelData.length) {
-            channelData.set(this.buffer.slice(0, channelData.length));
-            this.buffer = this.buffer.slice(channelData.length);
-            return true;
+        if (++this.blocks % STATS_INTERVAL_BLOCKS === 0) {
+            this.port.postMessage({
+                type: 'stats',
+                underruns: this.underruns,
+                overflows: this.overflows,
+                buffered_ms: Math.round(this.available / sampleRate * 1000)
+            });
         }
 
         return true;
     }
 }
 
-registerProcessor('pcm-processor', PCMProcessor);
\ No newline at end of file
+registerProcessor('pcm-processor', PCMProcessor);
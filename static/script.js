@@ -23,6 +23,19 @@ let sessionChats = [];
 let currentMode = "text";
 let careerSuggestActive = false;
 
+// One server-side session per tab, so tabs don't share history, mode or admission limits
+function getSessionId() {
+    let id = sessionStorage.getItem('mitra_session_id');
+    if (!id) {
+        id = window.crypto && crypto.randomUUID
+            ? crypto.randomUUID()
+            : Date.now().toString(36) + Math.random().toString(36).slice(2);
+        sessionStorage.setItem('mitra_session_id', id);
+    }
+    return id;
+}
+const sessionId = getSessionId();
+
 inputEl.focus();
 
 function showToast(message, kind = 'info') {
@@ -192,7 +205,7 @@ async function sendMessage(evt) {
             headers: { 'Content-Type': 'application/x-www-form-urlencoded' },
             body: new URLSearchParams({ 
                 message: text, 
-                session_id: 'default', 
+                session_id: sessionId, 
                 system_key: 'mental_health_wellness',
                 career_suggest: careerSuggestActive 
             })
@@ -217,9 +230,12 @@ async function sendMessage(evt) {
                 messagesEl.removeChild(typingBubble.parentElement.parentElement.parentElement);
             }
 
-            const audioUrl = `data:audio/mp3;base64,${data.audio}`;
-            audioPlayer.src = audioUrl;
-            audioPlayer.play();
+            // Audio may be missing when the server ran short on time (see data.degraded)
+            if (data.audio) {
+                const audioUrl = `data:audio/mp3;base64,${data.audio}`;
+                audioPlayer.src = audioUrl;
+                audioPlayer.play();
+            }
 
             // Add the message bubble
             const bubble = addMessage({ role: 'assistant', text: data.text_reply });
@@ -339,6 +355,8 @@ let recordInterval = null;
 let audioInputContext = null;
 let workletNode = null;
 let initialized = false;
+let playbackStats = null;
+let liveReconnectRequested = false;
 
 // Open live session when mic button is clicked
 micBtn.addEventListener('click', async () => {
@@ -386,7 +404,7 @@ async function sendAutomaticCheckIn() {
                 headers: { 'Content-Type': 'application/x-www-form-urlencoded' },
                 body: new URLSearchParams({ 
                     message: checkInMessage,
-                    session_id: 'default', 
+                    session_id: sessionId, 
                     system_key: 'mental_health_wellness',
                     career_suggest: careerSuggestActive,
                     post_live_session: 'true' // Special flag
@@ -402,10 +420,12 @@ async function sendAutomaticCheckIn() {
             }
 
             // Handle voice response
-            if (data.mode === "voice_assistant" && data.audio) {
-                const audioUrl = `data:audio/mp3;base64,${data.audio}`;
-                audioPlayer.src = audioUrl;
-                audioPlayer.play();
+            if (data.mode === "voice_assistant") {
+                if (data.audio) {
+                    const audioUrl = `data:audio/mp3;base64,${data.audio}`;
+                    audioPlayer.src = audioUrl;
+                    audioPlayer.play();
+                }
                 
                 // Add the message bubble
                 addMessage({ role: 'assistant', text: data.text_reply || data.reply });
@@ -477,6 +497,15 @@ function connectToLiveSession() {
     };
 
     liveWebSocket.onclose = () => {
+        if (playbackStats) {
+            console.log('Live playback stats:', playbackStats);
+        }
+        if (liveReconnectRequested && !liveSessionOverlay.classList.contains('hidden')) {
+            liveReconnectRequested = false;
+            liveStatus.textContent = 'Reconnecting...';
+            setTimeout(connectToLiveSession, 1000);
+            return;
+        }
         liveStatus.textContent = 'Disconnected';
         showToast('Live session ended');
     };
@@ -495,19 +524,24 @@ function connectToLiveSession() {
         if (data.audio) {
             playLiveAudio(data.audio);
         }
+        if (data.turn_complete && workletNode) {
+            workletNode.port.postMessage({ type: 'turn_complete' });
+        }
+        if (data.error) {
+            showToast(data.error, 'error');
+        }
+        if (data.reconnect) {
+            // Server is shutting down; reconnect once it closes us
+            liveReconnectRequested = true;
+        }
     };
 }
 
 function sendInitialSetupMessage() {
-    const systemInstruction = "You are a compassionate mental health support assistant named MITRA for live voice conversations. Provide warm, empathetic responses and be a good listener. Keep responses concise and natural for voice interaction.Don't ask too many questions and also provide empathetic solutions to the user.";
-    
+    // The server supplies MITRA's system instruction; sending our own would miss its pre-warmed sessions
     const setupMessage = {
         setup: {
-            system_instruction: {
-                parts: [{ text: systemInstruction }]
-            },
             generation_config: { response_modalities: ["AUDIO"] },
-            
         },
     };
 
@@ -529,6 +563,11 @@ async function initializeAudioContext() {
     audioInputContext = new (window.AudioContext || window.webkitAudioContext)({ sampleRate: 24000 });
     await audioInputContext.audioWorklet.addModule("/static/pcm-processor.js");
     workletNode = new AudioWorkletNode(audioInputContext, "pcm-processor");
+    workletNode.port.onmessage = (e) => {
+        if (e.data && e.data.type === 'stats') {
+            playbackStats = e.data;
+        }
+    };
     workletNode.connect(audioInputContext.destination);
     initialized = true;
 }
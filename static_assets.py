@@ -0,0 +1,121 @@
+import gzip
+import hashlib
+import json
+from pathlib import Path
+from typing import Callable, Dict, Optional, Set, Tuple
+
+import anyio
+from fastapi import Request
+from fastapi.responses import Response
+from fastapi.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:  # Optional: without it the page is served gzip-only
+    brotli = None
+
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+# Preferred first
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def accepted_encodings(header: str) -> Set[str]:
+    """Content codings an Accept-Encoding header allows (q=0 excluded)."""
+    accepted = set()
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+class AssetManifest:
+    """Maps asset names to fingerprinted URLs from build_assets.py's manifest.
+
+    Without a build (local development) assets are served from their plain
+    paths.
+    """
+
+    def __init__(self, manifest_path: Path, prefix: str = "/static/"):
+        self.prefix = prefix
+        try:
+            self.entries: Dict[str, str] = json.loads(manifest_path.read_text())
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def url(self, name: str) -> str:
+        return self.prefix + self.entries.get(name, name)
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves prebuilt .br/.gz variants and sets cache headers.
+
+    Fingerprinted files under ``immutable_prefix`` are cached for a year;
+    everything else must revalidate, which StaticFiles answers with 304
+    when the ETag still matches.
+    """
+
+    def __init__(self, *args, immutable_prefix: str = "build/", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.immutable_prefix = immutable_prefix
+
+    async def _variant(self, path: str, scope) -> Optional[Tuple[str, Response]]:
+        headers = dict(scope.get("headers") or [])
+        accepted = accepted_encodings(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path + suffix)
+            if stat_result is not None:
+                # FileResponse guesses the type from "x.js.br" as text/javascript
+                return encoding, self.file_response(full_path, stat_result, scope)
+        return None
+
+    async def get_response(self, path: str, scope) -> Response:
+        variant = None
+        if scope["method"] in ("GET", "HEAD"):
+            variant = await self._variant(path, scope)
+        if variant is not None:
+            encoding, response = variant
+            response.headers["Content-Encoding"] = encoding
+        else:
+            response = await super().get_response(path, scope)
+        response.headers["Vary"] = "Accept-Encoding"
+        response.headers["Cache-Control"] = IMMUTABLE if path.startswith(self.immutable_prefix) else REVALIDATE
+        return response
+
+
+class CachedPage:
+    """A page rendered once per process and kept with compressed variants and an ETag."""
+
+    def __init__(self, render: Callable[[], str]):
+        self._render = render
+        self._variants: Optional[Dict[str, bytes]] = None
+        self.etag = ""
+
+    def _build(self):
+        body = self._render().encode("utf-8")
+        variants = {"identity": body, "gzip": gzip.compress(body, 9)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=11)
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+        self._variants = variants
+
+    def response(self, request: Request, media_type: str = "text/html") -> Response:
+        if self._variants is None:
+            self._build()
+        headers = {"ETag": self.etag, "Cache-Control": REVALIDATE, "Vary": "Accept-Encoding"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if self.etag in [tag.strip(" W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+        for encoding, _ in ENCODINGS:
+            if encoding in accepted and encoding in self._variants:
+                headers["Content-Encoding"] = encoding
+                return Response(self._variants[encoding], media_type=media_type, headers=headers)
+        return Response(self._variants["identity"], media_type=media_type, headers=headers)
@@ -0,0 +1,16 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Modules live at the repository root, next to main.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Importing main builds the live API client, which needs a key (never used by the tests)
+os.environ.setdefault("GOOGLE_API_KEY", "test-key")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
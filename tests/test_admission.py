@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from admission import (
+    PRIORITY_CAREER, PRIORITY_DEFAULT, PRIORITY_URGENT, SHARED_SESSION_ID, AdmissionController, AdmissionRejected,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+def controller(**kwargs):
+    options = dict(max_concurrent=1, per_session=2, max_queue=8, max_wait=5)
+    options.update(kwargs)
+    return AdmissionController(**options)
+
+
+async def queued(admission, session_id, priority, order, timeout=None):
+    await admission.acquire(session_id, priority, timeout)
+    order.append(session_id)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_waiters_are_admitted_by_priority_then_arrival():
+    admission = controller()
+    await admission.acquire("holder")
+    order = []
+    tasks = [asyncio.create_task(queued(admission, sid, priority, order)) for sid, priority in (
+        ("career", PRIORITY_CAREER), ("default-1", PRIORITY_DEFAULT),
+        ("urgent", PRIORITY_URGENT), ("default-2", PRIORITY_DEFAULT),
+    )]
+    await settle()
+    assert admission.stats()["queued"] == 4
+
+    for expected in ("urgent", "default-1", "default-2", "career"):
+        admission.release(order[-1] if order else "holder")
+        await settle()
+        assert order[-1] == expected
+    await asyncio.gather(*tasks)
+
+
+async def test_full_queue_sheds_the_lowest_class_first():
+    admission = controller(max_queue=2)
+    await admission.acquire("holder")
+    career = asyncio.create_task(admission.acquire("career", PRIORITY_CAREER))
+    default = asyncio.create_task(admission.acquire("default", PRIORITY_DEFAULT))
+    await settle()
+
+    urgent = asyncio.create_task(admission.acquire("urgent", PRIORITY_URGENT))
+    await settle()
+    with pytest.raises(AdmissionRejected) as shed:
+        await career
+    assert shed.value.reason == "shed"
+
+    # A newcomer that ranks lowest is refused instead of displacing anyone
+    with pytest.raises(AdmissionRejected) as refused:
+        await admission.acquire("late-career", PRIORITY_CAREER)
+    assert refused.value.reason == "queue_full"
+    assert refused.value.retry_after >= 1
+    assert admission.stats()["rejected"] == {"shed": 1, "queue_full": 1}
+
+    for task in (urgent, default):
+        task.cancel()
+    await asyncio.gather(urgent, default, return_exceptions=True)
+
+
+async def test_queue_timeout_is_rejected():
+    admission = controller(max_wait=0.05)
+    await admission.acquire("holder")
+    with pytest.raises(AdmissionRejected) as rejected:
+        await admission.acquire("waiter")
+    assert rejected.value.reason == "queue_timeout"
+    assert admission.stats()["queued"] == 0
+
+
+async def test_cancelled_waiter_that_was_granted_gives_the_slot_back():
+    admission = controller()
+    await admission.acquire("holder")
+    waiter = asyncio.create_task(admission.acquire("waiter"))
+    await settle()
+
+    # The grant lands, but the request is cancelled before it resumes
+    admission.release("holder")
+    assert admission.active == 1
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert admission.active == 0
+    assert await admission.acquire("next", timeout=0.1) == 0.0
+
+
+async def test_per_session_limit_skips_the_shared_fallback_id():
+    admission = controller(max_concurrent=8, per_session=2)
+    for _ in range(5):
+        assert await admission.acquire(SHARED_SESSION_ID, timeout=0.1) == 0.0
+    await admission.acquire("tab-1")
+    await admission.acquire("tab-1")
+    with pytest.raises(AdmissionRejected):
+        await admission.acquire("tab-1", timeout=0.05)
+
+
+def test_chat_queue_timeout_returns_503_with_retry_after(monkeypatch):
+    # No free slots at all: every request waits out max_wait in the queue
+    monkeypatch.setattr(main, "admission", controller(max_concurrent=0, max_wait=0.05))
+    response = TestClient(main.app).post("/chat", data={"message": "hello", "session_id": "tab-1"})
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.json()["mode"] == "text"
+
+
+def test_shared_session_mode_does_not_make_everyone_urgent(monkeypatch):
+    monkeypatch.setitem(main.SESSION_STATES, SHARED_SESSION_ID, {
+        "mode": "voice_assistant", "history": [], "career_suggest_active": False,
+    })
+    monkeypatch.setitem(main.SESSION_STATES, "tab-1", {
+        "mode": "voice_assistant", "history": [], "career_suggest_active": False,
+    })
+    assert main.chat_priority("hello", SHARED_SESSION_ID, False, False) == PRIORITY_DEFAULT
+    assert main.chat_priority("hello", "tab-1", False, False) == PRIORITY_URGENT
+    assert main.chat_priority("hello", SHARED_SESSION_ID, False, True) == PRIORITY_URGENT
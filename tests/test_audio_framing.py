@@ -0,0 +1,59 @@
+import asyncio
+import base64
+import json
+
+import pytest
+
+from audio_framing import AudioFramer
+
+pytestmark = pytest.mark.anyio
+
+# 10 ms frames of 24 kHz 16-bit PCM
+FRAME_BYTES = 480
+
+
+async def _append(sent, message):
+    sent.append(json.loads(message))
+
+
+def framer_with_log(**kwargs):
+    sent, first = [], []
+    framer = AudioFramer(lambda message: _append(sent, message), frame_ms=10, flush_ms=5,
+                         on_first_frame=lambda: first.append(len(sent)), **kwargs)
+    return framer, sent, first
+
+
+async def test_parts_are_coalesced_into_full_frames():
+    framer, sent, _ = framer_with_log()
+    for _ in range(5):
+        await framer.push(b"\x01" * 200)
+    assert len(sent) == 2
+    assert all(len(base64.b64decode(m["audio"])) == FRAME_BYTES for m in sent)
+    await framer.end_turn()
+    assert len(base64.b64decode(sent[2]["audio"])) == 40
+    assert sent[3] == {"turn_complete": True}
+    framer.close()
+
+
+async def test_first_frame_is_reported_when_sent_not_when_buffered():
+    framer, sent, first = framer_with_log()
+    await framer.push(b"\x01" * 100)
+    assert first == [] and sent == []
+
+    await asyncio.sleep(0.05)
+    assert first == [1]
+    await framer.push(b"\x01" * FRAME_BYTES * 2)
+    await framer.end_turn()
+    assert first == [1]
+    assert framer.stats()["frames_out"] == 3
+    framer.close()
+
+
+async def test_text_is_sent_after_buffered_audio():
+    framer, sent, first = framer_with_log()
+    await framer.push(b"\x01" * 100)
+    await framer.send_text("hello")
+    assert list(sent[0]) == ["audio"]
+    assert sent[1] == {"text": "hello"}
+    assert first == [1]
+    framer.close()
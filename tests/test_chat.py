@@ -0,0 +1,154 @@
+import json
+import os
+
+import pytest
+from vertexai.generative_models import GenerationResponse
+
+import config
+import main
+from circuit_breaker import CLOSED, CircuitBreaker
+from config import CHAT_DEADLINE_MAX_SECONDS, CHAT_DEADLINE_MIN_SECONDS, CHAT_DEADLINE_SECONDS, SESSION_STATES
+from deadline import Deadline
+
+pytestmark = pytest.mark.anyio
+
+
+def model_response(text=None, call=None):
+    """A Vertex response with an optional text part and an optional function call part."""
+    parts = []
+    if text is not None:
+        parts.append({"text": text})
+    if call is not None:
+        parts.append({"function_call": {"name": call, "args": {}}})
+    return GenerationResponse.from_dict({"candidates": [{"content": {"role": "model", "parts": parts}}]})
+
+
+CRISIS = "handle_crisis_situation"
+CALM = "handle_calm_situation"
+CALM_REPLY = "I'm glad to hear you're feeling better. We can continue our conversation through text."
+
+
+class FakeModel:
+    """Stands in for the Vertex model: returns scripted responses and records each request."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    async def generate_content_async(self, contents, tools=None):
+        self.requests.append({"contents": contents, "tools": tools})
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def chat(monkeypatch):
+    vertex = CircuitBreaker("vertex")
+    monkeypatch.setattr(main, "vertex_breaker", vertex)
+    monkeypatch.setattr(main, "log_crisis_event", lambda session_id, message: None)
+
+    async def speak(text, deadline):
+        return "YXVkaW8="
+    monkeypatch.setattr(main, "speak", speak)
+
+    async def send(message, model, session_id="test-session", mode="text", budget_ms=None, fused=False):
+        monkeypatch.setattr(main, "FUSED_CRISIS_DETECTION", fused)
+        monkeypatch.setattr(main, "MODEL", model)
+        main.ensure_session_state(session_id)["mode"] = mode
+        deadline = Deadline.from_header(
+            budget_ms, CHAT_DEADLINE_SECONDS, CHAT_DEADLINE_MAX_SECONDS, CHAT_DEADLINE_MIN_SECONDS
+        )
+        response = await main.process_chat(
+            message, session_id, "mental_health_wellness", "", False, False, deadline
+        )
+        return json.loads(response.body)
+
+    send.vertex = vertex
+    yield send
+    SESSION_STATES.clear()
+
+
+async def test_tiny_client_budgets_skip_generation_and_leave_breaker_closed(chat):
+    model = FakeModel()
+    for _ in range(5):
+        reply = await chat("hello", model, budget_ms="1")
+        assert "generation_skipped" in reply["degraded"]
+        assert reply["reply"].startswith("I apologize")
+    assert model.requests == []
+    assert chat.vertex.state == CLOSED
+    assert chat.vertex.snapshot()["calls"] == 0
+
+
+def reply_text(reply):
+    return reply.get("reply") or reply.get("text_reply")
+
+
+@pytest.mark.parametrize("fused", [False, True])
+async def test_crisis_call_in_text_mode_switches_to_voice(chat, fused):
+    model = FakeModel(model_response(call=CRISIS))
+    reply = await chat("I don't want to live anymore", model, fused=fused)
+    assert reply["crisis_detected"] is True
+    assert reply["mode"] == "voice_assistant"
+    assert reply["text_reply"] == main.CRISIS_RESPONSE
+    assert SESSION_STATES["test-session"]["mode"] == "voice_assistant"
+    assert len(model.requests) == 1
+    assert model.requests[0]["tools"] is not None
+
+
+@pytest.mark.parametrize("fused", [False, True])
+async def test_calm_call_in_voice_mode_switches_to_text(chat, fused):
+    model = FakeModel(model_response(call=CALM))
+    reply = await chat("I feel much calmer now, thank you", model, mode="voice_assistant", fused=fused)
+    assert reply["mode"] == "text"
+    assert reply["reply"] == CALM_REPLY
+    assert SESSION_STATES["test-session"]["mode"] == "text"
+    assert len(model.requests) == 1
+
+
+@pytest.mark.parametrize("fused", [False, True])
+async def test_inapplicable_tool_call_asks_again_for_text(chat, fused):
+    # Calm only applies in voice mode; in text mode the user still needs an answer
+    model = FakeModel(model_response(call=CALM), model_response(text="Glad you're doing well."))
+    reply = await chat("I'm fine today", model, fused=fused)
+    assert reply["mode"] == "text"
+    assert reply["reply"] == "Glad you're doing well."
+    assert len(model.requests) == 2
+    assert model.requests[1]["tools"] is None
+    assert SESSION_STATES["test-session"]["history"][-1] == {"role": "assistant", "text": "Glad you're doing well."}
+
+
+async def test_text_only_reply_non_fused(chat):
+    model = FakeModel(model_response(text="(no tool needed)"), model_response(text="Let's take a deep breath."))
+    reply = await chat("exams are stressing me", model)
+    assert reply["reply"] == "Let's take a deep breath."
+    assert [request["tools"] is not None for request in model.requests] == [True, False]
+
+
+async def test_text_only_reply_fused(chat):
+    model = FakeModel(model_response(text="Let's take a deep breath."))
+    reply = await chat("exams are stressing me", model, fused=True)
+    assert reply["reply"] == "Let's take a deep breath."
+    assert len(model.requests) == 1
+    assert model.requests[0]["tools"] is not None
+
+
+@pytest.mark.parametrize("fused", [False, True])
+async def test_text_with_crisis_call_acts_on_the_call(chat, fused):
+    model = FakeModel(model_response(text="I'm here for you.", call=CRISIS))
+    reply = await chat("I want to hurt myself", model, fused=fused)
+    assert reply["crisis_detected"] is True
+    assert len(model.requests) == 1
+
+
+async def test_text_with_inapplicable_call_keeps_the_text(chat):
+    # Already in voice mode, so a crisis call changes nothing; the text part is the answer
+    model = FakeModel(model_response(text="I'm right here with you.", call=CRISIS))
+    reply = await chat("I still feel awful", model, mode="voice_assistant", fused=True)
+    assert reply["mode"] == "voice_assistant"
+    assert reply["text_reply"] == "I'm right here with you."
+    assert reply["audio"] == "YXVkaW8="
+    assert len(model.requests) == 1
+
+
+@pytest.mark.skipif("FUSED_CRISIS_DETECTION" in os.environ, reason="set in the environment")
+def test_fused_detection_is_opt_in():
+    assert config.FUSED_CRISIS_DETECTION is False
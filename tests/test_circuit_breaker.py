@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+import search
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+pytestmark = pytest.mark.anyio
+
+
+class ProviderDown(Exception):
+    pass
+
+
+async def failing():
+    raise ProviderDown()
+
+
+async def slow():
+    await asyncio.sleep(1)
+    return "late"
+
+
+def recovering(failures: int):
+    """A provider that fails ``failures`` times and then answers."""
+    calls = {"n": 0}
+
+    async def call():
+        calls["n"] += 1
+        if calls["n"] <= failures:
+            raise ProviderDown()
+        return "ok"
+    return call
+
+
+def breaker(**kwargs) -> CircuitBreaker:
+    options = dict(window=60, min_calls=3, error_rate=0.5, open_seconds=0.05, min_timeout=0.01)
+    options.update(kwargs)
+    return CircuitBreaker("test", **options)
+
+
+async def test_opens_probes_and_closes():
+    cb = breaker()
+    provider = recovering(failures=3)
+    for _ in range(3):
+        with pytest.raises(ProviderDown):
+            await cb.call(provider)
+    assert cb.state == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        await cb.call(provider)
+    assert cb.rejected == 1
+
+    await asyncio.sleep(0.06)
+    assert cb.allow()
+    assert cb.state == HALF_OPEN
+    # Only one probe at a time while half-open
+    assert not cb.allow()
+    cb.release()
+
+    assert await cb.call(provider) == "ok"
+    assert cb.state == CLOSED
+    assert cb.error_rate() == 0.0
+
+
+async def test_failed_probe_reopens():
+    cb = breaker()
+    for _ in range(3):
+        with pytest.raises(ProviderDown):
+            await cb.call(failing)
+    await asyncio.sleep(0.06)
+    with pytest.raises(ProviderDown):
+        await cb.call(failing)
+    assert cb.state == OPEN
+
+
+async def test_slow_provider_timeouts_open_the_breaker():
+    cb = breaker()
+    for _ in range(3):
+        with pytest.raises(asyncio.TimeoutError):
+            await cb.call(slow, timeout=0.02)
+    assert cb.state == OPEN
+
+
+async def test_timeouts_from_tiny_budgets_are_not_counted():
+    cb = breaker(min_timeout=0.5)
+    for _ in range(5):
+        with pytest.raises(asyncio.TimeoutError):
+            await cb.call(slow, timeout=0.001)
+    assert cb.state == CLOSED
+    assert cb.snapshot()["calls"] == 0
+
+
+async def test_tiny_timeout_gives_back_the_probe_slot():
+    cb = breaker(min_timeout=0.5)
+    cb._open()
+    await asyncio.sleep(0.06)
+    with pytest.raises(asyncio.TimeoutError):
+        await cb.call(slow, timeout=0.001)
+    assert cb.state == HALF_OPEN
+    assert cb.allow()
+
+
+async def test_web_search_skips_open_cse_breaker(monkeypatch):
+    cse = breaker()
+    cse._open()
+    monkeypatch.setattr(search, "CSE_BREAKER", cse)
+    monkeypatch.setattr(search, "GOOGLE_CSE_API_KEY", "key")
+    monkeypatch.setattr(search, "GOOGLE_CSE_ID", "cx")
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("an open breaker must not reach the provider")
+    monkeypatch.setattr(search.aiohttp, "ClientSession", no_network)
+
+    serp_queries = []
+
+    async def serpapi(query, num_results, timeout):
+        serp_queries.append(query)
+        return [{"title": "JEE Main", "snippet": "Session 1 in January", "link": "", "source": "Google Search"}]
+    monkeypatch.setattr(search, "search_serpapi", serpapi)
+
+    results, source = await search.perform_web_search("jee main dates", 6, timeout=5)
+    assert source == "SerpApi"
+    assert len(results) == 1
+    assert serp_queries == ["jee main dates"]
+    assert cse.rejected == 1
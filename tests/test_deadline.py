@@ -0,0 +1,34 @@
+import pytest
+
+from deadline import Deadline
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, 25.0),
+    ("", 25.0),
+    ("not-a-number", 25.0),
+    ("nan", 25.0),
+    ("8000", 8.0),
+    ("1", 1.0),
+    ("-500", 1.0),
+    ("3600000", 60.0),
+])
+def test_from_header_clamps_budget(header, expected):
+    deadline = Deadline.from_header(header, default=25.0, maximum=60.0, minimum=1.0)
+    assert deadline.budget == expected
+
+
+def test_timeout_respects_reserve_and_cap():
+    deadline = Deadline(10.0)
+    assert deadline.has(9.0)
+    assert not deadline.has(11.0)
+    assert deadline.timeout(cap=2.0) == 2.0
+    assert 5.5 < deadline.timeout(reserve=4.0) <= 6.0
+    assert deadline.timeout(reserve=20.0) == 0.0
+
+
+def test_degradations_are_recorded_once():
+    deadline = Deadline(1.0)
+    deadline.degrade("generation_skipped")
+    deadline.degrade("generation_skipped")
+    assert deadline.degradations == ["generation_skipped"]
@@ -0,0 +1,219 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from intent_router import DEFAULT_RULES_PATH, IntentRouter
+
+RULES = {
+    "search_triggers": [
+        {"name": "exam", "terms": ["cat", "jee"]},
+        {"name": "guidance_phrase", "terms": ["career options", "cut off"]},
+    ],
+    "crisis_hints": [{"name": "self_harm", "terms": ["kill myself"]}],
+    "query_rewrites": [{"name": "jee_dates", "all_of": [["jee"], ["date", "dates"]], "template": "JEE dates"}],
+    "default_query_template": "{message} official",
+}
+
+
+def write_rules(path, rules, mtime):
+    path.write_text(rules if isinstance(rules, str) else json.dumps(rules))
+    # Explicit mtimes so back-to-back edits are always seen as changes
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def rules_file(tmp_path):
+    path = tmp_path / "intent_rules.json"
+    write_rules(path, RULES, 1_000_000_000)
+    return path
+
+
+def test_terms_match_on_word_boundaries(rules_file):
+    router = IntentRouter(rules_file)
+    assert router.search_rule("Should I prepare for CAT?") == "exam"
+    assert router.search_rule("I care about education and communication") is None
+    assert router.search_rule("my cats keep me sane") is None
+
+
+def test_multi_word_phrases(rules_file):
+    router = IntentRouter(rules_file)
+    assert router.search_rule("What career  options do I have?") == "guidance_phrase"
+    assert router.search_rule("what was last year's cut off") == "guidance_phrase"
+    assert router.search_rule("a career in options trading") is None
+    assert router.crisis_rule("sometimes I want to kill myself") == "self_harm"
+    assert router.crisis_rule("this homework will kill me") is None
+
+
+def test_rewrite_needs_every_group(rules_file):
+    router = IntentRouter(rules_file)
+    assert router.rewrite_query("JEE exam dates?") == "JEE dates"
+    assert router.rewrite_query("JEE syllabus") == "JEE syllabus official"
+
+
+def test_hot_reload_keeps_old_rules_after_bad_edit(rules_file):
+    router = IntentRouter(rules_file)
+    assert router.search_rule("jee prep") == "exam"
+
+    write_rules(rules_file, '{"search_triggers": [', 2_000_000_000)
+    assert not router.maybe_reload()
+    assert router.search_rule("jee prep") == "exam"
+    write_rules(rules_file, {"search_triggers": [{"name": "broken"}]}, 3_000_000_000)
+    assert not router.maybe_reload()
+    assert router.search_rule("jee prep") == "exam"
+    assert router.reloads == 1
+
+    edited = dict(RULES, search_triggers=[{"name": "exam", "terms": ["neet"]}])
+    write_rules(rules_file, edited, 4_000_000_000)
+    assert router.maybe_reload()
+    assert router.search_rule("neet prep") == "exam"
+    assert router.search_rule("jee prep") is None
+    assert router.reloads == 2
+
+
+def test_missing_file_runs_with_empty_rules_and_warns(tmp_path, capsys):
+    router = IntentRouter(tmp_path / "missing.json")
+    assert "EMPTY rule set" in capsys.readouterr().out
+    assert router.search_rule("jee 2025 dates") is None
+    assert router.rewrite_query("jee 2025 dates") == "jee 2025 dates"
+
+
+def test_shipped_rules_load():
+    router = IntentRouter(DEFAULT_RULES_PATH)
+    assert router.reloads == 1
+    assert router.search_rule("When is JEE Main 2025?") is not None
+
+
+@pytest.mark.anyio
+async def test_background_watcher_picks_up_edits(rules_file):
+    router = IntentRouter(rules_file, reload_interval=0.01)
+    router.start()
+    try:
+        edited = dict(RULES, search_triggers=[{"name": "exam", "terms": ["neet"]}])
+        write_rules(rules_file, edited, 2_000_000_000)
+        for _ in range(100):
+            if router.reloads == 2:
+                break
+            await asyncio.sleep(0.01)
+        assert router.search_rule("neet prep") == "exam"
+    finally:
+        await router.stop()
+
+
+def test_overlapping_terms_are_all_found(tmp_path):
+    path = tmp_path / "rules.json"
+    write_rules(path, {"query_rewrites": [
+        {"name": "after_12th", "all_of": [["after 12th"], ["12th class"]], "template": "both"},
+    ]}, 1_000_000_000)
+    router = IntentRouter(path)
+    assert router.rules.match("options after 12th class?") == frozenset({"after 12th", "12th class"})
+    assert router.rewrite_query("options after 12th class?") == "both"
+    assert router.rewrite_query("after the 12th class") == "after the 12th class"
+
+
+def test_punctuation_and_hyphens_separate_words(rules_file):
+    router = IntentRouter(rules_file)
+    assert router.search_rule("what's the cut-off?") == "guidance_phrase"
+    assert router.search_rule("JEE, NEET...") == "exam"
+    assert router.crisis_rule("I want to kill myself.") == "self_harm"
+
+
+def test_prefix_terms_match_inflections(tmp_path):
+    path = tmp_path / "rules.json"
+    write_rules(path, {"search_triggers": [
+        {"name": "exam", "terms": ["exam*"]},
+        {"name": "guidance_phrase", "terms": ["which course*"]},
+    ]}, 1_000_000_000)
+    router = IntentRouter(path)
+    assert router.search_rule("Upcoming examinations?") == "exam"
+    assert router.search_rule("exam") == "exam"
+    assert router.search_rule("a reexam") is None
+    assert router.search_rule("Which courses suit me?") == "guidance_phrase"
+    assert router.search_rule("which") is None
+    assert router.search_rule("which coursework") == "guidance_phrase"
+    assert router.rules.match("exams, which course") == frozenset({"exam*", "which course*"})
+
+
+# The substring checks the shipped rules replaced, kept as the reference for their decisions
+LEGACY_ALWAYS_SEARCH = [
+    "date", "2025", "2024", "when", "cutoff", "admission", "latest", "current", "fees", "ranking",
+    "eligibility", "notification", "result", "exam", "application", "form", "last date",
+]
+LEGACY_SEARCH_TRIGGERS = ["jee", "neet", "clat", "gate", "cat", "mat", "xat", "iit", "nit", "iiit", "aiims", "jipmer"]
+LEGACY_PHRASES = ["career option", "what should i", "which course", "best college", "how to get", "admission process"]
+
+
+def legacy_should_search(message):
+    message_lower = message.lower()
+    return any(term in message_lower for term in LEGACY_ALWAYS_SEARCH + LEGACY_SEARCH_TRIGGERS + LEGACY_PHRASES)
+
+
+def legacy_rewrite(user_message):
+    message_lower = user_message.lower()
+    if "jee" in message_lower and ("2025" in message_lower or "date" in message_lower):
+        return "JEE Main 2025 exam dates official NTA schedule"
+    if "neet" in message_lower and ("2025" in message_lower or "date" in message_lower):
+        return "NEET 2025 exam date official NTA notification"
+    if any(term in message_lower for term in ["after 10th", "10th class"]):
+        return "career options after 10th class India 2024 2025"
+    elif any(term in message_lower for term in ["after 12th", "12th class"]):
+        return "career options after 12th India 2024 2025"
+    elif "cutoff" in message_lower:
+        return f"college cutoff 2024 India admission {user_message}"
+    elif "admission" in message_lower:
+        return f"college admission process 2024 2025 India {user_message}"
+    return f"{user_message} India 2024 2025 official"
+
+
+REALISTIC_MESSAGES = [
+    "When is JEE Main 2025?",
+    "Tell me about engineering entrance examinations",
+    "Are applications open?",
+    "Any notifications for UPSC?",
+    "Which courses are good for biology students?",
+    "What are the NEET cutoffs for government colleges?",
+    "Is the admission process online?",
+    "Are admissions open for B.Com?",
+    "What are the fees at IIT Bombay?",
+    "Best colleges for commerce in Delhi",
+    "What career options do I have after 12th?",
+    "Career options after 10th class",
+    "What should I do after my boards?",
+    "How to get into AIIMS?",
+    "When do CLAT results come out?",
+    "Latest rankings of NITs",
+    "Is there an age limit in the eligibility criteria?",
+    "How do I fill the application form?",
+    "Exam dates for GATE 2025?",
+    "Jee exam date?",
+    "NEET 2025 dates please",
+    "I'm stressed about my board exams",
+    "Is the current syllabus different?",
+    "I feel lost and don't know what to study",
+    "My parents want me to become a doctor",
+    "Should I take a gap year?",
+    "Which stream should I choose?",
+    "Tell me about a career in design",
+    "Thanks, that helps a lot!",
+]
+
+# Where whole-word matching deliberately disagrees with the substring checks
+INTENDED_SEARCH_CHANGES = {
+    "I want to study education": False,  # "cat" inside "education"
+    "Can you update me on the syllabus?": False,  # "date" inside "update"
+    "I'm good at mathematics": False,  # "mat" inside "mathematics"
+    "I am a candidate for the interview": False,  # "date" inside "candidate"
+    "What is the format of the test?": False,  # "form" inside "format"
+    "What is the cut-off for Delhi University?": True,  # hyphenated "cut off"
+}
+
+
+def test_shipped_rules_agree_with_legacy_checks():
+    router = IntentRouter(DEFAULT_RULES_PATH)
+    for message in REALISTIC_MESSAGES:
+        assert (router.search_rule(message) is not None) == legacy_should_search(message), message
+        assert router.rewrite_query(message) == legacy_rewrite(message), message
+    for message, searches in INTENDED_SEARCH_CHANGES.items():
+        assert legacy_should_search(message) != searches, message
+        assert (router.search_rule(message) is not None) == searches, message
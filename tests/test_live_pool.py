@@ -0,0 +1,93 @@
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+from live_pool import LiveSessionPool, config_key
+from live_session import DEFAULT_SYSTEM_INSTRUCTION, build_live_config
+
+pytestmark = pytest.mark.anyio
+
+# What static/script.js sends now, and what older cached copies still send
+BROWSER_SETUP = {"generation_config": {"response_modalities": ["AUDIO"]}}
+LEGACY_BROWSER_SETUP = {
+    "system_instruction": {"parts": [{"text": (
+        "You are a compassionate mental health support assistant named MITRA for live voice conversations. "
+        "Provide warm, empathetic responses and be a good listener. Keep responses concise and natural for "
+        "voice interaction.Don't ask too many questions and also provide empathetic solutions to the user."
+    )}]},
+    "generation_config": {"response_modalities": ["AUDIO"]},
+}
+
+
+class FakeConnect:
+    """Stands in for genai_client.aio.live.connect; records every upstream connection."""
+
+    def __init__(self):
+        self.opened = []
+        self.closed = 0
+
+    def __call__(self, config):
+        @asynccontextmanager
+        async def connect():
+            session = object()
+            self.opened.append(config_key(config))
+            try:
+                yield session
+            finally:
+                self.closed += 1
+        return connect()
+
+
+def setup_config(client_setup):
+    # Same parsing as gemini_live_session_handler
+    return build_live_config(json.loads(json.dumps({"setup": client_setup}))["setup"])
+
+
+@pytest.mark.parametrize("client_setup", [BROWSER_SETUP, LEGACY_BROWSER_SETUP])
+async def test_browser_session_gets_the_startup_warm_session(client_setup):
+    connect = FakeConnect()
+    pool = LiveSessionPool(connect, min_idle=1)
+    startup_key = pool.register(build_live_config({}))
+    await pool.fill_once()
+    assert connect.opened == [startup_key]
+
+    async with pool.session(setup_config(client_setup)) as (session, warm):
+        assert warm
+    assert pool.hits == 1 and pool.misses == 0
+    assert connect.opened == [startup_key]
+    assert connect.closed == 1
+
+
+async def test_custom_instruction_connects_cold():
+    connect = FakeConnect()
+    pool = LiveSessionPool(connect, min_idle=1)
+    pool.register(build_live_config({}))
+    await pool.fill_once()
+
+    custom = {"system_instruction": {"parts": [{"text": "You are a study buddy."}]}}
+    async with pool.session(setup_config(custom)) as (session, warm):
+        assert not warm
+    assert pool.misses == 1
+    assert len(connect.opened) == 2
+
+
+async def test_session_for_config_evicted_while_connecting_is_closed():
+    connect = FakeConnect()
+    pool = LiveSessionPool(lambda config: evict_during(config), min_idle=1, max_configs=1)
+
+    def evict_during(config):
+        # Another config pushes this one out while its upstream connection is being made
+        pool.register({"model": "other"})
+        return connect(config)
+
+    pool.register({"model": "first"})
+    await pool.fill_once()
+    assert connect.opened == [config_key({"model": "first"})]
+    assert connect.closed == 1
+    assert not any(pool._idle.values())
+
+
+def test_default_instruction_is_used_when_omitted():
+    assert build_live_config({})["system_instruction"] is DEFAULT_SYSTEM_INSTRUCTION
+    assert config_key(setup_config(LEGACY_BROWSER_SETUP)) == config_key(build_live_config({}))
@@ -0,0 +1,143 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import WebSocketDisconnect
+from google.genai import types
+
+import live_session
+from live_pool import LiveSessionPool
+from live_registry import CLOSE_SERVICE_RESTART, CLOSE_TRY_AGAIN_LATER, LiveSessionRegistry
+
+pytestmark = pytest.mark.anyio
+
+# 150 ms of 24 kHz 16-bit PCM: one full 100 ms frame, the rest flushed at turn end
+REPLY_AUDIO = b"\x01\x00" * 3600
+
+
+def audio_turn():
+    return [
+        types.LiveServerMessage(server_content=types.LiveServerContent(model_turn=types.Content(
+            parts=[types.Part(inline_data=types.Blob(data=REPLY_AUDIO, mime_type="audio/pcm"))]
+        ))),
+        types.LiveServerMessage(server_content=types.LiveServerContent(turn_complete=True)),
+    ]
+
+
+class FakeSession:
+    """An upstream live session that plays one scripted turn and then stays quiet."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.forwarded = []
+
+    async def send_realtime_input(self, media):
+        self.forwarded.append(media)
+
+    async def receive(self):
+        while self.messages:
+            yield self.messages.pop(0)
+        await asyncio.Event().wait()
+
+
+class FakeWebSocket:
+    """Client side of /live-session: sends the setup message, records what the server sends back."""
+
+    def __init__(self, registry):
+        self.registry = registry
+        self.incoming = asyncio.Queue()
+        self.incoming.put_nowait(json.dumps({"setup": {"generation_config": {"response_modalities": ["AUDIO"]}}}))
+        self.sent = []
+        self.turn_done = asyncio.Event()
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def receive_text(self):
+        message = await self.incoming.get()
+        if message is None:
+            raise WebSocketDisconnect()
+        return message
+
+    async def send_text(self, message):
+        await asyncio.sleep(0)
+        turn_active = [record.turn_active for record in self.registry._sessions.values()]
+        self.sent.append((json.loads(message), turn_active))
+        if "turn_complete" in message:
+            self.turn_done.set()
+
+    async def close(self, code=1000):
+        self.close_code = code
+        self.incoming.put_nowait(None)
+
+
+@pytest.fixture
+def live(monkeypatch):
+    upstream = FakeSession(audio_turn())
+
+    @asynccontextmanager
+    async def connect(config):
+        yield upstream
+
+    pool = LiveSessionPool(connect, min_idle=0)
+    registry = LiveSessionRegistry(max_sessions=5)
+    monkeypatch.setattr(live_session, "live_pool", pool)
+    monkeypatch.setattr(live_session, "live_registry", registry)
+    return pool, registry
+
+
+async def test_turn_stays_active_until_its_last_frame_is_sent(live):
+    pool, registry = live
+    websocket = FakeWebSocket(registry)
+    handler = asyncio.create_task(live_session.gemini_live_session_handler(websocket))
+
+    await asyncio.wait_for(websocket.turn_done.wait(), 2)
+    # Everything for the turn, turn_complete marker included, went out while the turn was active
+    assert [list(message) for message, _ in websocket.sent] == [["audio"], ["audio"], ["turn_complete"]]
+    assert all(active == [True] for _, active in websocket.sent)
+    await asyncio.sleep(0)
+    assert [record.turn_active for record in registry._sessions.values()] == [False]
+
+    await websocket.close()
+    await asyncio.wait_for(handler, 2)
+    assert registry.stats()["active"] == 0
+    assert len(pool.first_audio_times["cold"]) == 1
+
+
+async def test_session_over_capacity_is_told_why_and_closed(live):
+    pool, registry = live
+    registry.max_sessions = 0
+    websocket = FakeWebSocket(registry)
+
+    await asyncio.wait_for(live_session.gemini_live_session_handler(websocket), 2)
+    assert [message for message, _ in websocket.sent] == [registry.rejection()]
+    assert websocket.sent[0][0]["reason"] == "capacity"
+    assert websocket.close_code == CLOSE_TRY_AGAIN_LATER
+    assert registry.rejected == 1
+    assert pool.misses == 0
+
+
+async def test_drain_closes_idle_sessions_and_waits_for_active_turns():
+    registry = LiveSessionRegistry(max_sessions=5)
+    idle_socket, busy_socket = FakeWebSocket(registry), FakeWebSocket(registry)
+    registry.admit(idle_socket)
+    busy = registry.admit(busy_socket)
+    registry.turn_started(busy)
+
+    drain = asyncio.create_task(registry.drain(timeout=5))
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert idle_socket.close_code == CLOSE_SERVICE_RESTART
+    assert busy_socket.close_code is None
+    assert not drain.done()
+    assert registry.admit(FakeWebSocket(registry)) is None
+    assert registry.rejection()["reason"] == "draining"
+
+    registry.turn_finished(busy)
+    await asyncio.wait_for(drain, 2)
+    assert busy_socket.close_code == CLOSE_SERVICE_RESTART
+    for websocket in (idle_socket, busy_socket):
+        assert websocket.sent[0][0] == {"reconnect": True, "reason": "draining"}
+    assert registry.stats()["active"] == 0
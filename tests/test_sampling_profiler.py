@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from sampling_profiler import SamplingProfiler
+
+
+def profile(monkeypatch, token, headers=None):
+    monkeypatch.setattr(main, "DEBUG_PROFILER_TOKEN", token)
+    return TestClient(main.app).get("/_debug/profile", params={"seconds": 0.1}, headers=headers or {})
+
+
+def test_profile_endpoint_does_not_exist_without_a_token(monkeypatch):
+    assert profile(monkeypatch, "", {"X-Debug-Token": ""}).status_code == 404
+
+
+def test_profile_endpoint_rejects_a_wrong_token(monkeypatch):
+    assert profile(monkeypatch, "secret", {"X-Debug-Token": "guess"}).status_code == 403
+    assert profile(monkeypatch, "secret").status_code == 403
+
+
+def test_second_profile_is_refused_while_one_runs(monkeypatch):
+    busy = SamplingProfiler()
+    busy._running = True
+    monkeypatch.setattr(main, "profiler", busy)
+    response = profile(monkeypatch, "secret", {"X-Debug-Token": "secret"})
+    assert response.status_code == 409
+    assert response.json() == {"error": "A profile is already running"}
+
+
+@pytest.mark.anyio
+async def test_wall_mode_labels_loop_samples_with_the_running_task():
+    async def hog_the_loop():
+        # CPU work on the event loop, in slices so the profile's own sleep can end
+        while True:
+            until = time.perf_counter() + 0.02
+            while time.perf_counter() < until:
+                pass
+            await asyncio.sleep(0)
+
+    hog = asyncio.create_task(hog_the_loop())
+    try:
+        result = await SamplingProfiler().run(0.3, mode="wall", interval=0.002)
+    finally:
+        hog.cancel()
+
+    stacks = result["collapsed"].splitlines()
+    assert result["summary"]["samples"] > 0
+    assert any(
+        line.startswith("thread:MainThread;") and ".<locals>.hog_the_loop;" in line.split("task:", 1)[-1]
+        and "hog_the_loop (" in line
+        for line in stacks
+    )
+    assert all(line.rsplit(" ", 1)[-1].isdigit() for line in stacks)
@@ -0,0 +1,63 @@
+from search_context import approx_tokens, build_search_context
+
+JEE_DATES = (
+    "NTA has released the JEE Main 2025 session 1 exam schedule. The exam will be held from "
+    "January 22 to January 31, 2025 and session 2 from April 1 to April 8, 2025."
+)
+NEET_DATE = (
+    "NEET UG 2025 will be conducted on May 4, 2025 in pen and paper mode. The National Testing "
+    "Agency will release the application form on its official website."
+)
+CUTOFF = (
+    "JoSAA 2024 closing ranks for IIT Bombay computer science were 68 for the general category. "
+    "NIT Trichy CSE closed at 1,005 in the other state quota."
+)
+
+
+def result(snippet, source="Google Search", title="Result"):
+    return {"title": title, "snippet": snippet, "source": source, "link": "https://example.org"}
+
+
+def contents(context):
+    return [line[len("Content: "):] for line in context.splitlines() if line.startswith("Content: ")]
+
+
+def test_near_duplicates_collapse_into_one_result_keeping_their_sources():
+    results = [
+        result(JEE_DATES, "Google Answer Box"),
+        result(JEE_DATES + " Read more.", "Google Knowledge Graph"),
+        result(JEE_DATES, "Google Answer Box"),
+        result(NEET_DATE),
+    ]
+    context, report = build_search_context("JEE Main 2025 dates", "SerpApi", results, "When is JEE Main 2025?")
+    assert report["duplicates"] == 2
+    assert report["packed"] == 2
+    assert contents(context) == [JEE_DATES, NEET_DATE]
+    assert context.count("Also reported by: Google Knowledge Graph\n") == 1
+    assert report["tokens_after"] < report["tokens_before"]
+
+
+def test_results_are_ranked_by_overlap_with_the_message():
+    results = [result(CUTOFF), result(NEET_DATE), result(JEE_DATES)]
+    context, _ = build_search_context("NEET 2025", "SerpApi", results, "When is the NEET UG exam in May?")
+    assert contents(context)[0] == NEET_DATE
+
+
+def test_context_stays_within_the_token_budget():
+    results = [result(f"Passage {i}: " + " ".join(f"word{i}x{j}" for j in range(60))) for i in range(8)]
+    context, report = build_search_context("query", "SerpApi", results, "anything", token_budget=300)
+    assert approx_tokens(context) <= 300
+    assert report["tokens_after"] == approx_tokens(context)
+    assert report["packed"] < len(results)
+    assert report["packed"] + report["over_budget"] == len(results)
+
+
+def test_last_result_is_trimmed_at_a_sentence_boundary():
+    sentences = [f"Sentence {i} talks about option{i} in some detail for students." for i in range(40)]
+    long_snippet = " ".join(sentences)
+    context, report = build_search_context("query", "SerpApi", [result(long_snippet)], "options", token_budget=200)
+    (content,) = contents(context)
+    assert report["packed"] == 1
+    assert approx_tokens(context) <= 200
+    assert content.endswith("for students.")
+    assert long_snippet.startswith(content) and content != long_snippet
@@ -0,0 +1,106 @@
+import threading
+
+from session_journal import SessionJournal, encode_record
+
+
+def reopen(directory):
+    """A journal as the app opens it after a restart."""
+    journal = SessionJournal(directory, fsync=False)
+    journal.load()
+    return journal
+
+
+def history(*texts):
+    return [{"role": "user", "text": text} for text in texts]
+
+
+def test_sessions_survive_a_restart(tmp_path):
+    journal = reopen(tmp_path)
+    journal.start_writer()
+    journal.append("a", {"h": ["user", "hi"]})
+    journal.append("a", {"h": ["assistant", "hello"]})
+    journal.append("a", {"m": "voice_assistant"})
+    journal.append("a", {"c": True})
+    journal.append("b", {"h": ["user", "other"]})
+    journal.close()
+
+    journal = reopen(tmp_path)
+    assert journal.restore("a") == {
+        "history": [{"role": "user", "text": "hi"}, {"role": "assistant", "text": "hello"}],
+        "mode": "voice_assistant",
+        "career_suggest_active": True,
+    }
+    assert journal.restore("b")["history"] == history("other")
+    # Each session is rebuilt once; afterwards the in-memory state owns it
+    assert journal.restore("a") is None
+    assert journal.restore("missing") is None
+    journal.close()
+
+
+def test_snapshot_then_later_events_are_both_recovered(tmp_path):
+    journal = reopen(tmp_path)
+    journal.start_writer()
+    journal.append("a", {"h": ["user", "one"]})
+    states = {"a": {"history": history("one"), "mode": "text", "career_suggest_active": False}}
+    assert journal.snapshot(states)
+    journal.append("a", {"h": ["user", "two"]})
+    journal.append("b", {"h": ["user", "new"]})
+    assert journal.flush()
+    journal.close()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["journal-2.log", "snapshot-2.snap"]
+    journal = reopen(tmp_path)
+    assert journal.restore("a")["history"] == history("one", "two")
+    assert journal.restore("b")["history"] == history("new")
+    journal.close()
+
+
+def test_torn_last_record_is_ignored(tmp_path):
+    journal = reopen(tmp_path)
+    journal.start_writer()
+    journal.append("a", {"h": ["user", "kept"]})
+    journal.close()
+    torn = encode_record("a", {"h": ["user", "lost"]})
+    with open(tmp_path / "journal-1.log", "ab") as f:
+        f.write(torn[:len(torn) // 2])
+
+    journal = reopen(tmp_path)
+    assert journal.counters["corrupt_tails"] == 1
+    # New events go to a fresh generation, never after the torn bytes
+    journal.start_writer()
+    journal.append("a", {"h": ["user", "after restart"]})
+    journal.close()
+
+    journal = reopen(tmp_path)
+    assert journal.restore("a")["history"] == history("kept", "after restart")
+    journal.close()
+
+
+def test_session_restored_while_snapshot_is_written_is_still_recovered(tmp_path):
+    journal = reopen(tmp_path)
+    journal.start_writer()
+    journal.append("old", {"h": ["user", "before restart"]})
+    journal.close()
+
+    journal = reopen(tmp_path)
+    journal.start_writer()
+    # Hold the writer thread between snapshot() and _write_snapshot()
+    gate = threading.Event()
+    write_snapshot = journal._write_snapshot
+
+    def gated_write_snapshot(*args):
+        gate.wait(5)
+        write_snapshot(*args)
+
+    journal._write_snapshot = gated_write_snapshot
+    assert journal.snapshot({})
+    assert journal.restore("old")["history"] == history("before restart")
+    journal.append("old", {"h": ["user", "during snapshot"]})
+    gate.set()
+    assert journal.flush()
+    journal.close()
+
+    assert not (tmp_path / "journal-1.log").exists()
+    journal = reopen(tmp_path)
+    assert journal.restore("old")["history"] == history("before restart", "during snapshot")
+    journal.close()
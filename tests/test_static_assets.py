@@ -0,0 +1,119 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+import build_assets
+import static_assets
+from static_assets import (
+    IMMUTABLE, REVALIDATE, AssetManifest, CachedPage, PrecompressedStaticFiles, accepted_encodings,
+)
+
+WORKLET = "class Worklet extends AudioWorkletProcessor {}\n" + "// padding so it gets compressed\n" * 20
+SCRIPT = "const worklet = '/static/worklet.js';\n" + "console.log('loaded');\n" * 20
+STYLE = "body { margin: 0; }\n"
+
+
+@pytest.fixture
+def site(tmp_path):
+    static = tmp_path / "static"
+    static.mkdir()
+    (static / "worklet.js").write_text(WORKLET)
+    (static / "script.js").write_text(SCRIPT)
+    (static / "style.css").write_text(STYLE)
+    build_assets.build(static, static / "build")
+    manifest = AssetManifest(static / "build" / "manifest.json")
+
+    renders = []
+
+    def render():
+        renders.append(1)
+        return f"<html><script src='{manifest.url('script.js')}'></script>" + "<p>page</p>" * 100 + "</html>"
+
+    app = FastAPI()
+    app.mount("/static", PrecompressedStaticFiles(directory=str(static)), name="static")
+    page = CachedPage(render)
+
+    @app.get("/")
+    async def home(request: Request):
+        return page.response(request)
+
+    return TestClient(app), manifest, renders
+
+
+def get(client, url, accept_encoding, **headers):
+    return client.get(url, headers={"Accept-Encoding": accept_encoding, **headers})
+
+
+def test_accepted_encodings_excludes_q_zero():
+    assert accepted_encodings("gzip, deflate, br") == {"gzip", "deflate", "br"}
+    assert accepted_encodings("gzip, br;q=0") == {"gzip"}
+    assert accepted_encodings("BR ; q=0.5, gzip; q=0.000") == {"br"}
+    assert accepted_encodings("") == set()
+
+
+def test_build_rewrites_references_to_fingerprinted_urls(site):
+    client, manifest, _ = site
+    script = get(client, manifest.url("script.js"), "identity")
+    assert script.status_code == 200
+    assert manifest.url("worklet.js") in script.text
+    assert "'/static/worklet.js'" not in script.text
+
+
+def test_gzip_variant_is_served_when_accepted(site):
+    client, manifest, _ = site
+    response = get(client, manifest.url("worklet.js"), "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/javascript")
+    assert response.text == WORKLET
+
+
+@pytest.mark.skipif(static_assets.brotli is None, reason="brotli not installed")
+def test_brotli_variant_is_preferred(site):
+    client, manifest, _ = site
+    assert get(client, manifest.url("worklet.js"), "gzip, br").headers["content-encoding"] == "br"
+    assert get(client, manifest.url("worklet.js"), "gzip, br;q=0").headers["content-encoding"] == "gzip"
+
+
+def test_plain_file_is_served_without_an_accepted_variant(site):
+    client, manifest, _ = site
+    for accept_encoding in ("identity", "gzip;q=0, br;q=0"):
+        response = get(client, manifest.url("worklet.js"), accept_encoding)
+        assert "content-encoding" not in response.headers
+        assert response.text == WORKLET
+    # Too small to be worth a compressed copy
+    assert "content-encoding" not in get(client, manifest.url("style.css"), "gzip, br").headers
+
+
+def test_fingerprinted_files_are_immutable_and_the_rest_revalidate(site):
+    client, manifest, _ = site
+    built = get(client, manifest.url("script.js"), "gzip")
+    assert manifest.url("script.js").startswith("/static/build/")
+    assert built.headers["cache-control"] == IMMUTABLE
+    assert built.headers["vary"] == "Accept-Encoding"
+
+    plain = get(client, "/static/script.js", "gzip")
+    assert plain.headers["cache-control"] == REVALIDATE
+    assert get(client, "/static/script.js", "gzip", **{"If-None-Match": plain.headers["etag"]}).status_code == 304
+
+
+def test_cached_page_is_rendered_once_and_answers_304_on_matching_etag(site):
+    client, manifest, renders = site
+    first = get(client, "/", "gzip")
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["cache-control"] == REVALIDATE
+    assert manifest.url("script.js") in first.text
+    etag = first.headers["etag"]
+
+    for if_none_match in (etag, f"W/{etag}", f'"stale", {etag}'):
+        revalidated = get(client, "/", "gzip", **{"If-None-Match": if_none_match})
+        assert revalidated.status_code == 304
+        assert revalidated.content == b""
+        assert revalidated.headers["etag"] == etag
+
+    changed = get(client, "/", "identity", **{"If-None-Match": '"stale"'})
+    assert changed.status_code == 200
+    assert "content-encoding" not in changed.headers
+    assert changed.text == first.text
+    assert len(renders) == 1
+
@@ -4,17 +4,43 @@ from pathlib import Path
 import json
 
 from config import CRISIS_LOG, SESSION_STATES
+from config import SESSION_JOURNAL_DIR, SESSION_JOURNAL_FSYNC, SESSION_SNAPSHOT_HISTORY
+from session_journal import SessionJournal, new_state
+
+# Durable log of session changes, replayed lazily after a restart
+SESSION_JOURNAL = SessionJournal(
+    SESSION_JOURNAL_DIR, fsync=SESSION_JOURNAL_FSYNC, snapshot_history=SESSION_SNAPSHOT_HISTORY
+) if SESSION_JOURNAL_DIR else None
 
 def ensure_session_state(session_id: str) -> Dict:
-    """Ensure a session state exists for the given session ID."""
+    """Ensure a session state exists for the given session ID, restoring it from the journal if needed."""
     if session_id not in SESSION_STATES:
-        SESSION_STATES[session_id] = {
-            "history": [],
-            "mode": "text",
-            "career_suggest_active": False
-        }
+        restored = SESSION_JOURNAL.restore(session_id) if SESSION_JOURNAL else None
+        SESSION_STATES[session_id] = restored or new_state()
     return SESSION_STATES[session_id]
 
+def append_history(session_id: str, role: str, text: str):
+    """Add a message to the session history and journal it."""
+    ensure_session_state(session_id)["history"].append({"role": role, "text": text})
+    if SESSION_JOURNAL:
+        SESSION_JOURNAL.append(session_id, {"h": [role, text]})
+
+def set_mode(session_id: str, mode: str):
+    """Switch the session mode ("text" / "voice_assistant") and journal the change."""
+    state = ensure_session_state(session_id)
+    if state["mode"] != mode:
+        state["mode"] = mode
+        if SESSION_JOURNAL:
+            SESSION_JOURNAL.append(session_id, {"m": mode})
+
+def set_career_suggest(session_id: str, active: bool):
+    """Set the session's career suggestion flag and journal the change."""
+    state = ensure_session_state(session_id)
+    if state["career_suggest_active"] != active:
+        state["career_suggest_active"] = active
+        if SESSION_JOURNAL:
+            SESSION_JOURNAL.append(session_id, {"c": active})
+
 def trim_history(history: List[Dict], max_items: int = 8) -> List[Dict]:
     """Trim conversation history to the last max_items entries."""
     return history[-max_items:]